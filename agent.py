@@ -1,11 +1,25 @@
 import os
 import sys
+from typing import TYPE_CHECKING, Any
 
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 SRC_ROOT = os.path.join(PROJECT_ROOT, "src")
 if SRC_ROOT not in sys.path:
     sys.path.insert(0, SRC_ROOT)
 
-from krishigpt.agent import call_agent, root_agent, test_pipeline
+from krishigpt.agent import call_agent, test_pipeline
 
-__all__ = ["call_agent", "root_agent", "test_pipeline"]
\ No newline at end of file
+if TYPE_CHECKING:
+    # Served lazily by __getattr__ below; declared for linters and type
+    # checkers.
+    from krishigpt.agent import root_agent
+
+__all__ = ["call_agent", "root_agent", "test_pipeline"]
+
+
+def __getattr__(name: str) -> Any:
+    if name == "root_agent":
+        from krishigpt.agent import get_root_agent
+
+        return get_root_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,132 @@
+"""
+Cold import-time check for KrishiGPT entry points.
+
+Each module is imported in a fresh interpreter with ``-X importtime``; the best
+of several runs is compared against a budget, and the import tree is checked
+for SDKs that must only load when a request is actually served. Exits non-zero
+on any regression so it can gate CI:
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --scale 2   # slower CI machines
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = PROJECT_ROOT / "src"
+
+# Cumulative cold import budget per module, in milliseconds: the measured
+# best-of-5 plus about a third for noise, so a real regression fails. Use
+# --scale on slower machines rather than raising these.
+BUDGETS_MS: Dict[str, float] = {
+    "krishigpt": 15.0,
+    "krishigpt.agent": 110.0,
+    "krishigpt.tools.weather": 250.0,
+    "krishigpt.tools.market": 250.0,
+}
+
+# Heavy SDKs that none of the modules above may import eagerly.
+FORBIDDEN = (
+    "google.adk",
+    "google.genai",
+    "google.generativeai",
+    "openai",
+    "sarvamai",
+    "mcp",
+)
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def measure(module: str) -> Tuple[float, Set[str]]:
+    """
+    Import module in a fresh interpreter; return (cumulative ms, modules loaded).
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(SRC_ROOT), env.get("PYTHONPATH")])
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=str(PROJECT_ROOT),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    cumulative_us = 0
+    loaded: Set[str] = set()
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        name = match.group(4)
+        loaded.add(name)
+        if name == module:
+            cumulative_us = int(match.group(2))
+    return cumulative_us / 1000.0, loaded
+
+
+def _forbidden(loaded: Set[str]) -> List[str]:
+    return [root for root in FORBIDDEN if root in loaded]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="runs per module")
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiply all budgets by this"
+    )
+    parser.add_argument("--json", action="store_true", help="print JSON results")
+    args = parser.parse_args()
+
+    results = []
+    failed = False
+    for module, budget in BUDGETS_MS.items():
+        best = float("inf")
+        heavy: List[str] = []
+        for _ in range(max(1, args.repeat)):
+            elapsed, loaded = measure(module)
+            best = min(best, elapsed)
+            heavy = _forbidden(loaded)
+        limit = budget * args.scale
+        ok = best <= limit and not heavy
+        failed = failed or not ok
+        results.append(
+            {
+                "module": module,
+                "best_ms": round(best, 1),
+                "budget_ms": limit,
+                "forbidden_imports": heavy,
+                "ok": ok,
+            }
+        )
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for row in results:
+            status = "ok" if row["ok"] else "FAIL"
+            line = (
+                f"{status:4} {row['module']:28} {row['best_ms']:8.1f} ms "
+                f"(budget {row['budget_ms']:.0f} ms)"
+            )
+            if row["forbidden_imports"]:
+                line += " imports " + ", ".join(row["forbidden_imports"])
+            print(line)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
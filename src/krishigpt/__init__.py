@@ -1,3 +1,22 @@
-from .agent import call_agent, root_agent, test_pipeline
+from typing import Any
 
-__all__ = ["call_agent", "root_agent", "test_pipeline"]
+__all__ = [
+    "call_agent",
+    "call_agent_async",
+    "call_agents_batch",
+    "call_agents_batch_async",
+    "root_agent",
+    "stream_agent",
+    "stream_agent_async",
+    "test_pipeline",
+]
+
+
+def __getattr__(name: str) -> Any:
+    # Resolve the public API lazily so importing a submodule such as
+    # krishigpt.tools does not load the agent pipeline and its SDKs.
+    if name in __all__:
+        from . import agent
+
+        return getattr(agent, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
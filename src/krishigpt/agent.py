@@ -1,32 +1,59 @@
 from __future__ import annotations
 
+import asyncio
+import inspect
 import logging
-from typing import Any, Dict, Optional, Tuple
-
-from google.adk.agents.llm_agent import LlmAgent
-from google.adk.agents.sequential_agent import SequentialAgent
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
-
-from .agents.farming_agent import create_farming_agent
-from .agents.market_agent import create_market_agent
-from .agents.translation_agent import (
-    create_input_translation_agent,
-    create_output_translation_agent,
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
 )
-from .agents.weather_agent import create_weather_agent
+
+from .agents.state import FALLBACK_RESPONSE
 from .config import DEFAULT_APP_NAME, configure_google_api, get_gemini_model
+from .streaming import (
+    FINAL,
+    TRACE,
+    ChunkBuilder,
+    StreamChunk,
+    iterate_in_thread,
+    with_tool_chunks,
+)
+from .telemetry import Trace, instrument_agent_tree, pop_trace
+
+if TYPE_CHECKING:
+    from google.adk.agents.sequential_agent import SequentialAgent
+    from google.adk.runners import Runner
+    from google.adk.sessions import BaseSessionService
+    from google.genai import types
 
 logger = logging.getLogger(__name__)
 
 APP_NAME = DEFAULT_APP_NAME
 DEFAULT_USER_ID = "user_01"
-DEFAULT_SESSION_ID = "translation_session_01"
 
 _runner: Optional[Runner] = None
-_session_service: Optional[InMemorySessionService] = None
+_session_service: Optional[BaseSessionService] = None
 _root_agent: Optional[SequentialAgent] = None
+_runner_lock = threading.Lock()
+
+_OUTPUT_KEYS = (
+    "final_response",
+    "english_response",
+    "coordinator_message",
+    "translation_result",
+)
 
 
 def _extract_event_text(event: Any) -> Optional[str]:
@@ -46,13 +73,25 @@ def build_pipeline(model: Optional[str] = None) -> SequentialAgent:
     """
     Build the multilingual farmer assistant pipeline using on-demand subagents.
     """
+    from google.adk.agents.llm_agent import LlmAgent
+    from google.adk.agents.sequential_agent import SequentialAgent
+
+    from .agents.farming_agent import create_farming_agent
+    from .agents.market_agent import create_market_agent
+    from .agents.router_agent import create_router_agent
+    from .agents.translation_agent import (
+        create_fast_input_translation_agent,
+        create_fast_output_translation_agent,
+    )
+    from .agents.weather_agent import create_weather_agent
+
     configure_google_api()
     gemini_model = model or get_gemini_model()
-    input_translation_agent = create_input_translation_agent(model=gemini_model)
+    input_translation_agent = create_fast_input_translation_agent(model=gemini_model)
     weather_agent = create_weather_agent(model=gemini_model)
     farming_agent = create_farming_agent(model=gemini_model)
     market_agent = create_market_agent(model=gemini_model)
-    output_translation_agent = create_output_translation_agent(model=gemini_model)
+    output_translation_agent = create_fast_output_translation_agent()
 
     coordinator_agent = LlmAgent(
         name="FarmerAssistantCoordinator",
@@ -63,6 +102,9 @@ def build_pipeline(model: Optional[str] = None) -> SequentialAgent:
 Use the English query from translation_result.translated_query in session state.
 If translation_result is missing, use the user's original query.
 
+Earlier turns of this conversation, oldest first (may be empty):
+{conversation_summary?}
+
 Decide which specialist should handle the user query:
 - WeatherAgent: weather, temperature, rain, forecast, humidity, wind, climate.
 - MarketAgent: mandi prices, market rates, APMC prices, commodity price by
@@ -87,76 +129,336 @@ Do not answer weather, farming, or government-data queries directly; always dele
         sub_agents=[weather_agent, market_agent, farming_agent],
         output_key="coordinator_message",
     )
+    router_agent = create_router_agent(coordinator_agent)
 
-    return SequentialAgent(
+    pipeline = SequentialAgent(
         name="FarmerAssistantPipeline",
         sub_agents=[
             input_translation_agent,
-            coordinator_agent,
+            router_agent,
             output_translation_agent,
         ],
     )
+    instrument_agent_tree(pipeline)
+    return pipeline
 
 
-def _get_runner(model: Optional[str] = None) -> Tuple[Runner, InMemorySessionService]:
-    global _runner, _session_service, _root_agent
-    if _runner is None or _session_service is None or _root_agent is None:
-        _root_agent = build_pipeline(model)
-        _session_service = InMemorySessionService()
-        _runner = Runner(
-            agent=_root_agent,
-            app_name=APP_NAME,
-            session_service=_session_service,
-        )
+def get_root_agent(model: Optional[str] = None) -> SequentialAgent:
+    """
+    Return the shared pipeline, building it on first use.
+    """
+    global _root_agent
+    if _root_agent is None:
+        with _runner_lock:
+            if _root_agent is None:
+                _root_agent = build_pipeline(model)
+    return _root_agent
+
+
+def _get_runner(model: Optional[str] = None) -> Tuple[Runner, BaseSessionService]:
+    global _runner, _session_service
+    if _runner is None or _session_service is None:
+        root_agent = get_root_agent(model)
+        with _runner_lock:
+            if _runner is None or _session_service is None:
+                from google.adk.runners import Runner
+
+                from .sessions import create_session_service
+
+                _session_service = create_session_service()
+                _runner = Runner(
+                    agent=root_agent,
+                    app_name=APP_NAME,
+                    session_service=_session_service,
+                )
     return _runner, _session_service
 
 
+async def _get_runner_async(
+    model: Optional[str] = None,
+) -> Tuple[Runner, BaseSessionService]:
+    if _runner is not None and _session_service is not None:
+        return _runner, _session_service
+    # Building the pipeline imports ADK and may open a database; keep that
+    # off the event loop.
+    return await asyncio.to_thread(_get_runner, model)
+
+
 def _ensure_session(
-    session_service: InMemorySessionService, user_id: str, session_id: str
+    session_service: BaseSessionService, user_id: str, session_id: str
 ) -> None:
+    """
+    Synchronous wrapper around _ensure_session_async. asyncio.run refuses to
+    start under a running loop, so in that case it runs on a private loop in
+    a worker thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        asyncio.run(_ensure_session_async(session_service, user_id, session_id))
+        return
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pool.submit(
+            asyncio.run, _ensure_session_async(session_service, user_id, session_id)
+        ).result()
+
+
+async def _ensure_session_async(
+    session_service: BaseSessionService, user_id: str, session_id: str
+) -> None:
+    from google.adk.errors.already_exists_error import AlreadyExistsError
+
+    existing = session_service.get_session(
+        app_name=APP_NAME, user_id=user_id, session_id=session_id
+    )
+    if inspect.isawaitable(existing):
+        existing = await existing
+    if existing is not None:
+        return
     try:
-        session_service.create_session(
+        created = session_service.create_session(
             app_name=APP_NAME, user_id=user_id, session_id=session_id
         )
-    except Exception as exc:
-        logger.debug("Session may already exist: %s", exc)
+        if inspect.isawaitable(created):
+            await created
+    except AlreadyExistsError:
+        # A concurrent request created it between the lookup and the insert.
+        logger.debug("Session %s already exists", session_id)
+
+
+def _session_id_or_new(session_id: Optional[str]) -> str:
+    # Without a session_id every call is its own conversation; a shared
+    # default would make each call a follow-up of every earlier one.
+    return session_id or f"session_{uuid.uuid4().hex}"
+
+
+def _user_content(query: str) -> types.Content:
+    from google.genai import types
+
+    return types.Content(role="user", parts=[types.Part(text=query)])
+
+
+def _collect_event(event: Any, responses: Dict[str, str], debug: bool) -> None:
+    outputs: Dict[str, Any] = {}
+    actions = getattr(event, "actions", None)
+    if actions is not None and getattr(actions, "state_delta", None):
+        outputs.update(
+            (key, value)
+            for key, value in actions.state_delta.items()
+            if key in _OUTPUT_KEYS and isinstance(value, str)
+        )
+    if getattr(event, "output_key", None):
+        output_value = _extract_event_text(event)
+        if output_value is not None:
+            outputs[event.output_key] = output_value
+
+    for output_key, output_value in outputs.items():
+        responses[output_key] = output_value
+        if debug:
+            logger.info(
+                "Agent '%s' output (%s): %s",
+                getattr(event, "author", None),
+                output_key,
+                output_value,
+            )
+
+    if debug and hasattr(event, "is_final_response") and event.is_final_response():
+        final_text = _extract_event_text(event)
+        if final_text:
+            logger.info("Final response: %s", final_text)
+
+
+def _finish(
+    responses: Dict[str, str], invocation_id: Optional[str], return_trace: bool
+) -> Union[str, Tuple[str, Optional[Trace]]]:
+    response = _format_response(responses)
+    trace = pop_trace(invocation_id)
+    if return_trace:
+        return response, trace
+    return response
 
 
 def call_agent(
     query: str,
     user_id: str = DEFAULT_USER_ID,
-    session_id: str = DEFAULT_SESSION_ID,
+    session_id: Optional[str] = None,
     debug: bool = False,
-) -> str:
+    return_trace: bool = False,
+) -> Union[str, Tuple[str, Optional[Trace]]]:
     """
-    Process a user query through the agent pipeline.
+    Process a user query through the agent pipeline. Pass the same
+    session_id to continue a conversation; without one the query starts a
+    new session.
+
+    With return_trace=True, returns (response, trace) where the trace holds
+    per-agent, per-tool and per-LLM-call timings and token usage.
     """
+    session_id = _session_id_or_new(session_id)
     runner, session_service = _get_runner()
     _ensure_session(session_service, user_id, session_id)
 
-    content = types.Content(role="user", parts=[types.Part(text=query)])
+    content = _user_content(query)
     events = runner.run(user_id=user_id, session_id=session_id, new_message=content)
 
     responses: Dict[str, str] = {}
+    invocation_id: Optional[str] = None
     for event in events:
-        if getattr(event, "output_key", None):
-            output_value = _extract_event_text(event)
-            if output_value is not None:
-                responses[event.output_key] = output_value
-                if debug:
-                    logger.info(
-                        "Agent '%s' output (%s): %s",
-                        event.agent_name,
-                        event.output_key,
-                        output_value,
-                    )
-
-        if hasattr(event, "is_final_response") and event.is_final_response():
-            final_text = _extract_event_text(event)
-            if debug and final_text:
-                logger.info("Final response: %s", final_text)
-
-    return _format_response(responses)
+        invocation_id = invocation_id or getattr(event, "invocation_id", None)
+        _collect_event(event, responses, debug)
+
+    return _finish(responses, invocation_id, return_trace)
+
+
+async def call_agent_async(
+    query: str,
+    user_id: str = DEFAULT_USER_ID,
+    session_id: Optional[str] = None,
+    debug: bool = False,
+    return_trace: bool = False,
+) -> Union[str, Tuple[str, Optional[Trace]]]:
+    """
+    Process a user query through the agent pipeline without blocking a thread.
+    """
+    session_id = _session_id_or_new(session_id)
+    runner, session_service = await _get_runner_async()
+    await _ensure_session_async(session_service, user_id, session_id)
+
+    content = _user_content(query)
+    responses: Dict[str, str] = {}
+    invocation_id: Optional[str] = None
+    async for event in runner.run_async(
+        user_id=user_id, session_id=session_id, new_message=content
+    ):
+        invocation_id = invocation_id or getattr(event, "invocation_id", None)
+        _collect_event(event, responses, debug)
+
+    return _finish(responses, invocation_id, return_trace)
+
+
+async def stream_agent_async(
+    query: str,
+    user_id: str = DEFAULT_USER_ID,
+    session_id: Optional[str] = None,
+    return_trace: bool = False,
+) -> AsyncIterator[StreamChunk]:
+    """
+    Stream stage progress and answer text for a query as StreamChunks.
+    With return_trace=True a last "trace" chunk carries the request trace.
+    """
+    from google.adk.agents.run_config import RunConfig, StreamingMode
+
+    session_id = _session_id_or_new(session_id)
+    runner, session_service = await _get_runner_async()
+    await _ensure_session_async(session_service, user_id, session_id)
+
+    content = _user_content(query)
+    builder = ChunkBuilder()
+    invocation_id: Optional[str] = None
+    events = runner.run_async(
+        user_id=user_id,
+        session_id=session_id,
+        new_message=content,
+        run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+    )
+    async for item in with_tool_chunks(events):
+        if isinstance(item, StreamChunk):
+            for chunk in builder.feed_tool_chunk(item):
+                yield chunk
+            continue
+        invocation_id = invocation_id or getattr(item, "invocation_id", None)
+        for chunk in builder.feed(item):
+            yield chunk
+
+    if builder.final_text is None:
+        # The output stage never ran; close the stream with the fallback text.
+        yield StreamChunk(kind=FINAL, text=builder.streamed_text or FALLBACK_RESPONSE)
+
+    trace = pop_trace(invocation_id)
+    if return_trace and trace is not None:
+        yield StreamChunk(kind=TRACE, data=trace.to_dict())
+
+
+def stream_agent(
+    query: str,
+    user_id: str = DEFAULT_USER_ID,
+    session_id: Optional[str] = None,
+    return_trace: bool = False,
+) -> Iterator[StreamChunk]:
+    """
+    Synchronous counterpart of stream_agent_async.
+    """
+    return iterate_in_thread(
+        lambda: stream_agent_async(
+            query, user_id=user_id, session_id=session_id, return_trace=return_trace
+        )
+    )
+
+
+class AgentRequest(NamedTuple):
+    """
+    One query for call_agents_batch. A missing session_id gets a fresh session.
+    """
+
+    query: str
+    user_id: str = DEFAULT_USER_ID
+    session_id: Optional[str] = None
+
+
+BatchQuery = Union[str, AgentRequest, Tuple[str, ...]]
+
+
+def _as_request(item: BatchQuery) -> AgentRequest:
+    if isinstance(item, str):
+        request = AgentRequest(query=item)
+    else:
+        request = AgentRequest(*item)
+    if request.session_id is None:
+        request = request._replace(session_id=f"batch_{uuid.uuid4().hex}")
+    return request
+
+
+async def call_agents_batch_async(
+    queries: Sequence[BatchQuery],
+    max_concurrency: int = 8,
+    debug: bool = False,
+) -> List[str]:
+    """
+    Run many queries concurrently on the current event loop, preserving order.
+    """
+    requests = [_as_request(item) for item in queries]
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _run_one(request: AgentRequest) -> str:
+        async with semaphore:
+            try:
+                return await call_agent_async(
+                    request.query,
+                    user_id=request.user_id,
+                    session_id=request.session_id,
+                    debug=debug,
+                )
+            except Exception as exc:
+                logger.exception(
+                    "Batch query failed for session %s: %s", request.session_id, exc
+                )
+                return FALLBACK_RESPONSE
+
+    # Build the shared runner once before fanning out.
+    await _get_runner_async()
+    return list(await asyncio.gather(*(_run_one(request) for request in requests)))
+
+
+def call_agents_batch(
+    queries: Sequence[BatchQuery],
+    max_concurrency: int = 8,
+    debug: bool = False,
+) -> List[str]:
+    """
+    Run many user/session queries concurrently on one event loop.
+    """
+    return asyncio.run(
+        call_agents_batch_async(queries, max_concurrency=max_concurrency, debug=debug)
+    )
 
 
 def _format_response(responses: Dict[str, str]) -> str:
@@ -176,7 +478,7 @@ def _format_response(responses: Dict[str, str]) -> str:
     if translated_query:
         return translated_query
 
-    return "I'm sorry, I couldn't process that request. Please try again."
+    return FALLBACK_RESPONSE
 
 
 def test_pipeline() -> None:
@@ -189,7 +491,13 @@ def test_pipeline() -> None:
     print(response)
 
 
-root_agent = build_pipeline()
+def __getattr__(name: str) -> Any:
+    # root_agent (the ADK web entry point) is built on first access so that
+    # importing this module does not construct the pipeline.
+    if name == "root_agent":
+        return get_root_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
     test_pipeline()
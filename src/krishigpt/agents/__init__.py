@@ -1,15 +1,21 @@
-from .farming_agent import create_farming_agent
-from .market_agent import create_market_agent
-from .translation_agent import (
-    create_input_translation_agent,
-    create_output_translation_agent,
-)
-from .weather_agent import create_weather_agent
-
-__all__ = [
-    "create_farming_agent",
-    "create_market_agent",
-    "create_input_translation_agent",
-    "create_output_translation_agent",
-    "create_weather_agent",
-]
+from importlib import import_module
+from typing import Any
+
+_EXPORTS = {
+    "create_farming_agent": ".farming_agent",
+    "create_market_agent": ".market_agent",
+    "create_fast_input_translation_agent": ".translation_agent",
+    "create_fast_output_translation_agent": ".translation_agent",
+    "create_input_translation_agent": ".translation_agent",
+    "create_output_translation_agent": ".translation_agent",
+    "create_router_agent": ".router_agent",
+    "create_weather_agent": ".weather_agent",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,17 +1,25 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from google.adk.agents.llm_agent import LlmAgent
 from google.adk.tools import FunctionTool
-from google.adk.tools.mcp_tool import McpToolset
-from google.adk.tools.mcp_tool.mcp_session_manager import (
-    StreamableHTTPConnectionParams,
-)
 
 from ..config import get_mospi_mcp_url
-from ..tools.sarvam import use_sarvam_llm
+from ..tools.sarvam import use_sarvam_llm_async
+
+if TYPE_CHECKING:
+    from google.adk.tools.mcp_tool import McpToolset
 
 
 def _build_mospi_toolset() -> McpToolset:
+    # The MCP client stack is the slowest import in the project; only load it
+    # when the farming agent is actually built.
+    from google.adk.tools.mcp_tool import McpToolset
+    from google.adk.tools.mcp_tool.mcp_session_manager import (
+        StreamableHTTPConnectionParams,
+    )
+
     mospi_url = get_mospi_mcp_url()
     return McpToolset(
         connection_params=StreamableHTTPConnectionParams(url=mospi_url),
@@ -24,7 +32,7 @@ def create_farming_agent(model: str = "gemini-2.5-flash") -> LlmAgent:
     Farming specialist that handles agricultural queries in English, including
     official government statistics via MCP when available.
     """
-    sarvam_llm_tool = FunctionTool(func=use_sarvam_llm)
+    sarvam_llm_tool = FunctionTool(func=use_sarvam_llm_async)
     mospi_toolset = _build_mospi_toolset()
 
     return LlmAgent(
@@ -47,7 +55,7 @@ Steps:
      government dataset (examples: CPI, WPI, IIP, PLFS, NAS, ASI, environmental stats).
    - Use MoSPI MCP tools if the user asks for "latest", "trend", "value", "rate",
      "index", "price", "survey", "report", "official data", or any dataset name.
-   - Only use Sarvam (use_sarvam_llm) for general advice, recommendations, farming
+   - Only use Sarvam (use_sarvam_llm_async) for general advice, recommendations, farming
      practices, pest control, crop guidance, or explanations that do NOT require
      official statistics.
 3. If a query could be answered by official data, prefer MoSPI MCP tools even if it
@@ -55,8 +63,8 @@ Steps:
    explanation, but do NOT invent data.
 4. If required details for MCP are missing (time period, geography, dataset),
    ask a short clarification question in English and stop.
-5. If MCP tools return no data or an error, fall back to use_sarvam_llm.
-6. If the query is clearly non-statistical advice, call use_sarvam_llm directly.
+5. If MCP tools return no data or an error, fall back to use_sarvam_llm_async.
+6. If the query is clearly non-statistical advice, call use_sarvam_llm_async directly.
    - If status is "success", use the "response" field.
    - If status is "error", apologize briefly and ask a follow-up question in English.
 
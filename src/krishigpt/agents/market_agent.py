@@ -3,14 +3,16 @@ from __future__ import annotations
 from google.adk.agents.llm_agent import LlmAgent
 from google.adk.tools import FunctionTool
 
-from ..tools.market import get_mandi_prices
+from ..tools.market import get_mandi_prices_async
+from ..tools.market_analytics import get_mandi_price_analytics_async
 
 
 def create_market_agent(model: str = "gemini-2.5-flash") -> LlmAgent:
     """
     Market specialist that handles mandi price queries in English.
     """
-    mandi_tool = FunctionTool(func=get_mandi_prices)
+    mandi_tool = FunctionTool(func=get_mandi_prices_async)
+    analytics_tool = FunctionTool(func=get_mandi_price_analytics_async)
 
     return LlmAgent(
         name="MarketAgent",
@@ -26,17 +28,27 @@ Steps:
 2. Extract state and commodity from the English query. District is optional.
    - If state or commodity is missing or unclear, ask a short follow-up question in English and stop.
    - Do NOT ask for district if state and commodity are present; proceed without it.
-3. Call get_mandi_prices with state, district (if available), commodity.
+3. Call get_mandi_prices_async with state, district (if available), commodity.
+   For trend or comparison questions ("is onion price rising", "which mandi
+   pays most for cotton", "price difference between markets") call
+   get_mandi_price_analytics_async instead and answer from its text_summary,
+   trend (direction, week_over_week_pct), spread and top_markets fields; do
+   not compute prices yourself.
 4. If status is "error", apologize briefly and ask for corrected details.
+   Names are already matched to the dataset's spellings (local-language names,
+   old names and misspellings included), so ask again only if the tool still
+   finds nothing.
 5. If status is "success", summarize the records concisely:
    - Mention arrival_date (if present), market, variety, grade.
    - Include min_price, max_price, modal_price.
    - If multiple records exist, list each on its own line.
-6. If district was not provided, add a short note that results are statewide and
+6. If the result has "corrections", say in one short line which names were
+   interpreted (e.g. "Showing prices for Tomato in Odisha").
+7. If district was not provided, add a short note that results are statewide and
    the user can specify a district for more precise prices.
 
 Return only the English response text.
 """,
-        tools=[mandi_tool],
+        tools=[mandi_tool, analytics_tool],
         output_key="english_response",
     )
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import logging
+import random
+from typing import AsyncGenerator, Optional, Tuple
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.events import Event, EventActions
+from google.genai import types
+from pydantic import Field
+
+from ..answer_cache import get_answer_cache
+from ..config import get_router_confidence_threshold, get_router_shadow_rate
+from ..intent import CLARIFICATION, get_intent_router, get_routing_stats
+from .state import (
+    current_turn_state,
+    has_conversation_context,
+    parse_translation_result,
+    user_text,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def turn_translation(ctx: InvocationContext) -> Tuple[str, str]:
+    """
+    The English query and detected language for this turn, falling back to
+    the raw user text in English.
+    """
+    translation_result = parse_translation_result(
+        current_turn_state(ctx).get("translation_result")
+    )
+    return (
+        translation_result.get("translated_query") or user_text(ctx),
+        translation_result.get("detected_language") or "en-IN",
+    )
+
+
+class IntentRouterAgent(BaseAgent):
+    """
+    Transfer straight to a specialist when the local intent classifier is
+    confident, otherwise let the LLM coordinator decide.
+    """
+
+    # Also in sub_agents, whose parent_agent points back here; left out of
+    # repr so printing the tree does not recurse.
+    coordinator: LlmAgent = Field(repr=False)
+    confidence_threshold: float
+    shadow_rate: float
+
+    def __init__(
+        self,
+        name: str,
+        coordinator: LlmAgent,
+        confidence_threshold: float,
+        shadow_rate: float = 0.0,
+    ) -> None:
+        super().__init__(
+            name=name,
+            description=coordinator.description,
+            coordinator=coordinator,
+            confidence_threshold=confidence_threshold,
+            shadow_rate=shadow_rate,
+            sub_agents=[coordinator],
+        )
+
+    def _routing_event(self, ctx: InvocationContext, agent: str, source: str) -> Event:
+        return Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            actions=EventActions(
+                state_delta={"routed_agent": agent, "routing_source": source}
+            ),
+        )
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        query, language = turn_translation(ctx)
+        prediction = get_intent_router().classify(query)
+        specialist = self.coordinator.find_sub_agent(prediction.agent)
+        stats = get_routing_stats()
+
+        # Answers are cached per specialist, so a hit under the predicted
+        # intent means that specialist already answered this exact query.
+        # A follow-up turn may mean something else than the same words
+        # would on their own, so it never reads the cache.
+        answer_cache = get_answer_cache()
+        cached = (
+            answer_cache.get(query, language, prediction.agent)
+            if answer_cache and not has_conversation_context(ctx)
+            else None
+        )
+        if cached:
+            logger.debug("Answer cache hit for %s query.", prediction.agent)
+            yield self._routing_event(ctx, prediction.agent, "cache")
+            yield Event(
+                author=self.name,
+                invocation_id=ctx.invocation_id,
+                branch=ctx.branch,
+                content=types.Content(
+                    role="model", parts=[types.Part(text=cached["final_response"])]
+                ),
+                actions=EventActions(state_delta=dict(cached)),
+            )
+            return
+
+        confident = prediction.confidence >= self.confidence_threshold
+        if confident and specialist is not None and random.random() >= self.shadow_rate:
+            logger.debug(
+                "Routing locally to %s (confidence %.2f).",
+                prediction.agent,
+                prediction.confidence,
+            )
+            stats.record_local(prediction)
+            yield self._routing_event(ctx, prediction.agent, "local")
+            async for event in specialist.run_async(ctx):
+                yield event
+            return
+
+        llm_decision: Optional[str] = None
+        async for event in self.coordinator.run_async(ctx):
+            if (
+                llm_decision is None
+                and event.actions
+                and event.actions.transfer_to_agent
+            ):
+                llm_decision = event.actions.transfer_to_agent
+            yield event
+
+        stats.record_comparison(query, prediction, llm_decision or CLARIFICATION)
+        if llm_decision:
+            yield self._routing_event(ctx, llm_decision, "llm")
+
+
+def create_router_agent(
+    coordinator: LlmAgent,
+    confidence_threshold: Optional[float] = None,
+    shadow_rate: Optional[float] = None,
+) -> IntentRouterAgent:
+    """
+    Put the local intent router in front of the LLM coordinator.
+    """
+    return IntentRouterAgent(
+        name="IntentRouter",
+        coordinator=coordinator,
+        confidence_threshold=(
+            get_router_confidence_threshold()
+            if confidence_threshold is None
+            else confidence_threshold
+        ),
+        shadow_rate=get_router_shadow_rate() if shadow_rate is None else shadow_rate,
+    )
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import re
+from typing import TYPE_CHECKING, Any, Dict
+
+if TYPE_CHECKING:
+    from google.adk.agents.invocation_context import InvocationContext
+
+FALLBACK_RESPONSE = "I'm sorry, I couldn't process that request. Please try again."
+
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+
+def parse_translation_result(value: Any) -> Dict[str, Any]:
+    """
+    Parse the translation_result state value, tolerating LLM code fences.
+    """
+    if isinstance(value, dict):
+        return value
+    if not isinstance(value, str):
+        return {}
+    match = _JSON_OBJECT_RE.search(value)
+    if not match:
+        return {}
+    try:
+        parsed = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def user_text(ctx: InvocationContext) -> str:
+    content = ctx.user_content
+    if content and content.parts:
+        return "".join(part.text or "" for part in content.parts).strip()
+    return ""
+
+
+def has_conversation_context(ctx: InvocationContext) -> bool:
+    """
+    Whether earlier turns of this session (or their summary) could change
+    what the current message means.
+    """
+    # Deferred: sessions imports the ADK session services.
+    from ..sessions import SUMMARY_KEY
+
+    if ctx.session.state.get(SUMMARY_KEY):
+        return True
+    return any(
+        event.author == "user" and event.invocation_id != ctx.invocation_id
+        for event in ctx.session.events
+    )
+
+
+def current_turn_state(ctx: InvocationContext) -> Dict[str, Any]:
+    """
+    Collect state written during this invocation, ignoring stale values that
+    earlier turns left in the session.
+    """
+    written: Dict[str, Any] = {}
+    for event in ctx.session.events:
+        if event.invocation_id != ctx.invocation_id or not event.actions:
+            continue
+        written.update(event.actions.state_delta or {})
+    return written
+
+
+async def run_blocking(func: Any, **kwargs: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, **kwargs))
@@ -1,19 +1,44 @@
 from __future__ import annotations
 
+import json
+import logging
+from typing import Any, AsyncGenerator, Dict, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
 from google.adk.agents.llm_agent import LlmAgent
+from google.adk.events import Event, EventActions
 from google.adk.tools import FunctionTool
+from google.genai import types
+from pydantic import Field
 
+from ..answer_cache import get_answer_cache
+from ..config import get_language_confidence_threshold
+from ..language import detect_language
+from ..telemetry import TOOL, span
 from ..tools.translation import translate_text_if_needed
+from .state import (
+    FALLBACK_RESPONSE,
+    current_turn_state,
+    has_conversation_context,
+    parse_translation_result,
+    run_blocking,
+    user_text,
+)
+
+logger = logging.getLogger(__name__)
 
 
-def create_input_translation_agent(model: str = "gemini-2.5-flash") -> LlmAgent:
+def create_input_translation_agent(
+    model: str = "gemini-2.5-flash", name: str = "InputTranslationAgent"
+) -> LlmAgent:
     """
     Detect language and translate the user query to English.
     """
     translation_tool = FunctionTool(func=translate_text_if_needed)
 
     return LlmAgent(
-        name="InputTranslationAgent",
+        name=name,
         model=model,
         description="Detects the user language and translates the query to English.",
         instruction="""You translate user queries to English.
@@ -44,14 +69,16 @@ Output ONLY this JSON (no extra text):
     )
 
 
-def create_output_translation_agent(model: str = "gemini-2.5-flash") -> LlmAgent:
+def create_output_translation_agent(
+    model: str = "gemini-2.5-flash", name: str = "OutputTranslationAgent"
+) -> LlmAgent:
     """
     Translate the English response back to the user's language.
     """
     translation_tool = FunctionTool(func=translate_text_if_needed)
 
     return LlmAgent(
-        name="OutputTranslationAgent",
+        name=name,
         model=model,
         description="Translates the English response back to the user's language.",
         instruction="""You translate the assistant's English response back to the user's language.
@@ -77,3 +104,178 @@ Return only the final response text.
         tools=[translation_tool],
         output_key="final_response",
     )
+
+
+class FastInputTranslationAgent(BaseAgent):
+    """
+    Detect the query language without an LLM call and translate it to English.
+    Low-confidence detections are delegated to the LLM translation agent.
+    """
+
+    # Also in sub_agents, whose parent_agent points back here; left out of
+    # repr so printing the tree does not recurse.
+    llm_agent: LlmAgent = Field(repr=False)
+    confidence_threshold: float
+
+    def __init__(
+        self, name: str, llm_agent: LlmAgent, confidence_threshold: float
+    ) -> None:
+        super().__init__(
+            name=name,
+            description=llm_agent.description,
+            llm_agent=llm_agent,
+            confidence_threshold=confidence_threshold,
+            sub_agents=[llm_agent],
+        )
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        query = user_text(ctx)
+        detection = detect_language(query)
+        if detection.confidence < self.confidence_threshold:
+            logger.debug(
+                "Low language confidence %.2f (%s); using LLM translation.",
+                detection.confidence,
+                detection.language,
+            )
+            async for event in self.llm_agent.run_async(ctx):
+                yield event
+            return
+
+        translated_query = query
+        if detection.language != "en-IN":
+            with span(ctx.invocation_id, TOOL, "translate_text_if_needed"):
+                result = await run_blocking(
+                    translate_text_if_needed,
+                    text=query,
+                    source_language_code=detection.language,
+                    target_language_code="en-IN",
+                )
+            if result.get("status") == "success" and result.get("translated_text"):
+                translated_query = result["translated_text"]
+
+        translation_result = json.dumps(
+            {
+                "detected_language": detection.language,
+                "translated_query": translated_query,
+            },
+            ensure_ascii=False,
+        )
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            actions=EventActions(
+                state_delta={"translation_result": translation_result}
+            ),
+        )
+
+
+def _cache_answer(
+    turn_state: Dict[str, Any],
+    translation_result: Dict[str, Any],
+    final_response: str,
+) -> None:
+    """
+    Remember a specialist answer from this turn; clarification questions,
+    failed translations and follow-up turns are not cached.
+    """
+    answer_cache = get_answer_cache()
+    english_response = turn_state.get("english_response")
+    intent = turn_state.get("routed_agent")
+    query = translation_result.get("translated_query")
+    language = translation_result.get("detected_language") or "en-IN"
+    if not (answer_cache and english_response and intent and query):
+        return
+    if english_response.rstrip().endswith("?"):
+        return
+    if language != "en-IN" and final_response == english_response:
+        return
+    answer_cache.put(query, language, intent, english_response, final_response)
+
+
+class FastOutputTranslationAgent(BaseAgent):
+    """
+    Translate the specialist's English response back to the user's language
+    by calling the translation tool directly.
+    """
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        turn_state = current_turn_state(ctx)
+        if "final_response" in turn_state:
+            # Already answered this turn, e.g. from the answer cache.
+            return
+        # Only this turn's values: an answer left in the session by an earlier
+        # turn must not be repeated when this turn produced none.
+        english_text = (
+            turn_state.get("english_response")
+            or turn_state.get("coordinator_message")
+            or FALLBACK_RESPONSE
+        )
+        translation_result = parse_translation_result(
+            turn_state.get("translation_result")
+        )
+        target_language = translation_result.get("detected_language") or "en-IN"
+
+        final_response = english_text
+        if target_language != "en-IN":
+            with span(ctx.invocation_id, TOOL, "translate_text_if_needed"):
+                result = await run_blocking(
+                    translate_text_if_needed,
+                    text=english_text,
+                    source_language_code="en-IN",
+                    target_language_code=target_language,
+                )
+            if result.get("status") == "success" and result.get("translated_text"):
+                final_response = result["translated_text"]
+            else:
+                logger.warning(
+                    "Output translation to %s failed; returning English.",
+                    target_language,
+                )
+
+        if not has_conversation_context(ctx):
+            _cache_answer(turn_state, translation_result, final_response)
+
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            content=types.Content(
+                role="model", parts=[types.Part(text=final_response)]
+            ),
+            actions=EventActions(state_delta={"final_response": final_response}),
+        )
+
+
+def create_fast_input_translation_agent(
+    model: str = "gemini-2.5-flash", confidence_threshold: Optional[float] = None
+) -> FastInputTranslationAgent:
+    """
+    Input translation that only calls Gemini when language detection is unsure.
+    """
+    threshold = (
+        get_language_confidence_threshold()
+        if confidence_threshold is None
+        else confidence_threshold
+    )
+    return FastInputTranslationAgent(
+        name="InputTranslationAgent",
+        llm_agent=create_input_translation_agent(
+            model=model, name="InputTranslationLlmAgent"
+        ),
+        confidence_threshold=threshold,
+    )
+
+
+def create_fast_output_translation_agent() -> FastOutputTranslationAgent:
+    """
+    Output translation without an LLM round-trip.
+    """
+    return FastOutputTranslationAgent(
+        name="OutputTranslationAgent",
+        description="Translates the English response back to the user's language.",
+    )
@@ -3,16 +3,16 @@ from __future__ import annotations
 from google.adk.agents.llm_agent import LlmAgent
 from google.adk.tools import FunctionTool
 
-from ..tools.location import get_lat_lon
-from ..tools.weather import get_weather_forecast
+from ..tools.location import get_lat_lon_async
+from ..tools.weather import get_weather_forecast_async
 
 
 def create_weather_agent(model: str = "gemini-2.5-flash") -> LlmAgent:
     """
     Weather specialist that handles weather queries in English.
     """
-    get_lat_lon_tool = FunctionTool(func=get_lat_lon)
-    get_weather_tool = FunctionTool(func=get_weather_forecast)
+    get_lat_lon_tool = FunctionTool(func=get_lat_lon_async)
+    get_weather_tool = FunctionTool(func=get_weather_forecast_async)
 
     return LlmAgent(
         name="WeatherAgent",
@@ -27,12 +27,18 @@ Steps:
 1. Read translated_query from translation_result. If missing, use the user's query.
 2. Extract the location from the English query.
    - If the location is missing or unclear, ask a short follow-up question in English and stop.
-3. Call get_lat_lon with the extracted location. If status is "error", ask for a
-   clearer location in English and stop.
-4. Call get_weather_forecast with the location data. If status is "error", ask for
-   a clearer location in English and stop.
+3. Call get_lat_lon_async with the extracted location. If status is "error", ask
+   for a clearer location in English and stop.
+4. Call get_weather_forecast_async with the location data. If status is "error",
+   ask for a clearer location in English and stop.
+   - For questions about the coming days, irrigation or spraying, pass mode="week".
 5. Write a concise weather summary in English using:
    location, date, temperature min/max/avg, conditions, humidity, wind_speed.
+   With mode="week", use the days list instead: per-day temperature, rain_mm and
+   rain_probability; suggest irrigating on days with a negative water_balance_mm
+   and no rain expected (totals.largest_deficit_day is the driest); suggest
+   spraying in the listed spray_windows (totals.best_spray_days); warn about
+   frost_risk and heat_stress days.
 
 Return only the English response text.
 """,
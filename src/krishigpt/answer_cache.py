@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .cache import TieredCache
+from .config import (
+    get_answer_cache_farming_ttl,
+    get_answer_cache_path,
+    get_answer_cache_size,
+    get_answer_cache_weather_ttl,
+    is_answer_cache_enabled,
+)
+from .intent import FARMING_AGENT, MARKET_AGENT, WEATHER_AGENT
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]", re.UNICODE)
+_WHITESPACE_RE = re.compile(r"\s+")
+_FILLER_WORDS = frozenset(
+    "please kindly tell me can you could the a an what whats s is are".split()
+)
+# Queries shorter than this, or pointing back at an earlier turn through one
+# of these words, only make sense in their conversation ("Mysuru", "is that
+# safe for the same crop") and are never cached.
+MIN_QUERY_WORDS = 3
+_CONTEXT_WORDS = frozenset("""
+    it its that those them they same again previous earlier above instead
+    """.split())
+# "it" in "will it rain" refers to nothing.
+_WEATHER_VERBS = frozenset("rain raining snow be get going stay".split())
+
+
+def normalize_query(text: str) -> str:
+    """
+    Normalize an English query so trivially different phrasings share a key.
+    """
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    text = _PUNCTUATION_RE.sub(" ", text)
+    words = [word for word in _WHITESPACE_RE.split(text) if word]
+    return " ".join(word for word in words if word not in _FILLER_WORDS)
+
+
+def is_cacheable_query(query: str) -> bool:
+    """
+    Whether an English query carries its whole meaning by itself, so its
+    answer may be shared with other users.
+    """
+    words = normalize_query(query).split()
+    if len(words) < MIN_QUERY_WORDS:
+        return False
+    for word, following in zip(words, words[1:] + [""]):
+        if word == "it" and following in _WEATHER_VERBS:
+            continue
+        if word in _CONTEXT_WORDS:
+            return False
+    return True
+
+
+def seconds_until_next_arrival(now: Optional[datetime] = None) -> float:
+    """
+    Mandi arrivals are published per calendar day (IST), so a price answer is
+    good until the next day's arrivals start coming in.
+    """
+    now = now or datetime.now(IST)
+    next_day = (now + timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return (next_day - now).total_seconds()
+
+
+class AnswerCache:
+    """
+    Cache of final pipeline answers keyed on the normalized English query,
+    the user's language and the specialist that answered; weather answers
+    are also keyed on the IST date, since "rain today" changes meaning at
+    midnight. Queries that fail is_cacheable_query are never stored.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        disk_path: Optional[Path] = None,
+        weather_ttl: float = 3 * 3600,
+        farming_ttl: float = 3 * 86400,
+    ) -> None:
+        self._cache = TieredCache(max_entries=max_entries, disk_path=disk_path)
+        self.weather_ttl = weather_ttl
+        self.farming_ttl = farming_ttl
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats.snapshot()
+
+    def ttl_for(self, intent: str) -> float:
+        if intent == WEATHER_AGENT:
+            return min(self.weather_ttl, seconds_until_next_arrival())
+        if intent == MARKET_AGENT:
+            return seconds_until_next_arrival()
+        if intent == FARMING_AGENT:
+            return self.farming_ttl
+        return 0.0
+
+    @staticmethod
+    def key(
+        query: str, language: str, intent: str, now: Optional[datetime] = None
+    ) -> str:
+        parts = [intent, language, normalize_query(query)]
+        if intent == WEATHER_AGENT:
+            parts.append((now or datetime.now(IST)).astimezone(IST).date().isoformat())
+        raw = "\x1f".join(parts)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, query: str, language: str, intent: str) -> Optional[Dict[str, str]]:
+        if not is_cacheable_query(query):
+            return None
+        hit, value = self._cache.get(self.key(query, language, intent))
+        return value if hit else None
+
+    def put(
+        self,
+        query: str,
+        language: str,
+        intent: str,
+        english_response: str,
+        final_response: str,
+    ) -> None:
+        if not is_cacheable_query(query):
+            return
+        self._cache.set(
+            self.key(query, language, intent),
+            {"english_response": english_response, "final_response": final_response},
+            ttl=self.ttl_for(intent),
+        )
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+_ANSWER_CACHE: Optional[AnswerCache] = None
+_LOCK = threading.Lock()
+
+
+def get_answer_cache() -> Optional[AnswerCache]:
+    """
+    Return the process-wide answer cache, or None when it is disabled.
+    """
+    global _ANSWER_CACHE
+    if not is_answer_cache_enabled():
+        return None
+    if _ANSWER_CACHE is None:
+        with _LOCK:
+            if _ANSWER_CACHE is None:
+                disk_path = get_answer_cache_path()
+                _ANSWER_CACHE = AnswerCache(
+                    max_entries=get_answer_cache_size(),
+                    disk_path=Path(disk_path) if disk_path else None,
+                    weather_ttl=get_answer_cache_weather_ttl(),
+                    farming_ttl=get_answer_cache_farming_ttl(),
+                )
+    return _ANSWER_CACHE
@@ -40,6 +40,8 @@ def get_env(name: str, default: Optional[str] = None) -> Optional[str]:
 DEFAULT_GEMINI_MODEL = "gemini-2.5-flash"
 DEFAULT_APP_NAME = "translator_assistant_app"
 DEFAULT_MOSPI_MCP_URL = "https://mcp.mospi.gov.in"
+DEFAULT_LANGUAGE_CONFIDENCE = 0.8
+DEFAULT_ROUTER_CONFIDENCE = 0.85
 
 
 def get_gemini_model() -> str:
@@ -66,6 +68,432 @@ def get_mospi_mcp_url() -> str:
     return get_env("MOSPI_MCP_URL", DEFAULT_MOSPI_MCP_URL) or DEFAULT_MOSPI_MCP_URL
 
 
+def get_float_env(name: str, default: float) -> float:
+    value = get_env(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning("Invalid value for %s: %r; using %s.", name, value, default)
+        return default
+
+
+def get_int_env(name: str, default: int) -> int:
+    value = get_env(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning("Invalid value for %s: %r; using %s.", name, value, default)
+        return default
+
+
+def get_bool_env(name: str, default: bool) -> bool:
+    value = get_env(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_language_confidence_threshold() -> float:
+    """
+    Minimum detection confidence for skipping the LLM translation stage.
+    """
+    return get_float_env("KRISHIGPT_LANGUAGE_CONFIDENCE", DEFAULT_LANGUAGE_CONFIDENCE)
+
+
+def get_router_confidence_threshold() -> float:
+    """
+    Minimum local intent confidence for bypassing the LLM coordinator.
+    """
+    return get_float_env("KRISHIGPT_ROUTER_CONFIDENCE", DEFAULT_ROUTER_CONFIDENCE)
+
+
+def get_router_shadow_rate() -> float:
+    """
+    Fraction of confident queries still sent to the LLM coordinator so the
+    local router's accuracy can be measured above the threshold.
+    """
+    return get_float_env("KRISHIGPT_ROUTER_SHADOW_RATE", 0.0)
+
+
+def get_router_model_path() -> Optional[str]:
+    return get_env("KRISHIGPT_ROUTER_MODEL")
+
+
+def get_router_log_path() -> Optional[str]:
+    return get_env("KRISHIGPT_ROUTER_LOG")
+
+
+def is_answer_cache_enabled() -> bool:
+    return get_bool_env("KRISHIGPT_ANSWER_CACHE", True)
+
+
+def get_answer_cache_size() -> int:
+    return get_int_env("KRISHIGPT_ANSWER_CACHE_SIZE", 2048)
+
+
+def get_answer_cache_path() -> Optional[str]:
+    """
+    Optional SQLite file that lets cached answers survive restarts.
+    """
+    return get_env("KRISHIGPT_ANSWER_CACHE_PATH")
+
+
+def get_answer_cache_weather_ttl() -> float:
+    return get_float_env("KRISHIGPT_ANSWER_CACHE_WEATHER_TTL", 3 * 3600)
+
+
+def get_answer_cache_farming_ttl() -> float:
+    return get_float_env("KRISHIGPT_ANSWER_CACHE_FARMING_TTL", 3 * 86400)
+
+
+def get_session_backend() -> str:
+    """
+    "memory" (default) or "sqlite" for sessions shared across workers.
+    """
+    return (get_env("KRISHIGPT_SESSION_BACKEND", "memory") or "memory").lower()
+
+
+def get_session_db_path() -> Path:
+    path = get_env("KRISHIGPT_SESSION_DB")
+    if path:
+        return Path(path)
+    return Path(__file__).resolve().parents[2] / ".adk" / "krishigpt_sessions.db"
+
+
+def get_session_max_count() -> int:
+    return get_int_env("KRISHIGPT_SESSION_MAX", 10_000)
+
+
+def get_session_idle_ttl() -> float:
+    """
+    Seconds a session may sit idle before it is evicted.
+    """
+    return get_float_env("KRISHIGPT_SESSION_TTL", 6 * 3600)
+
+
+def get_session_max_events() -> int:
+    """
+    Events kept per session; older turns are folded into a short summary.
+    """
+    return get_int_env("KRISHIGPT_SESSION_MAX_EVENTS", 40)
+
+
+def get_http_retries() -> int:
+    return get_int_env("KRISHIGPT_HTTP_RETRIES", 3)
+
+
+def get_http_backoff() -> float:
+    """
+    Base delay in seconds for jittered exponential backoff between retries.
+    """
+    return get_float_env("KRISHIGPT_HTTP_BACKOFF", 0.5)
+
+
+def get_http_max_backoff() -> float:
+    return get_float_env("KRISHIGPT_HTTP_MAX_BACKOFF", 8.0)
+
+
+def get_http_connect_timeout() -> float:
+    return get_float_env("KRISHIGPT_HTTP_CONNECT_TIMEOUT", 3.05)
+
+
+def get_http_pool_size() -> int:
+    """
+    Keep-alive connections kept per API host.
+    """
+    return get_int_env("KRISHIGPT_HTTP_POOL_SIZE", 32)
+
+
+def is_telemetry_enabled() -> bool:
+    """
+    Per-stage latency and token tracing; cheap enough to leave on.
+    """
+    return get_bool_env("KRISHIGPT_TELEMETRY", True)
+
+
+def is_tool_cache_enabled() -> bool:
+    return get_bool_env("KRISHIGPT_TOOL_CACHE", True)
+
+
+def get_tool_cache_size() -> int:
+    return get_int_env("KRISHIGPT_TOOL_CACHE_SIZE", 4096)
+
+
+def get_tool_cache_path() -> Optional[str]:
+    """
+    Optional SQLite file for tool results; unset keeps them in memory only.
+    """
+    return get_env("KRISHIGPT_TOOL_CACHE_PATH")
+
+
+def get_tool_cache_ttl(tool_name: str, default: float) -> float:
+    """
+    Success TTL for one tool, e.g. KRISHIGPT_TOOL_CACHE_TTL_GET_MANDI_PRICES.
+    """
+    return get_float_env(f"KRISHIGPT_TOOL_CACHE_TTL_{tool_name.upper()}", default)
+
+
+def get_tool_cache_negative_ttl() -> float:
+    """
+    How long a "not found" tool result is remembered.
+    """
+    return get_float_env("KRISHIGPT_TOOL_CACHE_NEGATIVE_TTL", 600)
+
+
+def is_weather_cache_enabled() -> bool:
+    return get_bool_env("KRISHIGPT_WEATHER_CACHE", True)
+
+
+def get_weather_grid_size() -> float:
+    """
+    Grid cell size in degrees that forecast coordinates are snapped to
+    (0.1 is about 11 km); 0 disables snapping.
+    """
+    return get_float_env("KRISHIGPT_WEATHER_GRID_DEG", 0.1)
+
+
+def get_weather_cache_ttl() -> float:
+    return get_float_env("KRISHIGPT_WEATHER_CACHE_TTL", 3600)
+
+
+def get_weather_cache_cells() -> int:
+    return get_int_env("KRISHIGPT_WEATHER_CACHE_CELLS", 1024)
+
+
+def is_weather_prefetch_enabled() -> bool:
+    return get_bool_env("KRISHIGPT_WEATHER_PREFETCH", True)
+
+
+def get_weather_prefetch_top_n() -> int:
+    """
+    How many of the most requested grid cells are kept warm.
+    """
+    return get_int_env("KRISHIGPT_WEATHER_PREFETCH_TOP_N", 200)
+
+
+def get_weather_prefetch_min_score() -> float:
+    """
+    Requests a cell needs, decayed with a six-hour half-life, before
+    prefetching spends the call budget on it.
+    """
+    return get_float_env("KRISHIGPT_WEATHER_PREFETCH_MIN_SCORE", 2.0)
+
+
+def get_weather_call_budget() -> float:
+    """
+    OpenWeather forecast calls per hour that prefetching may use, counting
+    the calls made for users.
+    """
+    return get_float_env("KRISHIGPT_WEATHER_CALL_BUDGET", 600)
+
+
+def get_weather_bulk_concurrency() -> int:
+    """
+    Requests a bulk forecast run keeps in flight at once.
+    """
+    return max(1, get_int_env("KRISHIGPT_WEATHER_BULK_CONCURRENCY", 16))
+
+
+def get_weather_bulk_rate() -> float:
+    """
+    OpenWeather calls per second a bulk forecast run may start; match it to
+    the account's plan (the free tier allows 1).
+    """
+    return get_float_env("KRISHIGPT_WEATHER_BULK_RATE", 10)
+
+
+def is_gazetteer_enabled() -> bool:
+    """
+    Resolve place names from the bundled gazetteer before calling the
+    OpenWeather geocoder.
+    """
+    return get_bool_env("KRISHIGPT_GAZETTEER", True)
+
+
+def get_gazetteer_path() -> Path:
+    """
+    Gazetteer source: a CSV in the bundled format or a compiled .idx file.
+    """
+    path = get_env("KRISHIGPT_GAZETTEER_PATH")
+    if path:
+        return Path(path)
+    return Path(__file__).resolve().parent / "data" / "gazetteer.csv"
+
+
+def get_gazetteer_index_path() -> Path:
+    """
+    Where the compiled index of a CSV gazetteer is cached.
+    """
+    path = get_env("KRISHIGPT_GAZETTEER_INDEX")
+    if path:
+        return Path(path)
+    return Path(__file__).resolve().parents[2] / ".adk" / "gazetteer.idx"
+
+
+def get_datagov_page_size() -> int:
+    """
+    Records requested per data.gov.in page.
+    """
+    return max(1, get_int_env("KRISHIGPT_DATAGOV_PAGE_SIZE", 1000))
+
+
+def get_datagov_concurrency() -> int:
+    """
+    data.gov.in pages fetched in parallel once the first page has reported
+    the total.
+    """
+    return max(1, get_int_env("KRISHIGPT_DATAGOV_CONCURRENCY", 4))
+
+
+def get_mandi_max_records() -> int:
+    """
+    Most mandi price records one lookup returns, whatever limit is asked for.
+    """
+    return max(1, get_int_env("KRISHIGPT_MANDI_MAX_RECORDS", 5000))
+
+
+def is_mandi_store_enabled() -> bool:
+    """
+    Answer mandi price queries from the local store when it is fresh.
+    """
+    return get_bool_env("KRISHIGPT_MANDI_STORE", True)
+
+
+def get_mandi_store_path() -> Path:
+    path = get_env("KRISHIGPT_MANDI_STORE_PATH")
+    if path:
+        return Path(path)
+    return Path(__file__).resolve().parents[2] / ".adk" / "mandi_prices.db"
+
+
+def get_mandi_store_max_age() -> float:
+    """
+    Seconds since the last successful sync before the store is considered
+    stale and queries go to data.gov.in instead.
+    """
+    return get_float_env("KRISHIGPT_MANDI_STORE_MAX_AGE", 6 * 3600)
+
+
+def get_mandi_store_retention_days() -> int:
+    return max(1, get_int_env("KRISHIGPT_MANDI_STORE_RETENTION_DAYS", 30))
+
+
+def is_mandi_canonicalization_enabled() -> bool:
+    """
+    Map state, district and commodity names onto the dataset's spellings
+    before querying mandi prices.
+    """
+    return get_bool_env("KRISHIGPT_MANDI_CANONICALIZE", True)
+
+
+def get_sarvam_rate() -> float:
+    """
+    Sarvam calls per second shared by translation and the LLM tool; match it
+    to the account's plan.
+    """
+    return get_float_env("KRISHIGPT_SARVAM_RATE", 10)
+
+
+def get_sarvam_concurrency() -> int:
+    """
+    Sarvam calls allowed in flight at once across the process.
+    """
+    return max(1, get_int_env("KRISHIGPT_SARVAM_CONCURRENCY", 8))
+
+
+def get_sarvam_queue_timeout() -> float:
+    """
+    Seconds a call may wait for a Sarvam slot before giving up.
+    """
+    return get_float_env("KRISHIGPT_SARVAM_QUEUE_TIMEOUT", 10)
+
+
+def is_sarvam_streaming_enabled() -> bool:
+    """
+    Stream use_sarvam_llm completions so streaming callers see the advice as
+    it is generated.
+    """
+    return get_bool_env("KRISHIGPT_SARVAM_STREAM", True)
+
+
+def is_advice_cache_enabled() -> bool:
+    """
+    Serve farming advice for near-duplicate questions from memory instead
+    of asking Sarvam again.
+    """
+    return get_bool_env("KRISHIGPT_ADVICE_CACHE", True)
+
+
+def get_advice_cache_size() -> int:
+    return get_int_env("KRISHIGPT_ADVICE_CACHE_SIZE", 4096)
+
+
+def get_advice_cache_ttl() -> float:
+    return get_float_env("KRISHIGPT_ADVICE_CACHE_TTL", 7 * 86400)
+
+
+def get_advice_cache_threshold() -> float:
+    """
+    Minimum Jaccard similarity between the content words of two questions
+    for one to be answered with the other's advice.
+    """
+    return get_float_env("KRISHIGPT_ADVICE_CACHE_THRESHOLD", 0.75)
+
+
+def get_advice_cache_log_path() -> Optional[Path]:
+    """
+    JSONL file every advice cache hit is appended to for auditing.
+    """
+    path = get_env("KRISHIGPT_ADVICE_CACHE_LOG")
+    if path:
+        return Path(path)
+    return Path(__file__).resolve().parents[2] / ".adk" / "advice_cache_hits.jsonl"
+
+
+def is_translation_cache_enabled() -> bool:
+    return get_bool_env("KRISHIGPT_TRANSLATION_CACHE", True)
+
+
+def get_translation_cache_size() -> int:
+    """
+    Translations kept in memory; the SQLite file holds more.
+    """
+    return get_int_env("KRISHIGPT_TRANSLATION_CACHE_SIZE", 4096)
+
+
+def get_translation_cache_path() -> Path:
+    path = get_env("KRISHIGPT_TRANSLATION_CACHE_PATH")
+    if path:
+        return Path(path)
+    return Path(__file__).resolve().parents[2] / ".adk" / "translations.db"
+
+
+def get_translation_cache_ttl() -> float:
+    """
+    Seconds a translation is reused before Sarvam is asked again.
+    """
+    return get_float_env("KRISHIGPT_TRANSLATION_CACHE_TTL", 30 * 86400)
+
+
+def get_translation_chunk_chars() -> int:
+    """
+    Longest text sent to Sarvam in one translate call; longer responses are
+    split on line and sentence boundaries.
+    """
+    return max(100, get_int_env("KRISHIGPT_TRANSLATION_CHUNK_CHARS", 900))
+
+
+def get_translation_concurrency() -> int:
+    """
+    Chunks of one long response translated at the same time.
+    """
+    return max(1, get_int_env("KRISHIGPT_TRANSLATION_CONCURRENCY", 4))
+
+
 def configure_google_api() -> None:
     """
     Configure Gemini credentials from the project .env only.
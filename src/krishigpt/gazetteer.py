@@ -0,0 +1,671 @@
+from __future__ import annotations
+
+import argparse
+import bisect
+import csv
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import unicodedata
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .config import (
+    get_gazetteer_index_path,
+    get_gazetteer_path,
+    is_gazetteer_enabled,
+)
+
+logger = logging.getLogger(__name__)
+
+# Preference when several places share a name and nothing else tells them apart.
+KINDS = ("district", "town", "subdistrict", "village", "state")
+
+STATE_CODES = {
+    "an": "Andaman and Nicobar Islands",
+    "ap": "Andhra Pradesh",
+    "ar": "Arunachal Pradesh",
+    "as": "Assam",
+    "br": "Bihar",
+    "cg": "Chhattisgarh",
+    "ch": "Chandigarh",
+    "ct": "Chhattisgarh",
+    "dd": "Dadra and Nagar Haveli and Daman and Diu",
+    "dh": "Dadra and Nagar Haveli and Daman and Diu",
+    "dl": "Delhi",
+    "dn": "Dadra and Nagar Haveli and Daman and Diu",
+    "ga": "Goa",
+    "gj": "Gujarat",
+    "hp": "Himachal Pradesh",
+    "hr": "Haryana",
+    "jh": "Jharkhand",
+    "jk": "Jammu and Kashmir",
+    "ka": "Karnataka",
+    "kl": "Kerala",
+    "la": "Ladakh",
+    "ld": "Lakshadweep",
+    "mh": "Maharashtra",
+    "ml": "Meghalaya",
+    "mn": "Manipur",
+    "mp": "Madhya Pradesh",
+    "mz": "Mizoram",
+    "nl": "Nagaland",
+    "od": "Odisha",
+    "or": "Odisha",
+    "pb": "Punjab",
+    "py": "Puducherry",
+    "rj": "Rajasthan",
+    "sk": "Sikkim",
+    "tg": "Telangana",
+    "tn": "Tamil Nadu",
+    "tr": "Tripura",
+    "ts": "Telangana",
+    "uk": "Uttarakhand",
+    "up": "Uttar Pradesh",
+    "ut": "Uttarakhand",
+    "wb": "West Bengal",
+}
+_STATE_NAMES = frozenset(
+    " ".join(name.casefold().split()) for name in STATE_CODES.values()
+)
+_COUNTRY_WORDS = frozenset({"in", "ind", "india", "bharat"})
+_NOISE_WORDS = frozenset(
+    "district dist city town village taluk taluka tehsil tahsil mandal block".split()
+)
+_REPEAT_RE = re.compile(r"(.)\1+")
+_VOWEL_RE = re.compile(r"[aeiouy]")
+# Common romanization variants of the same Indic sounds.
+_PHONETIC_RULES = (
+    ("ksh", "x"),
+    ("aa", "a"),
+    ("ee", "i"),
+    ("oo", "u"),
+    ("ou", "u"),
+    ("sh", "s"),
+    ("ch", "c"),
+    ("th", "t"),
+    ("dh", "d"),
+    ("bh", "b"),
+    ("ph", "f"),
+    ("kh", "k"),
+    ("gh", "g"),
+    ("jh", "j"),
+    ("w", "v"),
+    ("z", "j"),
+)
+# Two places within this many degrees are treated as the same answer.
+_SAME_PLACE_DEGREES = 0.25
+
+# Bumped whenever normalize_name changes, so older indexes are rebuilt.
+_MAGIC = b"KGZ2"
+_HEADER = struct.Struct("<4sIIIQQ")
+_RECORD = struct.Struct("<ddII")
+_KEY = struct.Struct("<III")
+
+
+def normalize_name(text: str) -> str:
+    """
+    Case-fold and strip punctuation; Latin accents are dropped, Indic scripts
+    are kept as written.
+    """
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    stripped = "".join(
+        char
+        for char in unicodedata.normalize("NFKD", text)
+        if not unicodedata.combining(char)
+    )
+    if stripped.isascii():
+        text = stripped
+    # Letters, digits and marks make up words; \w alone would split Indic
+    # words at their vowel signs.
+    words = "".join(
+        char if unicodedata.category(char)[0] in "LMN" else " " for char in text
+    ).split()
+    kept = [word for word in words if word not in _NOISE_WORDS]
+    return " ".join(kept or words)
+
+
+def phonetic_key(name: str) -> str:
+    """
+    Spelling-insensitive form of a normalized Latin name, so Bengaluru and
+    Bengalooru or Shivamogga and Shivamoga compare equal.
+    """
+    text = name.replace(" ", "")
+    if not text.isascii():
+        return text
+    for source, target in _PHONETIC_RULES:
+        text = text.replace(source, target)
+    return _REPEAT_RE.sub(r"\1", text)
+
+
+def skeleton_key(name: str) -> str:
+    """
+    Phonetic key without vowels after the first letter; used to find
+    candidates for misspellings such as Banglore.
+    """
+    key = phonetic_key(name)
+    if not key.isascii():
+        return key
+    return key[:1] + _VOWEL_RE.sub("", key[1:])
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance, or limit + 1 once it is known to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (char_a != char_b),
+                )
+            )
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def fuzzy_limit(key: str) -> int:
+    """
+    Largest edit distance still treated as a misspelling of a name this long.
+    """
+    if len(key) <= 4:
+        return 0
+    return 1 if len(key) <= 8 else 2
+
+
+@dataclass(frozen=True)
+class Place:
+    """
+    One gazetteer entry.
+    """
+
+    name: str
+    kind: str
+    district: str
+    state: str
+    pincode: str
+    latitude: float
+    longitude: float
+    aliases: Tuple[str, ...] = ()
+
+    @property
+    def display_name(self) -> str:
+        parts = [self.name]
+        if self.district and self.district != self.name:
+            parts.append(self.district)
+        if self.state and self.state != self.name:
+            parts.append(self.state)
+        return ", ".join(parts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def read_rows(path: Path) -> List[Dict[str, str]]:
+    """
+    Read a gazetteer CSV (name, aliases, kind, district, state, pincode,
+    latitude, longitude; aliases separated by "|").
+    """
+    with open(path, newline="", encoding="utf-8") as handle:
+        return list(csv.DictReader(handle))
+
+
+def compile_index(
+    rows: Iterable[Dict[str, str]], source_size: int = 0, source_mtime_ns: int = 0
+) -> bytes:
+    """
+    Compile gazetteer rows into the binary index read by Gazetteer.
+
+    Layout: header, record table (lat, lon, text offset, text length), then
+    two key tables sorted by UTF-8 bytes (normalized names and skeleton keys,
+    each entry pointing at a record), then the string blob.
+    """
+    blob = bytearray()
+    offsets: Dict[str, Tuple[int, int]] = {}
+
+    def intern(text: str) -> Tuple[int, int]:
+        if text not in offsets:
+            data = text.encode("utf-8")
+            offsets[text] = (len(blob), len(data))
+            blob.extend(data)
+        return offsets[text]
+
+    records = bytearray()
+    keys: Dict[Tuple[str, int], None] = {}
+    skeletons: Dict[Tuple[str, int], None] = {}
+    count = 0
+    for row in rows:
+        name = (row.get("name") or "").strip()
+        if not name:
+            continue
+        try:
+            latitude = float(row["latitude"])
+            longitude = float(row["longitude"])
+        except (KeyError, TypeError, ValueError):
+            logger.warning("Skipping gazetteer row without coordinates: %s", name)
+            continue
+        kind = (row.get("kind") or "village").strip().lower()
+        pincode = (row.get("pincode") or "").strip()
+        aliases = [
+            alias.strip()
+            for alias in (row.get("aliases") or "").split("|")
+            if alias.strip()
+        ]
+        text = "\x1f".join(
+            (
+                name,
+                kind,
+                (row.get("district") or "").strip(),
+                (row.get("state") or "").strip(),
+                pincode,
+                "|".join(aliases),
+            )
+        )
+        offset, length = intern(text)
+        records.extend(_RECORD.pack(latitude, longitude, offset, length))
+
+        for value in [name, *aliases, pincode]:
+            key = normalize_name(value)
+            if not key:
+                continue
+            keys[(key, count)] = None
+            skeletons[(skeleton_key(key), count)] = None
+        count += 1
+
+    def table(entries: Dict[Tuple[str, int], None]) -> bytes:
+        packed = bytearray()
+        for key, record in sorted(entries, key=lambda item: item[0].encode("utf-8")):
+            offset, length = intern(key)
+            packed.extend(_KEY.pack(offset, length, record))
+        return bytes(packed)
+
+    key_table = table(keys)
+    skeleton_table = table(skeletons)
+    header = _HEADER.pack(
+        _MAGIC, count, len(keys), len(skeletons), source_size, source_mtime_ns
+    )
+    return header + bytes(records) + key_table + skeleton_table + bytes(blob)
+
+
+class _KeyColumn(Sequence):
+    """
+    Sorted key table as a sequence of bytes, so bisect can search it in place.
+    """
+
+    def __init__(self, buffer: Any, start: int, count: int, blob_start: int) -> None:
+        self._buffer = buffer
+        self._start = start
+        self._count = count
+        self._blob_start = blob_start
+
+    def __len__(self) -> int:
+        return self._count
+
+    def entry(self, index: int) -> Tuple[bytes, int]:
+        offset, length, record = _KEY.unpack_from(
+            self._buffer, self._start + index * _KEY.size
+        )
+        start = self._blob_start + offset
+        return bytes(self._buffer[start : start + length]), record
+
+    def __getitem__(self, index: int) -> bytes:  # type: ignore[override]
+        return self.entry(index)[0]
+
+    def records_equal(self, key: bytes) -> List[int]:
+        index = bisect.bisect_left(self, key)
+        found = []
+        while index < self._count:
+            entry_key, record = self.entry(index)
+            if entry_key != key:
+                break
+            found.append(record)
+            index += 1
+        return found
+
+    def records_with_prefix(self, prefix: bytes) -> Iterable[Tuple[bytes, int]]:
+        index = bisect.bisect_left(self, prefix)
+        while index < self._count:
+            entry_key, record = self.entry(index)
+            if not entry_key.startswith(prefix):
+                break
+            yield entry_key, record
+            index += 1
+
+
+class Gazetteer:
+    """
+    Read-only place index over a compiled buffer (an mmap for files on disk).
+    Lookups bisect the sorted key tables without unpacking the whole index.
+    """
+
+    def __init__(self, buffer: Any, handle: Optional[Any] = None) -> None:
+        magic, count, key_count, skeleton_count, size, mtime_ns = _HEADER.unpack_from(
+            buffer, 0
+        )
+        if magic != _MAGIC:
+            raise ValueError("Not a gazetteer index")
+        self._buffer = buffer
+        self._handle = handle
+        self.source_size = size
+        self.source_mtime_ns = mtime_ns
+        self._count = count
+        self._records_start = _HEADER.size
+        keys_start = self._records_start + count * _RECORD.size
+        skeletons_start = keys_start + key_count * _KEY.size
+        blob_start = skeletons_start + skeleton_count * _KEY.size
+        self._blob_start = blob_start
+        self._keys = _KeyColumn(buffer, keys_start, key_count, blob_start)
+        self._skeletons = _KeyColumn(
+            buffer, skeletons_start, skeleton_count, blob_start
+        )
+
+    @classmethod
+    def open(cls, path: Path) -> "Gazetteer":
+        handle = open(path, "rb")
+        try:
+            buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            handle.close()
+            raise
+        return cls(buffer, handle)
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "Gazetteer":
+        return cls(compile_index(read_rows(path)))
+
+    def close(self) -> None:
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        if self._handle is not None:
+            self._handle.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def place(self, record: int) -> Place:
+        latitude, longitude, offset, length = _RECORD.unpack_from(
+            self._buffer, self._records_start + record * _RECORD.size
+        )
+        start = self._blob_start + offset
+        text = bytes(self._buffer[start : start + length]).decode("utf-8")
+        name, kind, district, state, pincode, aliases = text.split("\x1f")
+        return Place(
+            name,
+            kind,
+            district,
+            state,
+            pincode,
+            latitude,
+            longitude,
+            tuple(aliases.split("|")) if aliases else (),
+        )
+
+    def exact(self, name: str) -> List[Place]:
+        """
+        Places whose name, alias or PIN code matches after normalization.
+        """
+        key = normalize_name(name)
+        if not key:
+            return []
+        records = dict.fromkeys(self._keys.records_equal(key.encode("utf-8")))
+        return [self.place(record) for record in records]
+
+    def prefix(self, text: str, limit: int = 10) -> List[Place]:
+        """
+        Places with a name or alias starting with text, for autocompletion.
+        """
+        key = normalize_name(text)
+        if not key:
+            return []
+        records: Dict[int, None] = {}
+        for _, record in self._keys.records_with_prefix(key.encode("utf-8")):
+            records[record] = None
+        places = sorted((self.place(record) for record in records), key=_rank)
+        return places[:limit]
+
+    def fuzzy(self, name: str, limit: int = 5) -> List[Tuple[Place, int]]:
+        """
+        Places within a small edit distance of name (compared phonetically),
+        closest first.
+        """
+        key = normalize_name(name)
+        max_distance = fuzzy_limit(key)
+        if not key or max_distance == 0 or not key.isascii():
+            return []
+        target = phonetic_key(key)
+        records = dict.fromkeys(
+            self._skeletons.records_equal(skeleton_key(key).encode("utf-8"))
+        )
+        if not records:
+            # Consonant typo: fall back to names sharing the first letter.
+            for entry_key, record in self._keys.records_with_prefix(
+                key[:1].encode("utf-8")
+            ):
+                if abs(len(entry_key) - len(key)) <= max_distance:
+                    records[record] = None
+        ranked = []
+        for record in records:
+            place = self.place(record)
+            distance = min(
+                edit_distance(
+                    target, phonetic_key(normalize_name(variant)), max_distance
+                )
+                for variant in (place.name, *place.aliases)
+            )
+            if distance <= max_distance:
+                ranked.append((place, distance))
+        ranked.sort(key=lambda item: (item[1], _rank(item[0])))
+        return ranked[:limit]
+
+    def resolve(self, query: str, fuzzy: bool = False) -> Optional[Place]:
+        """
+        Resolve a geocoder-style query such as "Hubli, KA, IN" or "560001"
+        to one place. Returns None when nothing matches or the match is
+        ambiguous, so the caller can fall back to the network geocoder.
+
+        Only names, aliases and PIN codes in the gazetteer are matched
+        unless fuzzy is set. A misspelling is then accepted only when a
+        state or district in the query confirms it, or, without such a
+        hint, when it differs from a single place by its vowels alone: a
+        real place missing from the gazetteer is otherwise likely to be
+        one edit away from an unrelated one (Rampur and Raipur).
+        """
+        parts = [part.strip() for part in (query or "").split(",") if part.strip()]
+        if not parts:
+            return None
+        states, districts = _hints(parts[1:])
+        places = [
+            place
+            for place in self.exact(parts[0])
+            if (not states or normalize_name(place.state) in states)
+            and (
+                not districts
+                or normalize_name(place.district) in districts
+                or place.kind == "state"
+            )
+        ]
+        if places:
+            return _unambiguous(places, bool(states or districts), query)
+        if not fuzzy:
+            return None
+
+        candidates = [place for place, _ in self.fuzzy(parts[0])]
+        if states or districts:
+            places = [
+                place
+                for place in candidates
+                if (not states or normalize_name(place.state) in states)
+                and (not districts or normalize_name(place.district) in districts)
+            ]
+            return _unambiguous(places, True, query) if places else None
+        key = skeleton_key(normalize_name(parts[0]))
+        if not candidates or any(
+            all(
+                skeleton_key(normalize_name(variant)) != key
+                for variant in (place.name, *place.aliases)
+            )
+            for place in candidates
+        ):
+            return None
+        return _unambiguous(candidates, False, query)
+
+
+def _unambiguous(places: List[Place], qualified: bool, query: str) -> Optional[Place]:
+    """
+    The preferred place, or None when unqualified matches lie far apart.
+    """
+    best = min(places, key=_rank)
+    if qualified:
+        return best
+    for place in places:
+        if (
+            abs(place.latitude - best.latitude) > _SAME_PLACE_DEGREES
+            or abs(place.longitude - best.longitude) > _SAME_PLACE_DEGREES
+        ):
+            logger.debug("Ambiguous gazetteer match for '%s'", query)
+            return None
+    return best
+
+
+def _rank(place: Place) -> Tuple[int, str]:
+    kind = KINDS.index(place.kind) if place.kind in KINDS else len(KINDS)
+    return kind, place.name
+
+
+def _hints(parts: Sequence[str]) -> Tuple[set, set]:
+    """
+    Split the qualifiers of a query into normalized state and district names.
+    """
+    states = set()
+    districts = set()
+    for part in parts:
+        key = normalize_name(part)
+        if not key or key in _COUNTRY_WORDS:
+            continue
+        if key in STATE_CODES:
+            states.add(normalize_name(STATE_CODES[key]))
+        elif key in _STATE_NAMES:
+            states.add(key)
+        else:
+            districts.add(key)
+    return states, districts
+
+
+def build_index(source: Path, destination: Path) -> Path:
+    """
+    Compile a gazetteer CSV into an index file, written atomically.
+    """
+    stat = source.stat()
+    data = compile_index(read_rows(source), stat.st_size, stat.st_mtime_ns)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    temporary = destination.with_suffix(destination.suffix + ".tmp")
+    temporary.write_bytes(data)
+    os.replace(temporary, destination)
+    return destination
+
+
+def _is_current(index_path: Path, source: Path) -> bool:
+    try:
+        stat = source.stat()
+        with open(index_path, "rb") as handle:
+            header = handle.read(_HEADER.size)
+        magic, _, _, _, size, mtime_ns = _HEADER.unpack(header)
+    except (OSError, struct.error):
+        return False
+    return magic == _MAGIC and size == stat.st_size and mtime_ns == stat.st_mtime_ns
+
+
+def load_gazetteer(source: Path, index_path: Optional[Path] = None) -> Gazetteer:
+    """
+    Open the index for a CSV, compiling it first when missing or stale. A
+    compiled index file (.idx) is opened directly.
+    """
+    if source.suffix != ".csv":
+        return Gazetteer.open(source)
+    if index_path is not None:
+        try:
+            if not _is_current(index_path, source):
+                build_index(source, index_path)
+            return Gazetteer.open(index_path)
+        except OSError as exc:
+            logger.warning("Cannot use gazetteer index %s: %s", index_path, exc)
+    return Gazetteer.from_csv(source)
+
+
+_GAZETTEER: Optional[Gazetteer] = None
+_LOAD_FAILED = False
+_LOCK = threading.Lock()
+
+
+def get_gazetteer() -> Optional[Gazetteer]:
+    """
+    Return the process-wide gazetteer, or None when it is disabled or could
+    not be loaded.
+    """
+    global _GAZETTEER, _LOAD_FAILED
+    if not is_gazetteer_enabled():
+        return None
+    if _GAZETTEER is None and not _LOAD_FAILED:
+        with _LOCK:
+            if _GAZETTEER is None and not _LOAD_FAILED:
+                try:
+                    _GAZETTEER = load_gazetteer(
+                        get_gazetteer_path(), get_gazetteer_index_path()
+                    )
+                except (OSError, ValueError, struct.error) as exc:
+                    logger.warning("Gazetteer unavailable: %s", exc)
+                    _LOAD_FAILED = True
+    return _GAZETTEER
+
+
+def _main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="KrishiGPT offline gazetteer")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="compile a CSV into an index file")
+    build.add_argument("source", type=Path)
+    build.add_argument("destination", type=Path)
+    lookup = commands.add_parser("lookup", help="resolve a place name")
+    lookup.add_argument("query")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        path = build_index(args.source, args.destination)
+        print(f"{len(Gazetteer.open(path))} places written to {path}")
+        return 0
+
+    gazetteer = get_gazetteer()
+    if gazetteer is None:
+        print("Gazetteer is disabled", file=sys.stderr)
+        return 1
+    place = gazetteer.resolve(args.query)
+    suggestion = place or gazetteer.resolve(args.query, fuzzy=True)
+    result: Dict[str, Any] = {"query": args.query, "match": None}
+    if place is not None:
+        result["match"] = place.to_dict()
+    elif suggestion is not None:
+        result["suggestion"] = suggestion.to_dict()
+    else:
+        result["candidates"] = [
+            {**place.to_dict(), "distance": distance}
+            for place, distance in gazetteer.fuzzy(args.query.split(",")[0])
+        ]
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
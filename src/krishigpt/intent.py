@@ -0,0 +1,396 @@
+from __future__ import annotations
+
+import json
+import logging
+import math
+import re
+import sys
+import threading
+import zlib
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .config import get_router_log_path, get_router_model_path
+
+logger = logging.getLogger(__name__)
+
+WEATHER_AGENT = "WeatherAgent"
+MARKET_AGENT = "MarketAgent"
+FARMING_AGENT = "FarmingAgent"
+INTENTS = (WEATHER_AGENT, MARKET_AGENT, FARMING_AGENT)
+
+# Label recorded when the coordinator answered without delegating.
+CLARIFICATION = "clarification"
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Keyword lexicon per intent. Multi-word entries are matched on bigrams.
+_LEXICON: Dict[str, Tuple[str, ...]] = {
+    WEATHER_AGENT: tuple(
+        """weather temperature rain rainfall raining forecast humidity humid wind
+        windy climate monsoon storm cloudy sunny hot cold frost heatwave drizzle
+        thunderstorm degrees celsius""".split()
+    ),
+    MARKET_AGENT: tuple(
+        """mandi apmc price prices rate rates bhav market markets modal quintal
+        selling sell arrival""".split()
+    )
+    + ("today price", "market price", "mandi rate"),
+    FARMING_AGENT: tuple(
+        """pest pests disease fertilizer fertiliser manure soil irrigation
+        irrigate sowing sow seed seeds variety harvest yield spray pesticide
+        fungicide weed crop crops cultivation grow plant whitefly aphid cpi wpi
+        iip plfs nas asi mospi statistics survey index inflation scheme subsidy
+        organic compost""".split()
+    ),
+}
+
+# Seed examples used when no trained model file is configured.
+_SEED_EXAMPLES: Tuple[Tuple[str, str], ...] = (
+    tuple(
+        (query, WEATHER_AGENT)
+        for query in (
+            "what is the weather like in mumbai today",
+            "will it rain in bangalore tomorrow",
+            "weather in mysuru today",
+            "temperature in delhi this week",
+            "is there a rain forecast for nashik",
+            "how humid will it be in chennai",
+            "wind speed in bhopal today",
+            "will there be frost in ludhiana tonight",
+            "what is the forecast for the next five days in pune",
+            "how hot will it be in nagpur tomorrow",
+            "is monsoon arriving in kerala this week",
+            "weather report for hubli",
+            "will it be cloudy in indore",
+            "rain chances in dharwad",
+        )
+    )
+    + tuple(
+        (query, MARKET_AGENT)
+        for query in (
+            "tomato price karnataka",
+            "what is the current mandi price of onions in maharashtra",
+            "soybean prices in madhya pradesh mandis",
+            "today's cotton rate in gujarat",
+            "apmc price of potato in uttar pradesh",
+            "onion rate in lasalgaon market",
+            "what is the modal price of wheat in punjab",
+            "market rate for tomato in kolar district",
+            "where can i sell my groundnut for the best price",
+            "paddy price per quintal in andhra pradesh",
+            "mandi bhav of chilli in guntur",
+            "latest arrival prices for banana in tamil nadu",
+            "which mandi pays most for cotton",
+            "is onion price rising this month in nashik mandi",
+        )
+    )
+    + tuple(
+        (query, FARMING_AGENT)
+        for query in (
+            "how to protect tomato plants from pests",
+            "best time to plant wheat in punjab",
+            "which fertilizer should i use for paddy",
+            "how to control whitefly in cotton",
+            "cotton whitefly control method",
+            "which soil is best for growing ragi in karnataka",
+            "how much water does sugarcane need",
+            "my maize leaves are turning yellow what should i do",
+            "how to make organic compost at home",
+            "which vegetable increased by more than 20 percent compared to last year",
+            "what is the wholesale price index of wheat in the latest year",
+            "cpi inflation for pulses",
+            "government scheme for drip irrigation subsidy",
+            "how to improve soil health",
+            "when should i spray fungicide on grapes",
+            "seed variety recommendation for groundnut",
+        )
+    )
+)
+
+
+@dataclass(frozen=True)
+class IntentPrediction:
+    """
+    Routing decision from the local classifier.
+    """
+
+    agent: str
+    confidence: float
+    scores: Dict[str, float]
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def _features(text: str, dimensions: int) -> Dict[int, float]:
+    """
+    Hash word unigrams, word bigrams and character trigrams into a sparse,
+    L2-normalized feature vector.
+    """
+    tokens = tokenize(text)
+    raw: List[str] = [f"w:{token}" for token in tokens]
+    raw.extend(f"b:{left}_{right}" for left, right in zip(tokens, tokens[1:]))
+    for token in tokens:
+        padded = f" {token} "
+        raw.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    counts: Counter = Counter(
+        zlib.crc32(feature.encode("utf-8")) % dimensions for feature in raw
+    )
+    norm = math.sqrt(sum(value * value for value in counts.values())) or 1.0
+    return {index: value / norm for index, value in counts.items()}
+
+
+class HashedNgramClassifier:
+    """
+    Multinomial logistic regression over hashed n-gram features.
+    """
+
+    def __init__(self, labels: Sequence[str] = INTENTS, dimensions: int = 1 << 14):
+        self.labels = list(labels)
+        self.dimensions = dimensions
+        self.weights: Dict[str, Dict[int, float]] = {label: {} for label in self.labels}
+        self.bias: Dict[str, float] = {label: 0.0 for label in self.labels}
+
+    def logits(self, text: str) -> Dict[str, float]:
+        features = _features(text, self.dimensions)
+        return {
+            label: self.bias[label]
+            + sum(
+                self.weights[label].get(index, 0.0) * value
+                for index, value in features.items()
+            )
+            for label in self.labels
+        }
+
+    def train(
+        self,
+        examples: Iterable[Tuple[str, str]],
+        epochs: int = 30,
+        learning_rate: float = 0.5,
+        l2: float = 1e-4,
+    ) -> "HashedNgramClassifier":
+        """
+        Fit the model with plain SGD on (query, label) pairs.
+        """
+        data = [
+            (_features(text, self.dimensions), label)
+            for text, label in examples
+            if label in self.bias
+        ]
+        for _ in range(epochs):
+            for features, label in data:
+                probabilities = _softmax(
+                    {
+                        name: self.bias[name]
+                        + sum(
+                            self.weights[name].get(i, 0.0) * v
+                            for i, v in features.items()
+                        )
+                        for name in self.labels
+                    }
+                )
+                for name in self.labels:
+                    gradient = probabilities[name] - (1.0 if name == label else 0.0)
+                    weights = self.weights[name]
+                    for index, value in features.items():
+                        current = weights.get(index, 0.0)
+                        weights[index] = current - learning_rate * (
+                            gradient * value + l2 * current
+                        )
+                    self.bias[name] -= learning_rate * gradient
+        return self
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "labels": self.labels,
+            "dimensions": self.dimensions,
+            "bias": self.bias,
+            "weights": {
+                label: {
+                    str(index): round(value, 6)
+                    for index, value in weights.items()
+                    if value
+                }
+                for label, weights in self.weights.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> "HashedNgramClassifier":
+        model = cls(labels=data["labels"], dimensions=int(data["dimensions"]))
+        model.bias = {label: float(value) for label, value in data["bias"].items()}
+        model.weights = {
+            label: {int(index): float(value) for index, value in weights.items()}
+            for label, weights in data["weights"].items()
+        }
+        return model
+
+    def save(self, path: Path) -> None:
+        Path(path).write_text(json.dumps(self.to_dict()), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Path) -> "HashedNgramClassifier":
+        return cls.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+def _softmax(logits: Dict[str, float]) -> Dict[str, float]:
+    peak = max(logits.values())
+    exps = {label: math.exp(value - peak) for label, value in logits.items()}
+    total = sum(exps.values())
+    return {label: value / total for label, value in exps.items()}
+
+
+def _lexicon_hits(text: str) -> Dict[str, int]:
+    tokens = tokenize(text)
+    grams = set(tokens) | {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+    return {
+        intent: len(grams.intersection(words)) for intent, words in _LEXICON.items()
+    }
+
+
+class IntentRouter:
+    """
+    Combine keyword rules with the hashed n-gram model to pick a specialist.
+    """
+
+    def __init__(
+        self, model: Optional[HashedNgramClassifier] = None, rule_weight: float = 1.5
+    ) -> None:
+        self.model = model or HashedNgramClassifier().train(_SEED_EXAMPLES)
+        self.rule_weight = rule_weight
+
+    def classify(self, query: str) -> IntentPrediction:
+        logits = self.model.logits(query)
+        for intent, hits in _lexicon_hits(query).items():
+            logits[intent] = logits.get(intent, 0.0) + self.rule_weight * hits
+        scores = _softmax(logits)
+        agent = max(scores, key=scores.get)
+        return IntentPrediction(
+            agent=agent,
+            confidence=round(scores[agent], 4),
+            scores={label: round(value, 4) for label, value in scores.items()},
+        )
+
+
+class RoutingStats:
+    """
+    Track how often the local prediction agrees with the LLM coordinator,
+    bucketed by confidence, so the routing threshold can be tuned.
+    """
+
+    def __init__(self, log_path: Optional[Path] = None) -> None:
+        self._lock = threading.Lock()
+        self._log_path = Path(log_path) if log_path else None
+        self.local_routes: Counter = Counter()
+        self.llm_fallbacks = 0
+        self._buckets: Dict[float, List[int]] = defaultdict(lambda: [0, 0])
+
+    @staticmethod
+    def _bucket(confidence: float) -> float:
+        return min(math.floor(confidence * 10) / 10, 0.9)
+
+    def record_local(self, prediction: IntentPrediction) -> None:
+        with self._lock:
+            self.local_routes[prediction.agent] += 1
+
+    def record_comparison(
+        self, query: str, prediction: IntentPrediction, llm_decision: str
+    ) -> None:
+        """
+        Record the LLM coordinator's decision for a query the router also scored.
+        """
+        agreed = prediction.agent == llm_decision
+        with self._lock:
+            self.llm_fallbacks += 1
+            bucket = self._buckets[self._bucket(prediction.confidence)]
+            bucket[0] += int(agreed)
+            bucket[1] += 1
+            if self._log_path:
+                record = {
+                    "query": query,
+                    "predicted": prediction.agent,
+                    "confidence": prediction.confidence,
+                    "label": llm_decision,
+                }
+                try:
+                    with self._log_path.open("a", encoding="utf-8") as handle:
+                        handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+                except OSError as exc:
+                    logger.warning("Unable to write routing log: %s", exc)
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            compared = sum(total for _, total in self._buckets.values())
+            agreed = sum(hits for hits, _ in self._buckets.values())
+            return {
+                "local_routes": dict(self.local_routes),
+                "llm_fallbacks": self.llm_fallbacks,
+                "agreement": round(agreed / compared, 4) if compared else None,
+                "agreement_by_confidence": {
+                    f"{bucket:.1f}": {
+                        "agreed": hits,
+                        "total": total,
+                        "accuracy": round(hits / total, 4),
+                    }
+                    for bucket, (hits, total) in sorted(self._buckets.items())
+                },
+            }
+
+
+def load_labelled_queries(path: Path) -> List[Tuple[str, str]]:
+    """
+    Read (query, label) pairs from a JSONL routing log, skipping clarifications.
+    """
+    examples = []
+    with Path(path).open(encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record.get("label") in INTENTS and record.get("query"):
+                examples.append((record["query"], record["label"]))
+    return examples
+
+
+_ROUTER: Optional[IntentRouter] = None
+_STATS: Optional[RoutingStats] = None
+_LOCK = threading.Lock()
+
+
+def get_intent_router() -> IntentRouter:
+    global _ROUTER
+    if _ROUTER is None:
+        with _LOCK:
+            if _ROUTER is None:
+                model_path = get_router_model_path()
+                model = None
+                if model_path and Path(model_path).exists():
+                    model = HashedNgramClassifier.load(Path(model_path))
+                _ROUTER = IntentRouter(model=model)
+    return _ROUTER
+
+
+def get_routing_stats() -> RoutingStats:
+    global _STATS
+    if _STATS is None:
+        with _LOCK:
+            if _STATS is None:
+                _STATS = RoutingStats(log_path=get_router_log_path())
+    return _STATS
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(
+            "Usage: python -m krishigpt.intent <routing_log.jsonl> <model.json>",
+            file=sys.stderr,
+        )
+        sys.exit(2)
+    training = list(_SEED_EXAMPLES) + load_labelled_queries(Path(sys.argv[1]))
+    HashedNgramClassifier().train(training).save(Path(sys.argv[2]))
+    print(json.dumps({"status": "success", "examples": len(training)}))
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import math
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+SUPPORTED_LANGUAGES = (
+    "en-IN",
+    "hi-IN",
+    "bn-IN",
+    "gu-IN",
+    "kn-IN",
+    "ml-IN",
+    "mr-IN",
+    "od-IN",
+    "pa-IN",
+    "ta-IN",
+    "te-IN",
+)
+
+# Unicode blocks for the Indic scripts we support, mapped to a language code.
+# Devanagari is shared by Hindi and Marathi and is resolved separately.
+_SCRIPT_RANGES: Tuple[Tuple[int, int, str, Optional[str]], ...] = (
+    (0x0900, 0x097F, "Devanagari", None),
+    (0x0980, 0x09FF, "Bengali", "bn-IN"),
+    (0x0A00, 0x0A7F, "Gurmukhi", "pa-IN"),
+    (0x0A80, 0x0AFF, "Gujarati", "gu-IN"),
+    (0x0B00, 0x0B7F, "Oriya", "od-IN"),
+    (0x0B80, 0x0BFF, "Tamil", "ta-IN"),
+    (0x0C00, 0x0C7F, "Telugu", "te-IN"),
+    (0x0C80, 0x0CFF, "Kannada", "kn-IN"),
+    (0x0D00, 0x0D7F, "Malayalam", "ml-IN"),
+)
+
+_HINDI_MARKERS = frozenset(
+    "है हैं था थी थे का की के में से को क्या नहीं और कैसे कितना कितनी मुझे "
+    "हमें आज कल बारे चाहिए रहा रही लिए".split()
+)
+_MARATHI_MARKERS = frozenset(
+    "आहे आहेत होते नाही काय मध्ये कसे किती मला आम्हाला आज उद्या बद्दल "
+    "पाहिजे साठी आणि चा ची चे च्या ला".split()
+)
+
+# Seed text for the character n-gram model that separates English from
+# romanized Hindi/Kannada. Kept small on purpose; it only has to tell
+# "plain English" apart from "needs a closer look".
+_SEED_CORPORA: Dict[str, str] = {
+    "en-IN": """
+what is the weather like in mumbai today
+will it rain in bangalore tomorrow
+what is the current mandi price of onions in maharashtra
+how to protect tomato plants from pests
+best time to plant wheat in punjab
+which fertilizer should i use for paddy
+how much water does sugarcane need every week
+tell me the temperature and humidity forecast for this week
+what are the soybean prices in madhya pradesh markets
+how can i control whitefly in cotton
+which vegetable increased by more than twenty percent compared to last year
+what is the wholesale price index of wheat in the latest year
+when should i spray pesticide on my chilli crop
+is there any government scheme for drip irrigation
+my maize leaves are turning yellow what should i do
+give me the market rate for tomato in kolar district
+how to improve soil health with organic manure
+what is the minimum support price for rice this season
+should i irrigate my field before the rain
+please suggest the right seed variety for groundnut
+""",
+    "hi-Latn": """
+aaj mumbai mein mausam kaisa hai
+kal bangalore mein baarish hogi kya
+pyaaz ka mandi bhav kya hai maharashtra mein
+tamatar ke paudhon ko keedon se kaise bachayein
+punjab mein gehu bone ka sahi samay kya hai
+dhaan ke liye kaunsa khaad dalna chahiye
+ganne ko har hafte kitna paani chahiye
+is hafte ka taapmaan aur nami batao
+kapas mein safed makkhi ko kaise roke
+mujhe fasal ki sinchai ke baare mein jaankari chahiye
+meri makka ki pattiyan peeli ho rahi hai kya karu
+kolar mein tamatar ka bhav kya chal raha hai
+mitti ki sehat kaise sudhare gobar khaad se
+is mausam mein dhaan ka samarthan mulya kitna hai
+kya mujhe baarish se pehle khet mein paani dena chahiye
+mirchi ki fasal par dawai kab chidakna chahiye
+""",
+    "kn-Latn": """
+indu mysuru nalli havamana hege ide
+naale bengaluru nalli male baruttada
+eerulli bele eshtu ide
+tomato gidagalannu keetagalinda hege rakshisabeku
+bhatta bele ge yava gobbara haakabeku
+nanna hola ke neeru yavaga kodabeku
+ee vaara ushnamana mattu aardrate heli
+raagi beleyalu yava mannu uttama
+hatti beleyalli bili nonagalannu hege niyantrisuvudu
+kolar nalli tomato dara eshtu
+""",
+}
+
+# Words that are unambiguously English in our traffic. Short queries such as
+# "tomato price Karnataka" carry too few n-grams to be decided on their own.
+_ENGLISH_LEXICON = frozenset((_SEED_CORPORA["en-IN"] + """
+a an and are at be by can do does for from get has have how i in is it its
+me my near next not of on or per please price prices rate rates should the
+this to today tomorrow week what when where which who why will with yesterday
+weather rain rainfall forecast temperature humidity wind climate cold hot
+crop crops farm farming field seed seeds soil water pest pests disease
+fertilizer fertiliser manure irrigation spray harvest sowing yield market
+mandi markets commodity apmc district state latest trend index survey data
+onion potato tomato wheat rice paddy maize cotton sugarcane soybean groundnut
+chilli banana mango coconut ragi jowar bajra gram tur moong urad mustard
+""").split())
+
+_LATIN_WORD_RE = re.compile(r"[a-z]+")
+_DEVANAGARI_WORD_RE = re.compile(r"[\u0900-\u0963\u0970-\u097F]+")
+
+
+@dataclass(frozen=True)
+class LanguageDetection:
+    """
+    Result of deterministic language detection.
+    """
+
+    language: str
+    confidence: float
+    script: str
+
+
+class CharNgramModel:
+    """
+    Tiny naive-Bayes character n-gram model for Latin-script text.
+    """
+
+    def __init__(self, corpora: Dict[str, str], n: int = 3) -> None:
+        self.n = n
+        self._log_probs: Dict[str, Dict[str, float]] = {}
+        self._unseen: Dict[str, float] = {}
+        vocabulary = set()
+        counts: Dict[str, Counter] = {}
+        for label, text in corpora.items():
+            counts[label] = Counter(self._ngrams(text))
+            vocabulary.update(counts[label])
+        vocab_size = len(vocabulary) + 1
+        for label, counter in counts.items():
+            total = sum(counter.values()) + vocab_size
+            self._log_probs[label] = {
+                gram: math.log((count + 1) / total) for gram, count in counter.items()
+            }
+            self._unseen[label] = math.log(1 / total)
+
+    @property
+    def labels(self) -> List[str]:
+        return list(self._log_probs)
+
+    def _ngrams(self, text: str) -> List[str]:
+        grams: List[str] = []
+        for word in _LATIN_WORD_RE.findall(text.lower()):
+            padded = f" {word} "
+            if len(padded) < self.n:
+                grams.append(padded)
+                continue
+            grams.extend(
+                padded[i : i + self.n] for i in range(len(padded) - self.n + 1)
+            )
+        return grams
+
+    def probabilities(self, text: str) -> Dict[str, float]:
+        """
+        Return the (tempered) posterior probability of every label.
+        """
+        grams = self._ngrams(text)
+        if not grams:
+            return {label: 0.0 for label in self.labels}
+        scores = {}
+        for label, log_probs in self._log_probs.items():
+            unseen = self._unseen[label]
+            scores[label] = sum(log_probs.get(gram, unseen) for gram in grams)
+        best = max(scores, key=scores.get)
+        # Temper the naive-Bayes posterior so long queries do not saturate to
+        # 1.0 on a handful of shared n-grams.
+        scale = 1.0 / math.log2(len(grams) + 1)
+        weights = {
+            label: math.exp((score - scores[best]) * scale)
+            for label, score in scores.items()
+        }
+        total = sum(weights.values())
+        return {label: weight / total for label, weight in weights.items()}
+
+
+_NGRAM_MODEL: Optional[CharNgramModel] = None
+
+
+def _get_ngram_model() -> CharNgramModel:
+    global _NGRAM_MODEL
+    if _NGRAM_MODEL is None:
+        _NGRAM_MODEL = CharNgramModel(_SEED_CORPORA)
+    return _NGRAM_MODEL
+
+
+def _script_of(char: str) -> Optional[Tuple[str, Optional[str]]]:
+    code_point = ord(char)
+    for start, end, script, language in _SCRIPT_RANGES:
+        if start <= code_point <= end:
+            return script, language
+    if char.isascii() and char.isalpha():
+        return "Latin", None
+    return None
+
+
+def _english_probability(text: str) -> float:
+    words = _LATIN_WORD_RE.findall(text.lower())
+    if not words:
+        return 0.0
+    ngram_probability = _get_ngram_model().probabilities(text).get("en-IN", 0.0)
+    lexicon_share = sum(word in _ENGLISH_LEXICON for word in words) / len(words)
+    # Treat the two signals as independent evidence for English.
+    return 1.0 - (1.0 - ngram_probability) * (1.0 - 0.9 * lexicon_share)
+
+
+def _resolve_devanagari(text: str) -> Tuple[str, float]:
+    words = set(_DEVANAGARI_WORD_RE.findall(unicodedata.normalize("NFC", text)))
+    hindi_hits = len(words & _HINDI_MARKERS)
+    marathi_hits = len(words & _MARATHI_MARKERS)
+    # "ळ" is common in Marathi and essentially absent from Hindi.
+    if "ळ" in text:
+        marathi_hits += 1
+    if hindi_hits == marathi_hits:
+        # Hindi dominates our Devanagari traffic, but this is a guess.
+        return "hi-IN", 0.6
+    if hindi_hits > marathi_hits:
+        return "hi-IN", 0.75 + 0.25 * hindi_hits / (hindi_hits + marathi_hits)
+    return "mr-IN", 0.75 + 0.25 * marathi_hits / (hindi_hits + marathi_hits)
+
+
+def detect_language(text: str) -> LanguageDetection:
+    """
+    Detect the language of a query from Unicode script ranges, falling back to
+    a character n-gram model for Latin-script text.
+    """
+    script_counts: Counter = Counter()
+    script_language: Dict[str, Optional[str]] = {}
+    for char in text or "":
+        resolved = _script_of(char)
+        if resolved is None:
+            continue
+        script, language = resolved
+        script_counts[script] += 1
+        script_language[script] = language
+
+    letters = sum(script_counts.values())
+    if not letters:
+        return LanguageDetection(language="en-IN", confidence=0.0, script="Unknown")
+
+    script, count = script_counts.most_common(1)[0]
+    share = count / letters
+
+    if script == "Latin":
+        english = _english_probability(text)
+        if english < 0.5:
+            # Romanized Indic text is left to the LLM stage to interpret.
+            probabilities = _get_ngram_model().probabilities(text)
+            label = max(probabilities, key=probabilities.get)
+            return LanguageDetection(
+                language=label.replace("-Latn", "-IN"),
+                confidence=0.0,
+                script=script,
+            )
+        return LanguageDetection(
+            language="en-IN", confidence=round(english * share, 3), script=script
+        )
+
+    if script == "Devanagari":
+        language, confidence = _resolve_devanagari(text)
+    else:
+        language, confidence = script_language[script] or "en-IN", 1.0
+
+    return LanguageDetection(
+        language=language, confidence=round(confidence * share, 3), script=script
+    )
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: rate tokens per second, bursting to capacity.
+
+    charge() takes tokens even when that leaves the bucket in debt, for calls
+    that must happen anyway (a user is waiting) but should still count
+    against the budget that optional work such as prefetching draws from.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = max(rate, 0.0)
+        self.capacity = max(capacity if capacity is not None else rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def charge(self, tokens: float = 1.0) -> None:
+        with self._lock:
+            self._refill()
+            self._tokens -= tokens
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """
+        Seconds until tokens are available (0 if they are now).
+        """
+        with self._lock:
+            self._refill()
+            missing = tokens - self._tokens
+        if missing <= 0:
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return missing / self.rate
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Block until tokens are taken; False if that would exceed timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.try_acquire(tokens):
+            wait = self.wait_time(tokens)
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(min(wait, 1.0))
+        return True
+
+    async def acquire_async(
+        self, tokens: float = 1.0, timeout: Optional[float] = None
+    ) -> bool:
+        """
+        Async counterpart of acquire that sleeps without blocking the loop.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while not self.try_acquire(tokens):
+            wait = self.wait_time(tokens)
+            if deadline is not None and loop.time() + wait > deadline:
+                return False
+            await asyncio.sleep(min(wait, 1.0))
+        return True
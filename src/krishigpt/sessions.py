@@ -0,0 +1,836 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event
+from google.adk.sessions import (
+    BaseSessionService,
+    InMemorySessionService,
+    Session,
+    State,
+)
+from google.adk.sessions.base_session_service import (
+    GetSessionConfig,
+    ListSessionsResponse,
+)
+
+from .config import (
+    get_session_backend,
+    get_session_db_path,
+    get_session_idle_ttl,
+    get_session_max_count,
+    get_session_max_events,
+)
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_KEY = "conversation_summary"
+# Exchanges kept in the summary and characters kept per side of an exchange.
+SUMMARY_TURNS = 5
+SUMMARY_CHARS = 200
+
+SessionKey = Tuple[str, str, str]
+# Longest pause, in seconds, between retries of a failed event write.
+MAX_WRITE_BACKOFF = 5.0
+
+
+def _clip(text: str, limit: int = SUMMARY_CHARS) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[: limit - 3].rstrip() + "..."
+
+
+def _event_text(event: Event) -> str:
+    if not event.content or not event.content.parts:
+        return ""
+    return "".join(part.text or "" for part in event.content.parts).strip()
+
+
+def summarize_turns(events: List[Event]) -> List[str]:
+    """
+    One "Farmer: ... / Assistant: ..." line per invocation in events.
+    """
+    turns: "OrderedDict[str, List[str]]" = OrderedDict()
+    for event in events:
+        question, answer = turns.setdefault(event.invocation_id, ["", ""])
+        if event.author == "user":
+            question = question or _event_text(event)
+        delta = event.actions.state_delta if event.actions else None
+        if delta and isinstance(delta.get("final_response"), str):
+            answer = delta["final_response"]
+        turns[event.invocation_id] = [question, answer]
+    return [
+        f"Farmer: {_clip(question)} / Assistant: {_clip(answer)}"
+        for question, answer in turns.values()
+        if question
+    ]
+
+
+def compact_events(session: Session, max_events: int, keep_invocation: str) -> int:
+    """
+    Drop the oldest turns until the session holds at most max_events events,
+    folding them into the conversation_summary state key. Events of the
+    running invocation are never dropped. Returns the number removed.
+    """
+    overflow = len(session.events) - max_events
+    if overflow <= 0:
+        return 0
+    # Cut on an invocation boundary so no turn is kept half-way.
+    cut = 0
+    while cut < len(session.events) and (
+        cut < overflow
+        or session.events[cut].invocation_id == session.events[cut - 1].invocation_id
+    ):
+        if session.events[cut].invocation_id == keep_invocation:
+            break
+        cut += 1
+    if cut == 0:
+        return 0
+
+    dropped = session.events[:cut]
+    del session.events[:cut]
+    previous = session.state.get(SUMMARY_KEY) or ""
+    lines = [line for line in previous.splitlines() if line]
+    lines.extend(summarize_turns(dropped))
+    session.state[SUMMARY_KEY] = "\n".join(lines[-SUMMARY_TURNS:])
+    return cut
+
+
+class BoundedSessionService(InMemorySessionService):
+    """
+    In-memory session service with a cap on the number of sessions, idle-TTL
+    eviction and a per-session event cap. Events beyond the cap are compacted
+    into a short conversation_summary state value.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 10_000,
+        idle_ttl: float = 6 * 3600,
+        max_events: int = 40,
+    ) -> None:
+        super().__init__()
+        self.max_sessions = max(1, max_sessions)
+        self.idle_ttl = idle_ttl
+        self.max_events = max(1, max_events)
+        self._last_access: "OrderedDict[SessionKey, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+        self.compacted_events = 0
+
+    def _touch(self, key: SessionKey) -> None:
+        with self._lock:
+            self._last_access[key] = time.monotonic()
+            self._last_access.move_to_end(key)
+
+    def _drop(self, key: SessionKey) -> None:
+        app_name, user_id, session_id = key
+        user_sessions = self.sessions.get(app_name, {}).get(user_id)
+        if user_sessions is not None:
+            user_sessions.pop(session_id, None)
+            if not user_sessions:
+                self.sessions[app_name].pop(user_id, None)
+        self._last_access.pop(key, None)
+
+    def _evict(self) -> None:
+        deadline = time.monotonic() - self.idle_ttl
+        with self._lock:
+            while self._last_access:
+                key, last_access = next(iter(self._last_access.items()))
+                if (
+                    last_access > deadline
+                    and len(self._last_access) <= self.max_sessions
+                ):
+                    break
+                self._drop(key)
+                self.evicted += 1
+
+    def _is_expired(self, key: SessionKey) -> bool:
+        with self._lock:
+            last_access = self._last_access.get(key)
+        return (
+            last_access is not None and time.monotonic() - last_access > self.idle_ttl
+        )
+
+    def _storage_session(self, session: Session) -> Optional[Session]:
+        return (
+            self.sessions.get(session.app_name, {})
+            .get(session.user_id, {})
+            .get(session.id)
+        )
+
+    async def create_session(
+        self, *, app_name: str, user_id: str, **kwargs: Any
+    ) -> Session:
+        # Expire idle sessions first so a stale id can be created afresh.
+        self._evict()
+        session = await super().create_session(
+            app_name=app_name, user_id=user_id, **kwargs
+        )
+        self._touch((app_name, user_id, session.id))
+        self._evict()
+        return session
+
+    async def get_session(
+        self, *, app_name: str, user_id: str, session_id: str, **kwargs: Any
+    ) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        if self._is_expired(key):
+            with self._lock:
+                self._drop(key)
+                self.evicted += 1
+            return None
+        session = await super().get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, **kwargs
+        )
+        if session is not None:
+            self._touch(key)
+        return session
+
+    async def delete_session(
+        self, *, app_name: str, user_id: str, session_id: str
+    ) -> None:
+        await super().delete_session(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+        with self._lock:
+            self._last_access.pop((app_name, user_id, session_id), None)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await super().append_event(session=session, event=event)
+        if event.partial:
+            return event
+        self._touch((session.app_name, session.user_id, session.id))
+
+        storage_session = self._storage_session(session)
+        removed = compact_events(session, self.max_events, event.invocation_id)
+        if storage_session is not None and storage_session is not session:
+            compact_events(storage_session, self.max_events, event.invocation_id)
+        if removed:
+            self.compacted_events += removed
+            logger.debug(
+                "Compacted %d events of session %s into a summary.",
+                removed,
+                session.id,
+            )
+        return event
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "sessions": len(self._last_access),
+                "evicted": self.evicted,
+                "compacted_events": self.compacted_events,
+            }
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT '{}',
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id)
+);
+CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated_at);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_session
+    ON events (app_name, user_id, session_id, id);
+CREATE TABLE IF NOT EXISTS app_states (
+    app_name TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id)
+);
+"""
+
+
+class _PendingEvent:
+    __slots__ = ("key", "timestamp", "payload", "deltas")
+
+    def __init__(
+        self,
+        key: SessionKey,
+        timestamp: float,
+        payload: Optional[str],
+        deltas: Dict[str, Dict[str, Any]],
+    ) -> None:
+        self.key = key
+        self.timestamp = timestamp
+        self.payload = payload
+        self.deltas = deltas
+
+
+def _split_state(state: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    deltas: Dict[str, Dict[str, Any]] = {"app": {}, "user": {}, "session": {}}
+    for key, value in (state or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            deltas["app"][key[len(State.APP_PREFIX) :]] = value
+        elif key.startswith(State.USER_PREFIX):
+            deltas["user"][key[len(State.USER_PREFIX) :]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            deltas["session"][key] = value
+    return deltas
+
+
+class SqliteSessionService(BaseSessionService):
+    """
+    Session service persisted in a single SQLite file so sessions survive
+    restarts and can be shared by several worker processes.
+
+    The database runs in WAL mode with one connection per thread. Events are
+    appended to an in-process queue and written by a background thread in
+    batched transactions; reads flush the queue first, so callers always see
+    their own writes. The async methods do their SQLite work in a worker
+    thread, so a slow disk or a locked database never stalls the event loop.
+    A second background thread prunes idle sessions, trims event history and
+    reclaims free pages. The same session bounds and history compaction as
+    BoundedSessionService apply.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_sessions: int = 10_000,
+        idle_ttl: float = 6 * 3600,
+        max_events: int = 40,
+        batch_size: int = 256,
+        flush_interval: float = 0.05,
+        prune_interval: float = 300.0,
+    ) -> None:
+        self.path = Path(path)
+        self.max_sessions = max(1, max_sessions)
+        self.idle_ttl = idle_ttl
+        self.max_events = max(1, max_events)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.prune_interval = prune_interval
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._local = threading.local()
+        self._pending: "queue.Queue[_PendingEvent]" = queue.Queue()
+        # Events of a batch whose transaction failed, written before anything
+        # newer; guarded by _write_lock.
+        self._failed: List[_PendingEvent] = []
+        self._write_lock = threading.Lock()
+        self._closed = threading.Event()
+
+        conn = self._conn()
+        # auto_vacuum only takes effect before the first table is created.
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.executescript(_SCHEMA)
+
+        self._writer = threading.Thread(
+            target=self._write_loop, name="krishigpt-session-writer", daemon=True
+        )
+        self._writer.start()
+        self._pruner: Optional[threading.Thread] = None
+        if prune_interval > 0:
+            self._pruner = threading.Thread(
+                target=self._prune_loop, name="krishigpt-session-pruner", daemon=True
+            )
+            self._pruner.start()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    # -- write path -------------------------------------------------------
+
+    def _write_loop(self) -> None:
+        backoff = self.flush_interval
+        while not self._closed.is_set():
+            first: Optional[_PendingEvent] = None
+            if self._failed:
+                # Retry the failed batch after a growing pause.
+                if self._closed.wait(backoff):
+                    break
+            else:
+                try:
+                    first = self._pending.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    continue
+            try:
+                self._flush_pending(first)
+                backoff = self.flush_interval
+            except sqlite3.Error as exc:
+                logger.error(
+                    "Session event write failed, retrying in %.2fs: %s", backoff, exc
+                )
+                backoff = min(backoff * 2, MAX_WRITE_BACKOFF)
+
+    def _flush_pending(self, first: Optional[_PendingEvent] = None) -> int:
+        """
+        Write queued events in batched transactions; returns the number written.
+        A failed batch is kept for the next flush and the error re-raised, so
+        readers find out instead of missing the events.
+        """
+        written = 0
+        with self._write_lock:
+            batch: List[_PendingEvent] = self._failed
+            self._failed = []
+            if first is not None:
+                batch.append(first)
+            while True:
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._pending.get_nowait())
+                    except queue.Empty:
+                        break
+                if not batch:
+                    return written
+                try:
+                    self._write_batch(batch)
+                except BaseException:
+                    self._failed = batch
+                    raise
+                written += len(batch)
+                batch = []
+
+    def _write_batch(self, batch: List[_PendingEvent]) -> None:
+        session_deltas: Dict[SessionKey, Dict[str, Any]] = {}
+        user_deltas: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        app_deltas: Dict[str, Dict[str, Any]] = {}
+        updated: Dict[SessionKey, float] = {}
+        rows = []
+        for item in batch:
+            app_name, user_id, _ = item.key
+            if item.payload is not None:
+                rows.append((*item.key, item.timestamp, item.payload))
+            updated[item.key] = max(updated.get(item.key, 0.0), item.timestamp)
+            if item.deltas["session"]:
+                session_deltas.setdefault(item.key, {}).update(item.deltas["session"])
+            if item.deltas["user"]:
+                user_deltas.setdefault((app_name, user_id), {}).update(
+                    item.deltas["user"]
+                )
+            if item.deltas["app"]:
+                app_deltas.setdefault(app_name, {}).update(item.deltas["app"])
+
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT INTO events (app_name, user_id, session_id, timestamp, payload) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            for key, delta in session_deltas.items():
+                row = conn.execute(
+                    "SELECT state FROM sessions "
+                    "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                    key,
+                ).fetchone()
+                if row is None:
+                    continue
+                state = json.loads(row[0])
+                state.update(delta)
+                conn.execute(
+                    "UPDATE sessions SET state = ? "
+                    "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                    (json.dumps(state, ensure_ascii=False, default=str), *key),
+                )
+            conn.executemany(
+                "UPDATE sessions SET updated_at = MAX(updated_at, ?) "
+                "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                [(timestamp, *key) for key, timestamp in updated.items()],
+            )
+            for (app_name, user_id), delta in user_deltas.items():
+                self._merge_scoped_state(
+                    conn,
+                    "user_states",
+                    {"app_name": app_name, "user_id": user_id},
+                    delta,
+                )
+            for app_name, delta in app_deltas.items():
+                self._merge_scoped_state(
+                    conn, "app_states", {"app_name": app_name}, delta
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _merge_scoped_state(
+        conn: sqlite3.Connection,
+        table: str,
+        where: Dict[str, str],
+        delta: Dict[str, Any],
+    ) -> None:
+        condition = " AND ".join(f"{column} = ?" for column in where)
+        row = conn.execute(
+            f"SELECT state FROM {table} WHERE {condition}", tuple(where.values())
+        ).fetchone()
+        state = json.loads(row[0]) if row else {}
+        state.update(delta)
+        columns = ", ".join((*where, "state"))
+        placeholders = ", ".join("?" for _ in range(len(where) + 1))
+        conn.execute(
+            f"INSERT OR REPLACE INTO {table} ({columns}) VALUES ({placeholders})",
+            (*where.values(), json.dumps(state, ensure_ascii=False, default=str)),
+        )
+
+    async def flush(self) -> None:
+        await asyncio.to_thread(self._flush_pending)
+
+    def close(self) -> None:
+        """
+        Stop the background threads after writing any queued events.
+        """
+        self._closed.set()
+        self._writer.join(timeout=5)
+        if self._pruner is not None:
+            self._pruner.join(timeout=5)
+        self._flush_pending()
+
+    # -- read path --------------------------------------------------------
+
+    def _scoped_state(self, app_name: str, user_id: str) -> Dict[str, Any]:
+        conn = self._conn()
+        state: Dict[str, Any] = {}
+        row = conn.execute(
+            "SELECT state FROM app_states WHERE app_name = ?", (app_name,)
+        ).fetchone()
+        if row:
+            for key, value in json.loads(row[0]).items():
+                state[State.APP_PREFIX + key] = value
+        row = conn.execute(
+            "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?",
+            (app_name, user_id),
+        ).fetchone()
+        if row:
+            for key, value in json.loads(row[0]).items():
+                state[State.USER_PREFIX + key] = value
+        return state
+
+    def _delete(self, conn: sqlite3.Connection, key: SessionKey) -> None:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?",
+            key,
+        )
+        conn.execute(
+            "DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND session_id = ?",
+            key,
+        )
+        conn.execute("COMMIT")
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        return await asyncio.to_thread(
+            self._create_session,
+            app_name=app_name,
+            user_id=user_id,
+            state=state,
+            session_id=session_id,
+        )
+
+    def _create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = (session_id or "").strip() or uuid.uuid4().hex
+        key = (app_name, user_id, session_id)
+        deltas = _split_state(state or {})
+        now = time.time()
+        self._flush_pending()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT updated_at FROM sessions "
+            "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+            key,
+        ).fetchone()
+        if row is not None:
+            if now - row[0] <= self.idle_ttl:
+                raise AlreadyExistsError(
+                    f"Session with id {session_id} already exists."
+                )
+            self._delete(conn, key)
+        conn.execute(
+            "INSERT INTO sessions (app_name, user_id, session_id, state, created_at, "
+            "updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                *key,
+                json.dumps(deltas["session"], ensure_ascii=False, default=str),
+                now,
+                now,
+            ),
+        )
+        if deltas["app"] or deltas["user"]:
+            self._pending.put(_PendingEvent(key, now, None, {**deltas, "session": {}}))
+            self._flush_pending()
+        session = Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=dict(deltas["session"]),
+            last_update_time=now,
+        )
+        session.state.update(self._scoped_state(app_name, user_id))
+        return session
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        return await asyncio.to_thread(
+            self._get_session,
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            config=config,
+        )
+
+    def _get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        self._flush_pending()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT state, updated_at FROM sessions "
+            "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+            key,
+        ).fetchone()
+        if row is None:
+            return None
+        if time.time() - row[1] > self.idle_ttl:
+            self._delete(conn, key)
+            return None
+
+        limit = self.max_events
+        if config is not None and config.num_recent_events is not None:
+            limit = min(limit, config.num_recent_events)
+        after = config.after_timestamp if config and config.after_timestamp else 0.0
+        payloads = conn.execute(
+            "SELECT payload FROM events "
+            "WHERE app_name = ? AND user_id = ? AND session_id = ? AND timestamp >= ? "
+            "ORDER BY id DESC LIMIT ?",
+            (*key, after, limit),
+        ).fetchall()
+        events = [
+            Event.model_validate_json(payload) for (payload,) in reversed(payloads)
+        ]
+        if len(events) == self.max_events and events:
+            # The oldest turn was cut by the limit; its earlier events are
+            # already reflected in the summary, so drop the remainder.
+            first_invocation = events[0].invocation_id
+            events = [
+                event for event in events if event.invocation_id != first_invocation
+            ]
+
+        session = Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=json.loads(row[0]),
+            events=events,
+            last_update_time=row[1],
+        )
+        session.state.update(self._scoped_state(app_name, user_id))
+        return session
+
+    async def list_sessions(
+        self, *, app_name: str, user_id: Optional[str] = None
+    ) -> ListSessionsResponse:
+        return await asyncio.to_thread(
+            self._list_sessions, app_name=app_name, user_id=user_id
+        )
+
+    def _list_sessions(
+        self, *, app_name: str, user_id: Optional[str] = None
+    ) -> ListSessionsResponse:
+        self._flush_pending()
+        query = "SELECT user_id, session_id, state, updated_at FROM sessions WHERE app_name = ?"
+        params: Tuple[str, ...] = (app_name,)
+        if user_id is not None:
+            query += " AND user_id = ?"
+            params += (user_id,)
+        rows = self._conn().execute(query + " ORDER BY updated_at", params).fetchall()
+        return ListSessionsResponse(
+            sessions=[
+                Session(
+                    app_name=app_name,
+                    user_id=row_user,
+                    id=row_session,
+                    state=json.loads(state),
+                    last_update_time=updated_at,
+                )
+                for row_user, row_session, state, updated_at in rows
+            ]
+        )
+
+    async def delete_session(
+        self, *, app_name: str, user_id: str, session_id: str
+    ) -> None:
+        await asyncio.to_thread(
+            self._delete_session,
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+        )
+
+    def _delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        self._flush_pending()
+        self._delete(self._conn(), (app_name, user_id, session_id))
+
+    async def get_user_state(self, *, app_name: str, user_id: str) -> Dict[str, Any]:
+        return await asyncio.to_thread(
+            self._get_user_state, app_name=app_name, user_id=user_id
+        )
+
+    def _get_user_state(self, *, app_name: str, user_id: str) -> Dict[str, Any]:
+        self._flush_pending()
+        row = (
+            self._conn()
+            .execute(
+                "SELECT state FROM user_states WHERE app_name = ? AND user_id = ?",
+                (app_name, user_id),
+            )
+            .fetchone()
+        )
+        return json.loads(row[0]) if row else {}
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        event = await super().append_event(session=session, event=event)
+        key = (session.app_name, session.user_id, session.id)
+        session.last_update_time = event.timestamp
+
+        deltas = _split_state(event.actions.state_delta if event.actions else {})
+        summary = session.state.get(SUMMARY_KEY)
+        compact_events(session, self.max_events, event.invocation_id)
+        if session.state.get(SUMMARY_KEY) != summary:
+            deltas["session"][SUMMARY_KEY] = session.state[SUMMARY_KEY]
+
+        self._pending.put(
+            _PendingEvent(
+                key,
+                event.timestamp,
+                event.model_dump_json(exclude_none=True),
+                deltas,
+            )
+        )
+        if self._closed.is_set():
+            # No writer thread any more; persist before returning.
+            await asyncio.to_thread(self._flush_pending)
+        return event
+
+    # -- maintenance ------------------------------------------------------
+
+    def _prune_loop(self) -> None:
+        while not self._closed.wait(self.prune_interval):
+            try:
+                self.prune()
+            except sqlite3.Error as exc:
+                logger.warning("Session prune failed: %s", exc)
+
+    def prune(self) -> Dict[str, int]:
+        """
+        Delete idle sessions, sessions beyond max_sessions and events older
+        than each session's last max_events, then reclaim free pages.
+        """
+        self._flush_pending()
+        conn = self._conn()
+        deadline = time.time() - self.idle_ttl
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            expired = conn.execute(
+                "DELETE FROM sessions WHERE updated_at < ? OR rowid IN ("
+                "SELECT rowid FROM sessions ORDER BY updated_at DESC "
+                "LIMIT -1 OFFSET ?)",
+                (deadline, self.max_sessions),
+            ).rowcount
+            orphaned = conn.execute(
+                "DELETE FROM events WHERE NOT EXISTS ("
+                "SELECT 1 FROM sessions s WHERE s.app_name = events.app_name "
+                "AND s.user_id = events.user_id AND s.session_id = events.session_id)"
+            ).rowcount
+            trimmed = conn.execute(
+                "DELETE FROM events WHERE id IN ("
+                "SELECT id FROM (SELECT id, ROW_NUMBER() OVER ("
+                "PARTITION BY app_name, user_id, session_id ORDER BY id DESC) AS rank "
+                "FROM events) WHERE rank > ?)",
+                (self.max_events,),
+            ).rowcount
+            conn.execute("COMMIT")
+            conn.execute("PRAGMA incremental_vacuum")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        stats = {
+            "sessions": max(expired, 0),
+            "events": max(orphaned, 0) + max(trimmed, 0),
+        }
+        if stats["sessions"] or stats["events"]:
+            logger.debug("Pruned session store: %s", stats)
+        return stats
+
+
+def create_session_service() -> BaseSessionService:
+    """
+    Build the session service selected by KRISHIGPT_SESSION_BACKEND.
+    """
+    backend = get_session_backend()
+    if backend == "sqlite":
+        return SqliteSessionService(
+            get_session_db_path(),
+            max_sessions=get_session_max_count(),
+            idle_ttl=get_session_idle_ttl(),
+            max_events=get_session_max_events(),
+        )
+    if backend != "memory":
+        logger.warning("Unknown session backend %r; using memory.", backend)
+    return BoundedSessionService(
+        max_sessions=get_session_max_count(),
+        idle_ttl=get_session_idle_ttl(),
+        max_events=get_session_max_events(),
+    )
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from .agents.state import parse_translation_result
+
+STAGE = "stage"
+ROUTE = "route"
+TOOL_CALL = "tool_call"
+DELTA = "delta"
+TOOL_DELTA = "tool_delta"
+FINAL = "final"
+TRACE = "trace"
+
+# Agents whose text is never part of the answer shown to the user.
+_NON_ANSWER_AUTHORS = frozenset(
+    {"user", "InputTranslationAgent", "InputTranslationLlmAgent"}
+)
+_TRANSFER_TOOL = "transfer_to_agent"
+
+
+@dataclass(frozen=True)
+class StreamChunk:
+    """
+    One item of a streamed pipeline response.
+
+    kind is one of "stage", "route", "tool_call", "delta", "tool_delta",
+    "final" or "trace". Deltas concatenate to the answer text; tool deltas
+    are text a tool is still generating (e.g. Sarvam farming advice) that
+    the agent will build its answer from. Tool deltas are provisional: they
+    are a preview to show until the first delta arrives and then discard,
+    or the answer is shown twice in different words. The final chunk
+    carries the complete, authoritative response.
+    """
+
+    kind: str
+    text: str = ""
+    agent: Optional[str] = None
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+def _event_text(event: Any) -> str:
+    content = getattr(event, "content", None)
+    if not content or not getattr(content, "parts", None):
+        return ""
+    return "".join(getattr(part, "text", None) or "" for part in content.parts)
+
+
+def _function_calls(event: Any) -> List[Any]:
+    content = getattr(event, "content", None)
+    if not content or not getattr(content, "parts", None):
+        return []
+    return [
+        part.function_call
+        for part in content.parts
+        if getattr(part, "function_call", None)
+    ]
+
+
+class ChunkBuilder:
+    """
+    Turn ADK pipeline events into StreamChunks.
+
+    Partial model text is forwarded as deltas only when the user asked in
+    English; otherwise the answer still has to be translated and is emitted
+    once the output stage has produced it.
+    """
+
+    def __init__(self) -> None:
+        self.target_language = "en-IN"
+        self.streamed_text = ""
+        self.routed_agent: Optional[str] = None
+        self.final_text: Optional[str] = None
+
+    def feed(self, event: Any) -> List[StreamChunk]:
+        chunks: List[StreamChunk] = []
+        author = getattr(event, "author", None)
+        actions = getattr(event, "actions", None)
+        state_delta = dict(getattr(actions, "state_delta", None) or {})
+
+        if "translation_result" in state_delta:
+            translation = parse_translation_result(state_delta["translation_result"])
+            self.target_language = translation.get("detected_language") or "en-IN"
+            chunks.append(
+                StreamChunk(
+                    kind=STAGE,
+                    agent=author,
+                    data={
+                        "stage": "translation",
+                        "detected_language": self.target_language,
+                        "translated_query": translation.get("translated_query"),
+                    },
+                )
+            )
+
+        routed = state_delta.get("routed_agent") or getattr(
+            actions, "transfer_to_agent", None
+        )
+        if routed and routed != self.routed_agent:
+            self.routed_agent = routed
+            chunks.append(
+                StreamChunk(
+                    kind=ROUTE,
+                    agent=routed,
+                    data={"source": state_delta.get("routing_source", "llm")},
+                )
+            )
+
+        if not getattr(event, "partial", False):
+            for call in _function_calls(event):
+                if call.name == _TRANSFER_TOOL:
+                    continue
+                chunks.append(
+                    StreamChunk(
+                        kind=TOOL_CALL,
+                        agent=author,
+                        data={"tool": call.name, "args": dict(call.args or {})},
+                    )
+                )
+
+        if (
+            getattr(event, "partial", False)
+            and author not in _NON_ANSWER_AUTHORS
+            and self.target_language == "en-IN"
+        ):
+            text = _event_text(event)
+            if text:
+                self.streamed_text += text
+                chunks.append(StreamChunk(kind=DELTA, text=text, agent=author))
+
+        final_response = state_delta.get("final_response")
+        if isinstance(final_response, str):
+            self.final_text = final_response
+            if not self.streamed_text:
+                chunks.append(
+                    StreamChunk(kind=DELTA, text=final_response, agent=author)
+                )
+            chunks.append(StreamChunk(kind=FINAL, text=final_response, agent=author))
+        return chunks
+
+    def feed_tool_chunk(self, chunk: StreamChunk) -> List[StreamChunk]:
+        """
+        Tool output is English, so like partial model text it is only
+        forwarded when the user asked in English. It is marked provisional:
+        the agent rephrases it into the answer that follows as deltas, so
+        clients drop tool text once deltas start, and none is sent after.
+        """
+        if self.target_language != "en-IN" or self.streamed_text:
+            return []
+        return [replace(chunk, data={**chunk.data, "provisional": True})]
+
+
+_DONE = object()
+
+_TOOL_LISTENERS: Dict[str, Callable[[StreamChunk], None]] = {}
+_TOOL_LISTENERS_LOCK = threading.Lock()
+
+
+def add_tool_listener(
+    invocation_id: str, listener: Callable[[StreamChunk], None]
+) -> None:
+    with _TOOL_LISTENERS_LOCK:
+        _TOOL_LISTENERS[invocation_id] = listener
+
+
+def remove_tool_listener(invocation_id: str) -> None:
+    with _TOOL_LISTENERS_LOCK:
+        _TOOL_LISTENERS.pop(invocation_id, None)
+
+
+def publish_tool_chunk(invocation_id: Optional[str], chunk: StreamChunk) -> bool:
+    """
+    Hand a chunk from a running tool to whoever is streaming that
+    invocation. Returns False when nobody is; tools may call it from any
+    thread.
+    """
+    if not invocation_id:
+        return False
+    with _TOOL_LISTENERS_LOCK:
+        listener = _TOOL_LISTENERS.get(invocation_id)
+    if listener is None:
+        return False
+    listener(chunk)
+    return True
+
+
+async def with_tool_chunks(events: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    """
+    Yield ADK events with the StreamChunks that tools publish for the same
+    invocation interleaved, as they are published.
+    """
+    loop = asyncio.get_running_loop()
+    items: "asyncio.Queue[Any]" = asyncio.Queue()
+
+    def listener(chunk: StreamChunk) -> None:
+        loop.call_soon_threadsafe(items.put_nowait, chunk)
+
+    invocation_id: Optional[str] = None
+
+    async def _pump() -> None:
+        nonlocal invocation_id
+        try:
+            async for event in events:
+                # Listen as soon as the invocation is known, not when the
+                # consumer gets to the event, or early tool output is lost.
+                if invocation_id is None:
+                    invocation_id = getattr(event, "invocation_id", None)
+                    if invocation_id:
+                        add_tool_listener(invocation_id, listener)
+                items.put_nowait(event)
+        except Exception as exc:  # re-raised by the consumer
+            items.put_nowait(exc)
+        finally:
+            items.put_nowait(_DONE)
+
+    pump = asyncio.ensure_future(_pump())
+    try:
+        while True:
+            item = await items.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        if not pump.done():
+            pump.cancel()
+            try:
+                await pump
+            except asyncio.CancelledError:
+                pass
+        if invocation_id:
+            remove_tool_listener(invocation_id)
+
+
+def iterate_in_thread(factory: Callable[[], AsyncIterator[Any]]) -> Iterator[Any]:
+    """
+    Consume an async iterator from synchronous code by running it on a
+    private event loop in a worker thread.
+    """
+    items: "queue.Queue[Any]" = queue.Queue()
+    stop = threading.Event()
+
+    async def _pump() -> None:
+        iterator = factory()
+        try:
+            async for item in iterator:
+                items.put(item)
+                if stop.is_set():
+                    break
+        finally:
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def _worker() -> None:
+        try:
+            asyncio.run(_pump())
+        except BaseException as exc:  # re-raised in the consumer thread
+            items.put(exc)
+        finally:
+            items.put(_DONE)
+
+    thread = threading.Thread(target=_worker, name="krishigpt-stream", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
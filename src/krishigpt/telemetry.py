@@ -0,0 +1,401 @@
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from .config import is_telemetry_enabled
+
+logger = logging.getLogger(__name__)
+
+AGENT = "agent"
+TOOL = "tool"
+LLM = "llm"
+REQUEST = "request"
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+@dataclass
+class Span:
+    """
+    One timed stage of a request. start_ms is relative to the trace start.
+    """
+
+    kind: str
+    name: str
+    start_ms: float
+    duration_ms: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "name": self.name,
+            "start_ms": round(self.start_ms, 3),
+            "duration_ms": (
+                None if self.duration_ms is None else round(self.duration_ms, 3)
+            ),
+            "attributes": dict(self.attributes),
+        }
+
+
+class Trace:
+    """
+    Spans and token usage collected for one pipeline invocation.
+    """
+
+    def __init__(self, invocation_id: str) -> None:
+        self.invocation_id = invocation_id
+        self.started_at = time.time()
+        self.duration_ms: Optional[float] = None
+        self.spans: List[Span] = []
+        self.tokens: Dict[str, int] = {"prompt": 0, "completion": 0, "total": 0}
+        self._t0 = time.perf_counter()
+        self._open: Dict[Tuple[str, str], List[Tuple[Span, float]]] = {}
+        self._lock = threading.Lock()
+
+    def open_span(
+        self,
+        kind: str,
+        name: str,
+        key: str,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> Span:
+        now = time.perf_counter()
+        span = Span(
+            kind=kind,
+            name=name,
+            start_ms=(now - self._t0) * 1000.0,
+            attributes=dict(attributes or {}),
+        )
+        with self._lock:
+            self.spans.append(span)
+            self._open.setdefault((kind, key), []).append((span, now))
+        return span
+
+    def close_span(
+        self, kind: str, key: str, attributes: Optional[Dict[str, Any]] = None
+    ) -> Optional[Span]:
+        with self._lock:
+            stack = self._open.get((kind, key))
+            if not stack:
+                return None
+            span, started = stack.pop()
+            if not stack:
+                del self._open[(kind, key)]
+        span.duration_ms = (time.perf_counter() - started) * 1000.0
+        span.attributes.update(attributes or {})
+        get_metrics().observe(kind, span.name, span.duration_ms)
+        return span
+
+    def add_tokens(self, prompt: int, completion: int, total: int) -> None:
+        with self._lock:
+            self.tokens["prompt"] += prompt
+            self.tokens["completion"] += completion
+            self.tokens["total"] += total
+
+    def finish(self) -> "Trace":
+        """
+        Close any span left open (e.g. by a tool that raised) and record the
+        end-to-end duration.
+        """
+        if self.duration_ms is not None:
+            return self
+        with self._lock:
+            leftovers = [key for key in self._open]
+        for kind, key in leftovers:
+            while self.close_span(kind, key, {"incomplete": True}):
+                pass
+        self.duration_ms = (time.perf_counter() - self._t0) * 1000.0
+        get_metrics().observe(REQUEST, "pipeline", self.duration_ms)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "invocation_id": self.invocation_id,
+            "started_at": self.started_at,
+            "duration_ms": (
+                None if self.duration_ms is None else round(self.duration_ms, 3)
+            ),
+            "tokens": dict(self.tokens),
+            "spans": [span.to_dict() for span in self.spans],
+        }
+
+
+class Histogram:
+    """
+    Latency samples over a sliding window, with count and sum over all time.
+    """
+
+    def __init__(self, window: int = 2048) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._samples.append(value)
+            self.count += 1
+            self.total += value
+
+    def quantiles(self, qs: Tuple[float, ...] = QUANTILES) -> Dict[float, float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {q: 0.0 for q in qs}
+        result = {}
+        for q in qs:
+            index = min(len(samples) - 1, max(0, math.ceil(q * len(samples)) - 1))
+            result[q] = samples[index]
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        quantiles = self.quantiles()
+        return {
+            "count": self.count,
+            "sum_ms": round(self.total, 3),
+            **{f"p{int(q * 100)}": round(value, 3) for q, value in quantiles.items()},
+        }
+
+
+class Metrics:
+    """
+    In-process latency histograms per (kind, name) and token counters per model.
+    """
+
+    def __init__(self) -> None:
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._tokens: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, kind: str, name: str, duration_ms: float) -> None:
+        key = (kind, name)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+        histogram.observe(duration_ms)
+
+    def add_tokens(self, model: str, prompt: int, completion: int) -> None:
+        with self._lock:
+            for kind, count in (("prompt", prompt), ("completion", completion)):
+                self._tokens[(model, kind)] = self._tokens.get((model, kind), 0) + count
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            histograms = dict(self._histograms)
+            tokens = dict(self._tokens)
+        return {
+            "latency": {
+                f"{kind}:{name}": histogram.snapshot()
+                for (kind, name), histogram in sorted(histograms.items())
+            },
+            "tokens": {
+                f"{model}:{kind}": count
+                for (model, kind), count in sorted(tokens.items())
+            },
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            tokens = sorted(self._tokens.items())
+        lines = [
+            "# HELP krishigpt_stage_duration_ms Wall time per pipeline stage.",
+            "# TYPE krishigpt_stage_duration_ms summary",
+        ]
+        for (kind, name), histogram in histograms:
+            labels = f'kind="{kind}",name="{_escape(name)}"'
+            for q, value in histogram.quantiles().items():
+                lines.append(
+                    f'krishigpt_stage_duration_ms{{{labels},quantile="{q}"}} {value:.3f}'
+                )
+            lines.append(
+                f"krishigpt_stage_duration_ms_sum{{{labels}}} {histogram.total:.3f}"
+            )
+            lines.append(
+                f"krishigpt_stage_duration_ms_count{{{labels}}} {histogram.count}"
+            )
+        lines.append("# HELP krishigpt_llm_tokens_total Model tokens by type.")
+        lines.append("# TYPE krishigpt_llm_tokens_total counter")
+        for (model, kind), count in tokens:
+            lines.append(
+                f'krishigpt_llm_tokens_total{{model="{_escape(model)}",type="{kind}"}} {count}'
+            )
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._tokens.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_METRICS = Metrics()
+# Traces of invocations in flight, bounded in case nobody collects them
+# (e.g. runs started from ADK web).
+_TRACES: "OrderedDict[str, Trace]" = OrderedDict()
+_TRACES_LOCK = threading.Lock()
+_MAX_TRACES = 512
+
+
+def get_metrics() -> Metrics:
+    return _METRICS
+
+
+def get_trace(invocation_id: str) -> Trace:
+    """
+    Return the trace for an invocation, starting one if needed.
+    """
+    with _TRACES_LOCK:
+        trace = _TRACES.get(invocation_id)
+        if trace is None:
+            trace = _TRACES[invocation_id] = Trace(invocation_id)
+            while len(_TRACES) > _MAX_TRACES:
+                _TRACES.popitem(last=False)
+        return trace
+
+
+def pop_trace(invocation_id: Optional[str]) -> Optional[Trace]:
+    """
+    Detach and finish the trace of a completed invocation.
+    """
+    if not invocation_id:
+        return None
+    with _TRACES_LOCK:
+        trace = _TRACES.pop(invocation_id, None)
+    return trace.finish() if trace is not None else None
+
+
+@contextmanager
+def span(
+    invocation_id: str, kind: str, name: str, **attributes: Any
+) -> Iterator[Optional[Span]]:
+    """
+    Time a block that is not an ADK tool or model call, such as a custom
+    agent calling a tool function directly.
+    """
+    if not is_telemetry_enabled():
+        yield None
+        return
+    trace = get_trace(invocation_id)
+    key = f"{name}:{time.perf_counter_ns()}"
+    opened = trace.open_span(kind, name, key, attributes)
+    try:
+        yield opened
+    finally:
+        trace.close_span(kind, key)
+
+
+# ADK callbacks. Each returns None so the agent's behaviour is unchanged.
+
+
+def _before_agent(callback_context: Any) -> None:
+    get_trace(callback_context.invocation_id).open_span(
+        AGENT, callback_context.agent_name, callback_context.agent_name
+    )
+    return None
+
+
+def _after_agent(callback_context: Any) -> None:
+    get_trace(callback_context.invocation_id).close_span(
+        AGENT, callback_context.agent_name
+    )
+    return None
+
+
+def _before_model(callback_context: Any, llm_request: Any) -> None:
+    model = getattr(llm_request, "model", None) or "unknown"
+    get_trace(callback_context.invocation_id).open_span(
+        LLM, callback_context.agent_name, callback_context.agent_name, {"model": model}
+    )
+    return None
+
+
+def _after_model(callback_context: Any, llm_response: Any) -> None:
+    if getattr(llm_response, "partial", False):
+        return None
+    trace = get_trace(callback_context.invocation_id)
+    usage = getattr(llm_response, "usage_metadata", None)
+    prompt = getattr(usage, "prompt_token_count", None) or 0
+    completion = getattr(usage, "candidates_token_count", None) or 0
+    total = getattr(usage, "total_token_count", None) or prompt + completion
+    closed = trace.close_span(
+        LLM,
+        callback_context.agent_name,
+        {"prompt_tokens": prompt, "completion_tokens": completion},
+    )
+    trace.add_tokens(prompt, completion, total)
+    model = closed.attributes.get("model", "unknown") if closed else "unknown"
+    get_metrics().add_tokens(model, prompt, completion)
+    return None
+
+
+def _tool_key(tool: Any, tool_context: Any) -> str:
+    return getattr(tool_context, "function_call_id", None) or tool.name
+
+
+def _before_tool(tool: Any, args: Dict[str, Any], tool_context: Any) -> None:
+    get_trace(tool_context.invocation_id).open_span(
+        TOOL,
+        tool.name,
+        _tool_key(tool, tool_context),
+        {"agent": tool_context.agent_name},
+    )
+    return None
+
+
+def _after_tool(
+    tool: Any, args: Dict[str, Any], tool_context: Any, tool_response: Any
+) -> None:
+    attributes = {}
+    if isinstance(tool_response, dict) and "status" in tool_response:
+        attributes["status"] = tool_response["status"]
+    get_trace(tool_context.invocation_id).close_span(
+        TOOL, _tool_key(tool, tool_context), attributes
+    )
+    return None
+
+
+def instrument_agent_tree(agent: Any) -> None:
+    """
+    Attach timing callbacks to an agent and all of its sub-agents. Agents
+    that already define a callback keep it; both run.
+    """
+    if not is_telemetry_enabled():
+        return
+    hooks = [
+        ("before_agent_callback", _before_agent),
+        ("after_agent_callback", _after_agent),
+    ]
+    if hasattr(agent, "before_model_callback"):
+        hooks += [
+            ("before_model_callback", _before_model),
+            ("after_model_callback", _after_model),
+            ("before_tool_callback", _before_tool),
+            ("after_tool_callback", _after_tool),
+        ]
+    for attribute, hook in hooks:
+        existing = getattr(agent, attribute, None)
+        if existing is None:
+            setattr(agent, attribute, hook)
+        elif isinstance(existing, list):
+            # Ours runs first so the timing covers the other callbacks too.
+            setattr(agent, attribute, [hook, *existing])
+        else:
+            setattr(agent, attribute, [hook, existing])
+    for sub_agent in getattr(agent, "sub_agents", None) or []:
+        instrument_agent_tree(sub_agent)
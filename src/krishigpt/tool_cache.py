@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import copy
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from .cache import CacheStats, TieredCache
+from .config import (
+    get_tool_cache_negative_ttl,
+    get_tool_cache_path,
+    get_tool_cache_size,
+    get_tool_cache_ttl,
+    is_tool_cache_enabled,
+)
+
+logger = logging.getLogger(__name__)
+
+# Arguments that never change what a tool returns.
+IGNORED_ARGUMENTS = ("api_key", "timeout")
+
+
+def normalize_value(value: Any, precision: int = 4) -> Any:
+    """
+    Canonical form of a tool argument: strings case-folded with whitespace
+    collapsed, floats rounded, containers normalized recursively.
+    """
+    if isinstance(value, str):
+        return " ".join(value.casefold().split())
+    if isinstance(value, bool) or value is None or isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return round(value, precision)
+    if isinstance(value, dict):
+        return {
+            str(key): normalize_value(item, precision)
+            for key, item in sorted(value.items(), key=lambda pair: str(pair[0]))
+        }
+    if isinstance(value, (list, tuple)):
+        return [normalize_value(item, precision) for item in value]
+    return str(value)
+
+
+def make_key(name: str, arguments: Any, precision: int = 4) -> str:
+    raw = json.dumps(
+        [name, normalize_value(arguments, precision)],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ToolCache:
+    """
+    Result cache shared by the tool functions: one TieredCache (memory LRU,
+    optional SQLite) with hit/miss counters per tool.
+    """
+
+    def __init__(self, max_entries: int = 4096, disk_path: Optional[Path] = None):
+        self._cache = TieredCache(max_entries=max_entries, disk_path=disk_path)
+        self._stats: Dict[str, CacheStats] = {}
+        self._lock = threading.Lock()
+
+    def _stats_for(self, name: str) -> CacheStats:
+        stats = self._stats.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(name, CacheStats())
+        return stats
+
+    def get(self, name: str, key: str) -> Optional[Any]:
+        hit, value = self._cache.get(key)
+        self._stats_for(name).record(hit)
+        return copy.deepcopy(value) if hit else None
+
+    def set(self, name: str, key: str, value: Any, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        self._cache.set(key, copy.deepcopy(value), ttl)
+        self._stats_for(name).record_set()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            per_tool = dict(self._stats)
+        return {
+            "total": self._cache.stats.snapshot(),
+            "tools": {
+                name: stats.snapshot() for name, stats in sorted(per_tool.items())
+            },
+        }
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+_TOOL_CACHE: Optional[ToolCache] = None
+_LOCK = threading.Lock()
+
+
+def get_tool_cache() -> Optional[ToolCache]:
+    """
+    Return the process-wide tool cache, or None when it is disabled.
+    """
+    global _TOOL_CACHE
+    if not is_tool_cache_enabled():
+        return None
+    if _TOOL_CACHE is None:
+        with _LOCK:
+            if _TOOL_CACHE is None:
+                disk_path = get_tool_cache_path()
+                _TOOL_CACHE = ToolCache(
+                    max_entries=get_tool_cache_size(),
+                    disk_path=Path(disk_path) if disk_path else None,
+                )
+    return _TOOL_CACHE
+
+
+def cached_tool(
+    name: str,
+    ttl: float,
+    key: Optional[Callable[..., Any]] = None,
+    not_found: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ignore: Iterable[str] = IGNORED_ARGUMENTS,
+    precision: int = 4,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Memoize a tool that returns a status/message dict.
+
+    Successful results are kept for ttl seconds (KRISHIGPT_TOOL_CACHE_TTL_<NAME>
+    overrides it); results for which not_found(result) is true are kept for the
+    shorter negative TTL. Other errors are never cached. The cache key is built
+    from key(*args, **kwargs) when given, otherwise from the normalized bound
+    arguments minus those in ignore. Sync and async tools sharing a name share
+    entries. Cached results are copies, so callers may mutate them.
+    """
+    ignored = frozenset(ignore)
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        signature = inspect.signature(func)
+
+        def cache_key(args: Any, kwargs: Any) -> str:
+            if key is not None:
+                arguments = key(*args, **kwargs)
+            else:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                arguments = {
+                    param: value
+                    for param, value in bound.arguments.items()
+                    if param not in ignored
+                }
+            return make_key(name, arguments, precision)
+
+        def lookup(
+            args: Any, kwargs: Any
+        ) -> Tuple[Optional[ToolCache], Optional[str], Any]:
+            cache = get_tool_cache()
+            if cache is None:
+                return None, None, None
+            try:
+                entry_key = cache_key(args, kwargs)
+            except (TypeError, ValueError) as exc:
+                logger.debug("Not caching %s call: %s", name, exc)
+                return None, None, None
+            return cache, entry_key, cache.get(name, entry_key)
+
+        def store(cache: ToolCache, entry_key: str, result: Any) -> None:
+            if not isinstance(result, dict):
+                return
+            if result.get("status") == "success":
+                cache.set(name, entry_key, result, get_tool_cache_ttl(name, ttl))
+            elif not_found is not None and not_found(result):
+                cache.set(name, entry_key, result, get_tool_cache_negative_ttl())
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                cache, entry_key, cached = lookup(args, kwargs)
+                if cached is not None:
+                    return cached
+                result = await func(*args, **kwargs)
+                if cache is not None:
+                    store(cache, entry_key, result)
+                return result
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            cache, entry_key, cached = lookup(args, kwargs)
+            if cached is not None:
+                return cached
+            result = func(*args, **kwargs)
+            if cache is not None:
+                store(cache, entry_key, result)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -1,14 +1,28 @@
-from .location import get_lat_lon
-from .market import get_mandi_prices
-from .weather import get_weather_forecast
-from .sarvam import use_sarvam_llm
-from .translation import translate_text, translate_text_if_needed
-
-__all__ = [
-    "get_lat_lon",
-    "get_mandi_prices",
-    "get_weather_forecast",
-    "use_sarvam_llm",
-    "translate_text",
-    "translate_text_if_needed",
-]
+from importlib import import_module
+from typing import Any
+
+_EXPORTS = {
+    "get_lat_lon": ".location",
+    "get_lat_lon_async": ".location",
+    "get_mandi_prices": ".market",
+    "get_mandi_prices_async": ".market",
+    "get_mandi_price_analytics": ".market_analytics",
+    "get_mandi_price_analytics_async": ".market_analytics",
+    "get_weather_forecast": ".weather",
+    "get_weather_forecast_async": ".weather",
+    "get_weather_forecasts": ".weather_bulk",
+    "get_weather_forecasts_async": ".weather_bulk",
+    "use_sarvam_llm": ".sarvam",
+    "use_sarvam_llm_async": ".sarvam",
+    "translate_text": ".translation",
+    "translate_text_if_needed": ".translation",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    # Tools are imported on first use so one tool does not pay for the others.
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
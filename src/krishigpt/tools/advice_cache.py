@@ -0,0 +1,390 @@
+from __future__ import annotations
+
+import argparse
+import functools
+import hashlib
+import json
+import logging
+import random
+import re
+import sys
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from ..answer_cache import normalize_query
+from ..cache import CacheStats
+from ..config import (
+    get_advice_cache_log_path,
+    get_advice_cache_size,
+    get_advice_cache_threshold,
+    get_advice_cache_ttl,
+    is_advice_cache_enabled,
+)
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 128
+BANDS = 32
+_PRIME = (1 << 61) - 1
+_SEED = 20240601
+
+
+def _stem(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+# Words that do not change what advice is asked for.
+_STOPWORDS = frozenset("""
+    to do does i we my our in on of for and or with by from at about way ways
+    method methods proper right correct tips tip advice suggest suggestion
+    give know
+    """.split())
+# A question's kind and any negation must match exactly: "when to sow wheat"
+# and "how to sow wheat", or "spray X" and "do not spray X", ask different
+# things however many words they share.
+_INTERROGATIVES = frozenset("what whats which when where why how who".split())
+_NEGATIONS = frozenset(
+    ("not", "no", "never", "without", "avoid", "stop", "don", "dont")
+)
+# Pests and diseases, with the words that tell them apart ("pink" and
+# "american" bollworm), matched like crops: advice for one never answers
+# another.
+_PESTS = frozenset(_stem(word) for word in """
+    aphid whitefly thrips jassid hopper planthopper leafhopper mite mealybug
+    bollworm armyworm borer caterpillar cutworm termite weevil beetle
+    grasshopper locust nematode leafminer looper semilooper webworm midge
+    scale snail slug rat
+    blight blast rust wilt mildew smut rot mosaic curl canker anthracnose scab
+    pink american spotted tobacco fall brown yellow powdery downy bacterial
+    fungal viral early late stem fruit shoot pod root
+    """.split())
+# Generic words in commodity names that do not name a crop.
+_COMMODITY_FILLER = frozenset("""
+    common whole dal seed leaves fruit oil green dry tender raw red black sweet
+    water bitter bottle cluster french elephant finger lady ridge bell pearl
+    hybrid bengal pigeon band ki kai pani hari lal kali sukhi hasi kachcha
+    kachha pachai
+    """.split())
+# Marks the question kind in a shingle set; a bare request ("cotton whitefly
+# control") asks how.
+_KIND_PREFIX = "?"
+_DEFAULT_KIND = "how"
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def question_kinds(query: str) -> FrozenSet[str]:
+    """
+    Interrogatives in the query ("whats" counts as "what"), or "how" when
+    there are none.
+    """
+    # Read from the raw text: normalize_query drops "what" as filler.
+    kinds = {
+        "what" if word == "whats" else word
+        for word in _WORD_RE.findall(unicodedata.normalize("NFKC", query).lower())
+        if word in _INTERROGATIVES
+    }
+    return frozenset(kinds or (_DEFAULT_KIND,))
+
+
+def shingles(query: str) -> FrozenSet[str]:
+    """
+    Content words of a normalized English query, lightly stemmed, plus its
+    question kinds as "?when" and so on. Word order is ignored, so "cotton
+    whitefly control" and "how to control whiteflies in cotton" give the
+    same set.
+    """
+    words = {
+        _stem(word)
+        for word in normalize_query(query).split()
+        if word not in _STOPWORDS and word not in _INTERROGATIVES
+    }
+    if not words:
+        return frozenset()
+    return frozenset(words | {_KIND_PREFIX + kind for kind in question_kinds(query)})
+
+
+@functools.lru_cache(maxsize=None)
+def crop_words() -> FrozenSet[str]:
+    """
+    Stemmed words naming a crop or commodity, from the mandi commodity names
+    and their aliases.
+    """
+    from .mandi_names import COMMODITY_ALIASES_PATH, read_aliases
+
+    try:
+        aliases = read_aliases(COMMODITY_ALIASES_PATH)
+    except OSError as exc:
+        logger.warning("Commodity names unavailable for the advice cache: %s", exc)
+        return frozenset()
+    return frozenset(
+        _stem(word)
+        for name, names in aliases.items()
+        for text in (name, *names)
+        for word in normalize_query(text).split()
+        if word not in _COMMODITY_FILLER and word not in _STOPWORDS
+    )
+
+
+def must_match(items: FrozenSet[str]) -> FrozenSet[str]:
+    """
+    The shingles two queries need in common to share an answer: question
+    kinds, negations, crops and pests.
+    """
+    crops = crop_words()
+    return frozenset(
+        item
+        for item in items
+        if item.startswith(_KIND_PREFIX)
+        or item in _NEGATIONS
+        or item in crops
+        or item in _PESTS
+    )
+
+
+def jaccard(left: FrozenSet[str], right: FrozenSet[str]) -> float:
+    if not left and not right:
+        return 1.0
+    return len(left & right) / len(left | right)
+
+
+class MinHasher:
+    """
+    MinHash signatures from NUM_PERM universal hash functions
+    (a * x + b) mod (2^61 - 1) over 64-bit shingle hashes.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = _SEED) -> None:
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._params = [
+            (rng.randrange(1, _PRIME), rng.randrange(0, _PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, items: FrozenSet[str]) -> Tuple[int, ...]:
+        hashes = [
+            int.from_bytes(
+                hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "big"
+            )
+            for item in items
+        ]
+        return tuple(
+            min((a * value + b) % _PRIME for value in hashes) for a, b in self._params
+        )
+
+
+class _Entry:
+    __slots__ = ("query", "shingles", "signature", "response", "created", "expires")
+
+    def __init__(
+        self,
+        query: str,
+        items: FrozenSet[str],
+        signature: Tuple[int, ...],
+        response: str,
+        ttl: float,
+    ) -> None:
+        self.query = query
+        self.shingles = items
+        self.signature = signature
+        self.response = response
+        self.created = time.time()
+        self.expires = self.created + ttl
+
+
+class AdviceCache:
+    """
+    Near-duplicate cache of Sarvam farming advice. Queries are MinHashed and
+    banded into an LSH index; candidates sharing a band are accepted when
+    they ask the same kind of question about the same crops and pests, with
+    the same negations, and their exact Jaccard similarity reaches
+    threshold. Entries expire after ttl seconds and the least recently used
+    are evicted beyond max_entries. Every hit is appended to a JSONL audit
+    log when log_path is set.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        ttl: float = 7 * 86400,
+        threshold: float = 0.75,
+        bands: int = BANDS,
+        num_perm: int = NUM_PERM,
+        log_path: Optional[Path] = None,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.stats = CacheStats()
+        self._hasher = MinHasher(num_perm)
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], Set[int]] = {}
+        self._next_id = 0
+        self._log_path = Path(log_path) if log_path else None
+        self._lock = threading.Lock()
+
+    def _bands(self, signature: Tuple[int, ...]) -> List[Tuple[int, Tuple[int, ...]]]:
+        return [
+            (band, signature[band * self.rows : (band + 1) * self.rows])
+            for band in range(self.bands)
+        ]
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        for key in self._bands(entry.signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def _best_match(
+        self, items: FrozenSet[str], signature: Tuple[int, ...], now: float
+    ) -> Tuple[Optional[int], float]:
+        candidates: Set[int] = set()
+        for key in self._bands(signature):
+            candidates.update(self._buckets.get(key, ()))
+        best_id: Optional[int] = None
+        best_score = 0.0
+        for entry_id in candidates:
+            entry = self._entries[entry_id]
+            if entry.expires <= now:
+                self._remove(entry_id)
+                continue
+            if must_match(items) != must_match(entry.shingles):
+                continue
+            score = jaccard(items, entry.shingles)
+            if score > best_score:
+                best_id, best_score = entry_id, score
+        return best_id, best_score
+
+    def get(self, query: str) -> Optional[str]:
+        items = shingles(query)
+        if not items:
+            return None
+        signature = self._hasher.signature(items)
+        now = time.time()
+        with self._lock:
+            entry_id, score = self._best_match(items, signature, now)
+            if entry_id is None or score < self.threshold:
+                self.stats.record(False)
+                return None
+            self._entries.move_to_end(entry_id)
+            entry = self._entries[entry_id]
+        self.stats.record(True)
+        self._audit(query, entry, score, now)
+        return entry.response
+
+    def put(self, query: str, response: str) -> None:
+        items = shingles(query)
+        if not items or not response or self.ttl <= 0:
+            return
+        signature = self._hasher.signature(items)
+        now = time.time()
+        with self._lock:
+            entry_id, score = self._best_match(items, signature, now)
+            if entry_id is not None and score >= 1.0:
+                self._remove(entry_id)
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = _Entry(
+                query, items, signature, response, self.ttl
+            )
+            for key in self._bands(signature):
+                self._buckets.setdefault(key, set()).add(entry_id)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                evicted += 1
+        self.stats.record_set(evicted)
+
+    def _audit(self, query: str, entry: _Entry, score: float, now: float) -> None:
+        logger.info(
+            "Advice cache hit (similarity %.2f): %r served the answer to %r",
+            score,
+            query,
+            entry.query,
+        )
+        if self._log_path is None:
+            return
+        record = {
+            "time": now,
+            "query": query,
+            "matched_query": entry.query,
+            "similarity": round(score, 4),
+            "age_seconds": round(now - entry.created, 1),
+            "response": entry.response,
+        }
+        try:
+            self._log_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._log_path.open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as exc:
+            logger.warning("Unable to write advice cache log: %s", exc)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = len(self._entries)
+            buckets = len(self._buckets)
+        return {"entries": entries, "buckets": buckets, **self.stats.snapshot()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+
+_ADVICE_CACHE: Optional[AdviceCache] = None
+_LOCK = threading.Lock()
+
+
+def get_advice_cache() -> Optional[AdviceCache]:
+    """
+    Return the process-wide advice cache, or None when it is disabled.
+    """
+    global _ADVICE_CACHE
+    if not is_advice_cache_enabled():
+        return None
+    if _ADVICE_CACHE is None:
+        with _LOCK:
+            if _ADVICE_CACHE is None:
+                _ADVICE_CACHE = AdviceCache(
+                    max_entries=get_advice_cache_size(),
+                    ttl=get_advice_cache_ttl(),
+                    threshold=get_advice_cache_threshold(),
+                    log_path=get_advice_cache_log_path(),
+                )
+    return _ADVICE_CACHE
+
+
+def _main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Show how two advice queries compare for the advice cache"
+    )
+    parser.add_argument("query")
+    parser.add_argument("other")
+    args = parser.parse_args(argv)
+    left, right = shingles(args.query), shingles(args.other)
+    result = {
+        "shingles": [sorted(left), sorted(right)],
+        "similarity": round(jaccard(left, right), 4),
+        "threshold": get_advice_cache_threshold(),
+    }
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import numpy as np
+
+KELVIN = 273.15
+STEP_HOURS = 3
+SLOT_MINUTES = STEP_HOURS * 60
+
+# Base temperature for growing degree days; 10°C suits most kharif crops.
+GDD_BASE_C = 10.0
+FROST_C = 2.0
+HEAT_STRESS_C = 35.0
+
+# A 3-hour slot is a spray window when it lies wholly in daylight, calm but not still
+# (drift vs. inversion), dry, not too hot for volatilisation and not so humid
+# that leaves stay wet.
+SPRAY_HOURS = (6, 18)
+SPRAY_WIND_MS = (0.5, 4.0)
+SPRAY_MAX_TEMP_C = 30.0
+SPRAY_MAX_POP = 0.3
+SPRAY_MAX_HUMIDITY = 90.0
+
+_FIELDS = (
+    "dt",
+    "temp",
+    "temp_min",
+    "temp_max",
+    "humidity",
+    "wind",
+    "gust",
+    "rain",
+    "pop",
+)
+
+
+def decode_forecast(data: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Decode the OpenWeather 5-day/3-hour ``list`` into one array per field,
+    temperatures in °C. Missing rain, gust and pop are zero.
+    """
+    rows = [
+        (
+            entry["dt"],
+            entry["main"]["temp"],
+            entry["main"].get("temp_min", entry["main"]["temp"]),
+            entry["main"].get("temp_max", entry["main"]["temp"]),
+            entry["main"].get("humidity", 0),
+            (entry.get("wind") or {}).get("speed", 0),
+            (entry.get("wind") or {}).get("gust", 0),
+            (entry.get("rain") or {}).get("3h", 0),
+            entry.get("pop", 0),
+        )
+        for entry in data["list"]
+    ]
+    table = np.array(rows, dtype=np.float64).reshape(-1, len(_FIELDS))
+    columns = dict(zip(_FIELDS, table.T))
+    for field in ("temp", "temp_min", "temp_max"):
+        columns[field] = columns[field] - KELVIN
+    return columns
+
+
+def extraterrestrial_radiation(latitude: float, day_of_year: np.ndarray) -> np.ndarray:
+    """
+    Daily extraterrestrial radiation Ra in MJ/m²/day (FAO-56, eq. 21).
+    """
+    phi = math.radians(latitude)
+    dr = 1 + 0.033 * np.cos(2 * np.pi * day_of_year / 365)
+    delta = 0.409 * np.sin(2 * np.pi * day_of_year / 365 - 1.39)
+    omega = np.arccos(np.clip(-np.tan(phi) * np.tan(delta), -1.0, 1.0))
+    return (
+        24
+        * 60
+        / np.pi
+        * 0.0820
+        * dr
+        * (
+            omega * np.sin(phi) * np.sin(delta)
+            + np.cos(phi) * np.cos(delta) * np.sin(omega)
+        )
+    )
+
+
+def hargreaves_et0(
+    t_min: np.ndarray, t_max: np.ndarray, latitude: float, day_of_year: np.ndarray
+) -> np.ndarray:
+    """
+    Reference evapotranspiration in mm/day from temperature alone
+    (Hargreaves-Samani), for when radiation data is not available.
+    """
+    ra_mm = 0.408 * extraterrestrial_radiation(latitude, day_of_year)
+    t_mean = (t_min + t_max) / 2
+    spread = np.sqrt(np.maximum(t_max - t_min, 0.0))
+    return np.maximum(0.0023 * ra_mm * (t_mean + 17.8) * spread, 0.0)
+
+
+def _clock(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _windows(starts: np.ndarray, good: np.ndarray) -> List[str]:
+    """
+    Merge consecutive good 3-hour slots, given by their local start minute,
+    into "HH:MM-HH:MM" ranges.
+    """
+    windows = []
+    start = end = None
+    for minute, ok in zip(starts.tolist(), good.tolist()):
+        if ok and start is not None and minute == end:
+            end = minute + SLOT_MINUTES
+        elif ok:
+            if start is not None:
+                windows.append((start, end))
+            start, end = minute, minute + SLOT_MINUTES
+    if start is not None:
+        windows.append((start, end))
+    return [f"{_clock(start)}-{_clock(min(end, 24 * 60))}" for start, end in windows]
+
+
+def summarize_week(
+    data: Dict[str, Any],
+    location: str,
+    latitude: float,
+    gdd_base: float = GDD_BASE_C,
+) -> Dict[str, Any]:
+    """
+    Per-day aggregates and agronomic indices for every day in the forecast.
+    """
+    if not data.get("list"):
+        return {
+            "status": "error",
+            "message": "No weather data found",
+            "weather_data": None,
+        }
+    city = data.get("city") or {}
+    offset = int(city.get("timezone") or 0)
+    columns = decode_forecast(data)
+
+    local = columns["dt"].astype(np.int64) + offset
+    day = local // 86400
+    # Minutes, not hours: offsets such as IST's +5:30 put slots on the half hour.
+    minute = (local % 86400) // 60
+    starts = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])
+    counts = np.diff(np.r_[starts, day.size])
+
+    t_min = np.minimum.reduceat(columns["temp_min"], starts)
+    t_max = np.maximum.reduceat(columns["temp_max"], starts)
+    t_avg = np.add.reduceat(columns["temp"], starts) / counts
+    rain = np.add.reduceat(columns["rain"], starts)
+    pop = np.maximum.reduceat(columns["pop"], starts)
+    humidity = np.add.reduceat(columns["humidity"], starts) / counts
+    wind = np.add.reduceat(columns["wind"], starts) / counts
+    gust = np.maximum.reduceat(np.maximum(columns["gust"], columns["wind"]), starts)
+
+    dates = [
+        datetime.fromtimestamp(int(d) * 86400, tz=timezone.utc).date()
+        for d in day[starts]
+    ]
+    day_of_year = np.array([d.timetuple().tm_yday for d in dates], dtype=np.float64)
+    gdd = np.maximum((t_min + t_max) / 2 - gdd_base, 0.0)
+    et0 = hargreaves_et0(t_min, t_max, latitude, day_of_year)
+    balance = rain - et0
+
+    sprayable = (
+        (minute >= SPRAY_HOURS[0] * 60)
+        & (minute + SLOT_MINUTES <= SPRAY_HOURS[1] * 60)
+        & (columns["wind"] >= SPRAY_WIND_MS[0])
+        & (columns["wind"] <= SPRAY_WIND_MS[1])
+        & (columns["rain"] == 0)
+        & (columns["pop"] <= SPRAY_MAX_POP)
+        & (columns["temp"] <= SPRAY_MAX_TEMP_C)
+        & (columns["humidity"] <= SPRAY_MAX_HUMIDITY)
+    )
+    spray_hours = np.add.reduceat(sprayable.astype(np.int64), starts) * STEP_HOURS
+    frost = t_min <= FROST_C
+    heat = t_max >= HEAT_STRESS_C
+
+    days = []
+    for i, date in enumerate(dates):
+        span = slice(starts[i], starts[i] + counts[i])
+        days.append(
+            {
+                "date": date.isoformat(),
+                "samples": int(counts[i]),
+                "temperature": {
+                    "min": round(float(t_min[i]), 1),
+                    "max": round(float(t_max[i]), 1),
+                    "average": round(float(t_avg[i]), 1),
+                    "unit": "°C",
+                },
+                "rain_mm": round(float(rain[i]), 1),
+                "rain_probability": round(float(pop[i]), 2),
+                "humidity": round(float(humidity[i]), 1),
+                "wind_speed": round(float(wind[i]), 1),
+                "wind_gust": round(float(gust[i]), 1),
+                "gdd": round(float(gdd[i]), 1),
+                "et0_mm": round(float(et0[i]), 1),
+                "water_balance_mm": round(float(balance[i]), 1),
+                "spray_hours": int(spray_hours[i]),
+                "spray_windows": _windows(minute[span], sprayable[span]),
+                "frost_risk": bool(frost[i]),
+                "heat_stress": bool(heat[i]),
+            }
+        )
+
+    # The first and last days are usually partial (missing rain and part of
+    # the temperature range), so only full days count towards the totals and
+    # the choice of when to irrigate. A forecast without a full day falls
+    # back to every day.
+    full = counts == 24 // STEP_HOURS
+    driest = None
+    if full.any():
+        candidates = np.flatnonzero(full)
+        driest = dates[int(candidates[np.argmin(balance[candidates])])].isoformat()
+    counted = full if full.any() else np.ones_like(full)
+    best_spray = [
+        days[i]["date"]
+        for i in np.argsort(-spray_hours, kind="stable")[:2]
+        if spray_hours[i] > 0
+    ]
+    totals = {
+        "days": int(counted.sum()),
+        "from": dates[int(np.argmax(counted))].isoformat(),
+        "to": dates[len(dates) - 1 - int(np.argmax(counted[::-1]))].isoformat(),
+        "rain_mm": round(float(rain[counted].sum()), 1),
+        "et0_mm": round(float(et0[counted].sum()), 1),
+        "water_balance_mm": round(float(balance[counted].sum()), 1),
+        "gdd": round(float(gdd[counted].sum()), 1),
+        "gdd_base": gdd_base,
+        "spray_hours": int(spray_hours[counted].sum()),
+        "best_spray_days": best_spray,
+        "largest_deficit_day": driest,
+        "frost_days": [d["date"] for d in days if d["frost_risk"]],
+        "heat_stress_days": [d["date"] for d in days if d["heat_stress"]],
+    }
+
+    city_name = location or city.get("name") or "Unknown location"
+    lines = [f"Forecast for {city_name}, {dates[0]} to {dates[-1]}:"]
+    for entry in days:
+        temperature = entry["temperature"]
+        flags = [
+            label
+            for label, on in (
+                ("frost risk", entry["frost_risk"]),
+                ("heat stress", entry["heat_stress"]),
+            )
+            if on
+        ]
+        windows = ", ".join(entry["spray_windows"]) or "none"
+        lines.append(
+            f"{entry['date']}: {temperature['min']}-{temperature['max']}°C, "
+            f"rain {entry['rain_mm']} mm ({int(entry['rain_probability'] * 100)}%), "
+            f"ET0 {entry['et0_mm']} mm, spray windows {windows}"
+            + (f", {', '.join(flags)}" if flags else "")
+        )
+    lines.append(
+        f"Total rain {totals['rain_mm']} mm vs ET0 {totals['et0_mm']} mm; "
+        f"GDD {totals['gdd']} (base {gdd_base}°C), "
+        f"over {totals['days']} days, {totals['from']} to {totals['to']}."
+    )
+
+    return {
+        "status": "success",
+        "message": "Successfully retrieved weather data",
+        "location": city_name,
+        "mode": "week",
+        "days": days,
+        "totals": totals,
+        "text_summary": "\n".join(lines) + "\n",
+    }
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    AsyncIterator,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from ..config import get_datagov_concurrency, get_datagov_page_size
+from .http_client import async_http_get, http_get
+
+DEFAULT_TIMEOUT = 30
+
+
+class Page(NamedTuple):
+    offset: int
+    total: int
+    records: List[Dict[str, Any]]
+
+
+def _page_params(
+    params: Dict[str, Any],
+    offset: int,
+    limit: int,
+    fields: Optional[Sequence[str]],
+) -> Dict[str, Any]:
+    page = {**params, "offset": str(offset), "limit": str(limit)}
+    if fields:
+        page["fields"] = ",".join(fields)
+    return page
+
+
+def _page(data: Dict[str, Any], offset: int) -> Page:
+    return Page(offset, int(data.get("total") or 0), data.get("records") or [])
+
+
+def _plan(
+    first: Page, page_size: int, max_records: Optional[int]
+) -> List[Tuple[int, int]]:
+    """
+    (offset, limit) of every page after the first, from the total the
+    first response reported.
+    """
+    wanted = first.total if max_records is None else min(first.total, max_records)
+    if len(first.records) < page_size:
+        return []
+    return [
+        (offset, min(page_size, wanted - offset))
+        for offset in range(len(first.records), wanted, page_size)
+    ]
+
+
+def _settings(
+    page_size: Optional[int], max_records: Optional[int], concurrency: Optional[int]
+) -> Tuple[int, int]:
+    page_size = max(1, page_size or get_datagov_page_size())
+    if max_records is not None:
+        page_size = max(1, min(page_size, max_records))
+    return page_size, max(1, concurrency or get_datagov_concurrency())
+
+
+def iter_pages(
+    url: str,
+    params: Dict[str, Any],
+    max_records: Optional[int] = None,
+    page_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> Iterator[Page]:
+    """
+    Pages of a data.gov.in resource in offset order.
+
+    The first page reports the total; the remaining pages are then fetched
+    with up to concurrency requests in flight, stopping at max_records.
+    fields asks the API to return only those record fields. HTTP errors
+    propagate.
+    """
+    page_size, concurrency = _settings(page_size, max_records, concurrency)
+
+    def fetch(offset: int, limit: int) -> Page:
+        response = http_get(
+            url, params=_page_params(params, offset, limit, fields), timeout=timeout
+        )
+        response.raise_for_status()
+        return _page(response.json(), offset)
+
+    first = fetch(0, page_size)
+    yield first
+    plan = _plan(first, page_size, max_records)
+    if not plan:
+        return
+
+    pending: Deque[Future] = deque()
+    with ThreadPoolExecutor(
+        max_workers=min(concurrency, len(plan)), thread_name_prefix="datagov"
+    ) as pool:
+        try:
+            for offset, limit in plan:
+                pending.append(pool.submit(fetch, offset, limit))
+                if len(pending) >= concurrency:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+async def iter_pages_async(
+    url: str,
+    params: Dict[str, Any],
+    max_records: Optional[int] = None,
+    page_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> AsyncIterator[Page]:
+    """
+    Async counterpart of iter_pages.
+    """
+    page_size, concurrency = _settings(page_size, max_records, concurrency)
+
+    async def fetch(offset: int, limit: int) -> Page:
+        response = await async_http_get(
+            url, params=_page_params(params, offset, limit, fields), timeout=timeout
+        )
+        response.raise_for_status()
+        return _page(response.json(), offset)
+
+    first = await fetch(0, page_size)
+    yield first
+    pending: Deque[asyncio.Task] = deque()
+    try:
+        for offset, limit in _plan(first, page_size, max_records):
+            pending.append(asyncio.ensure_future(fetch(offset, limit)))
+            if len(pending) >= concurrency:
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def iter_records(
+    url: str, params: Dict[str, Any], **options: Any
+) -> Iterator[Dict[str, Any]]:
+    """
+    The records of iter_pages as one stream.
+    """
+    for page in iter_pages(url, params, **options):
+        yield from page.records
+
+
+def fetch_records(
+    url: str, params: Dict[str, Any], max_records: int, **options: Any
+) -> Dict[str, Any]:
+    """
+    Up to max_records records with the resource's total, shaped like a
+    single API response.
+    """
+    records: List[Dict[str, Any]] = []
+    total = 0
+    for page in iter_pages(url, params, max_records=max_records, **options):
+        total = page.total
+        records.extend(page.records)
+    return {"records": records[:max_records], "total": total}
+
+
+async def fetch_records_async(
+    url: str, params: Dict[str, Any], max_records: int, **options: Any
+) -> Dict[str, Any]:
+    """
+    Async counterpart of fetch_records.
+    """
+    records: List[Dict[str, Any]] = []
+    total = 0
+    async for page in iter_pages_async(url, params, max_records=max_records, **options):
+        total = page.total
+        records.extend(page.records)
+    return {"records": records[:max_records], "total": total}
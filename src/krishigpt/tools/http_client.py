@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+import weakref
+from typing import Any, AsyncGenerator, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..config import (
+    get_http_backoff,
+    get_http_connect_timeout,
+    get_http_max_backoff,
+    get_http_pool_size,
+    get_http_retries,
+)
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+DEFAULT_READ_TIMEOUT = 10.0
+
+
+def parse_retry_after(
+    value: Optional[str], now: Optional[float] = None
+) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP date).
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed is None:
+        return None
+    return max(0.0, parsed.timestamp() - (now if now is not None else time.time()))
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Full-jitter exponential backoff for the given zero-based retry attempt.
+    """
+    return random.uniform(0, min(cap, base * (2**attempt)))
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff on 429/5xx and connection errors, honouring
+    Retry-After up to max_backoff.
+    """
+
+    def __init__(
+        self, retries: int = 3, backoff: float = 0.5, max_backoff: float = 8.0
+    ) -> None:
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def delay(
+        self,
+        attempt: int,
+        status_code: Optional[int] = None,
+        retry_after: Optional[str] = None,
+    ) -> Optional[float]:
+        """
+        Seconds to wait before retrying, or None when the failure should be
+        returned to the caller. status_code is None for connection errors.
+        """
+        if attempt >= self.retries:
+            return None
+        if status_code is not None and status_code not in RETRY_STATUSES:
+            return None
+        delay = backoff_delay(attempt, self.backoff, self.max_backoff)
+        wait = parse_retry_after(retry_after)
+        if wait is not None:
+            if wait > self.max_backoff:
+                # The server wants us gone for longer than we are willing to
+                # hold the caller; report the failure.
+                return None
+            delay = max(delay, wait)
+        return delay
+
+
+class HttpClient:
+    """
+    Keep-alive HTTP client shared by the tools: one pooled requests.Session
+    per host, (connect, read) timeouts and retries per RetryPolicy.
+    """
+
+    def __init__(
+        self,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        connect_timeout: float = 3.05,
+        pool_size: int = 32,
+    ) -> None:
+        self.policy = RetryPolicy(retries, backoff, max_backoff)
+        self.connect_timeout = connect_timeout
+        self.pool_size = max(1, pool_size)
+        self._sessions: Dict[Tuple[str, str], requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def session_for(self, url: str) -> requests.Session:
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        session = self._sessions.get(key)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(key)
+                if session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=1, pool_maxsize=self.pool_size
+                    )
+                    session.mount(f"{parts.scheme}://", adapter)
+                    self._sessions[key] = session
+        return session
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """
+        GET with retries. Raises requests exceptions like requests.get; a
+        response still failing after the last retry is returned as is so the
+        caller's raise_for_status() reports it.
+        """
+        session = self.session_for(url)
+        read_timeout = timeout if timeout is not None else DEFAULT_READ_TIMEOUT
+        attempt = 0
+        while True:
+            try:
+                response = session.get(
+                    url,
+                    params=params,
+                    timeout=(self.connect_timeout, read_timeout),
+                    **kwargs,
+                )
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                delay = self.policy.delay(attempt)
+                if delay is None:
+                    raise
+                _log_retry(url, exc, attempt, delay)
+            else:
+                delay = self.policy.delay(
+                    attempt, response.status_code, response.headers.get("Retry-After")
+                )
+                if delay is None:
+                    return response
+                _log_retry(url, response.status_code, attempt, delay)
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+class AsyncHttpClient:
+    """
+    httpx counterpart of HttpClient for the async tools. An httpx client is
+    bound to the event loop it was first used on, so one pooled client is
+    kept per running loop and closed when that loop shuts down.
+    """
+
+    def __init__(
+        self,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        connect_timeout: float = 3.05,
+        pool_size: int = 32,
+    ) -> None:
+        self.policy = RetryPolicy(retries, backoff, max_backoff)
+        self.connect_timeout = connect_timeout
+        self.pool_size = max(1, pool_size)
+        self._clients: (
+            "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, "
+            "Tuple[httpx.AsyncClient, AsyncGenerator[None, None]]]"
+        ) = weakref.WeakKeyDictionary()
+
+    async def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(loop)
+        if entry is not None and not entry[0].is_closed:
+            return entry[0]
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=None,
+                max_keepalive_connections=self.pool_size,
+            ),
+            timeout=httpx.Timeout(DEFAULT_READ_TIMEOUT, connect=self.connect_timeout),
+        )
+        # The loop finalizes its live async generators on shutdown
+        # (asyncio.run does this), which closes the client with it.
+        closer = self._close_on_shutdown(client)
+        await closer.__anext__()
+        self._clients[loop] = (client, closer)
+        return client
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        GET with the same retry policy as HttpClient.get. Raises httpx
+        errors; the last failing response is returned for raise_for_status().
+        """
+        client = await self.client()
+        read_timeout = timeout if timeout is not None else DEFAULT_READ_TIMEOUT
+        request_timeout = httpx.Timeout(read_timeout, connect=self.connect_timeout)
+        attempt = 0
+        while True:
+            try:
+                response = await client.get(
+                    url, params=params, timeout=request_timeout, **kwargs
+                )
+            except httpx.TransportError as exc:
+                delay = self.policy.delay(attempt)
+                if delay is None:
+                    raise
+                _log_retry(url, exc, attempt, delay)
+            else:
+                delay = self.policy.delay(
+                    attempt, response.status_code, response.headers.get("Retry-After")
+                )
+                if delay is None:
+                    return response
+                _log_retry(url, response.status_code, attempt, delay)
+                await response.aclose()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self) -> None:
+        """
+        Close the client of the running event loop.
+        """
+        entry = self._clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            await entry[1].aclose()
+
+    async def _close_on_shutdown(
+        self, client: httpx.AsyncClient
+    ) -> AsyncGenerator[None, None]:
+        try:
+            yield
+        finally:
+            loop = asyncio.get_running_loop()
+            entry = self._clients.get(loop)
+            if entry is not None and entry[0] is client:
+                del self._clients[loop]
+            await client.aclose()
+
+
+def _log_retry(url: str, reason: Any, attempt: int, delay: float) -> None:
+    logger.debug(
+        "GET %s failed (%s); retry %d in %.2fs",
+        urlsplit(url).netloc,
+        reason,
+        attempt + 1,
+        delay,
+    )
+
+
+_CLIENT: Optional[HttpClient] = None
+_ASYNC_CLIENT: Optional[AsyncHttpClient] = None
+_LOCK = threading.Lock()
+
+
+def _client_settings() -> Dict[str, Any]:
+    return {
+        "retries": get_http_retries(),
+        "backoff": get_http_backoff(),
+        "max_backoff": get_http_max_backoff(),
+        "connect_timeout": get_http_connect_timeout(),
+        "pool_size": get_http_pool_size(),
+    }
+
+
+def get_http_client() -> HttpClient:
+    global _CLIENT
+    if _CLIENT is None:
+        with _LOCK:
+            if _CLIENT is None:
+                _CLIENT = HttpClient(**_client_settings())
+    return _CLIENT
+
+
+def get_async_http_client() -> AsyncHttpClient:
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is None:
+        with _LOCK:
+            if _ASYNC_CLIENT is None:
+                _ASYNC_CLIENT = AsyncHttpClient(**_client_settings())
+    return _ASYNC_CLIENT
+
+
+def http_get(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    timeout: Optional[float] = None,
+    **kwargs: Any,
+) -> requests.Response:
+    """
+    Drop-in replacement for requests.get using the shared pooled client.
+    """
+    return get_http_client().get(url, params=params, timeout=timeout, **kwargs)
+
+
+async def async_http_get(
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    timeout: Optional[float] = None,
+    **kwargs: Any,
+) -> httpx.Response:
+    """
+    Async counterpart of http_get.
+    """
+    return await get_async_http_client().get(
+        url, params=params, timeout=timeout, **kwargs
+    )
@@ -3,88 +3,165 @@ from __future__ import annotations
 import json
 import logging
 import sys
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
+import httpx
 import requests
 
 from ..config import get_openweather_api_key
+from ..gazetteer import get_gazetteer
+from ..tool_cache import cached_tool
+from .http_client import async_http_get, http_get
 
 logger = logging.getLogger(__name__)
 
 
-def get_lat_lon(
-    location: str = "Bangalore,KA,IN",
-    api_key: Optional[str] = None,
-    timeout: int = 10,
-) -> Dict[str, Any]:
+GEOCODING_URL = "https://api.openweathermap.org/geo/1.0/direct"
+# Place coordinates do not change; keep them for a month.
+GEOCODING_CACHE_TTL = 30 * 86400
+MISSING_KEY = "OPENWEATHER_API_KEY is not set"
+
+
+def _location_error(message: str) -> Dict[str, Any]:
+    return {
+        "status": "error",
+        "message": message,
+        "latitude": None,
+        "longitude": None,
+    }
+
+
+def _offline_location(location: str, fuzzy: bool = False) -> Optional[Dict[str, Any]]:
     """
-    Fetch latitude and longitude for a given location using OpenWeatherMap API.
+    Coordinates from the bundled gazetteer, or None to ask the geocoder.
+    Only exact name, alias or PIN code matches are returned unless fuzzy is
+    set; a spelling-corrected match is no more than a guess.
+    """
+    gazetteer = get_gazetteer() if location else None
+    place = gazetteer.resolve(location, fuzzy) if gazetteer is not None else None
+    if place is None:
+        return None
+    return {
+        "status": "success",
+        "location": location,
+        "latitude": place.latitude,
+        "longitude": place.longitude,
+        "matched_name": place.display_name,
+        "source": "gazetteer_fuzzy" if fuzzy else "gazetteer",
+    }
+
+
+def _fuzzy_fallback(location: str, result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    When the geocoder has no key or no match, try a spelling-corrected
+    gazetteer match before giving up.
+    """
+    if result.get("status") == "success":
+        return result
+    if not (_not_found(result) or result.get("message") == MISSING_KEY):
+        return result
+    return _offline_location(location, fuzzy=True) or result
+
+
+def _not_found(result: Dict[str, Any]) -> bool:
+    return result.get("message", "").startswith("Could not find coordinates")
+
+
+def _geocoding_params(
+    location: str, api_key: Optional[str]
+) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Validate the inputs; returns (error, request params).
     """
     resolved_api_key = get_openweather_api_key()
     if api_key and api_key != resolved_api_key:
         logger.warning("Ignoring provided OpenWeather API key; using .env value.")
     if not resolved_api_key:
-        return {
-            "status": "error",
-            "message": "OPENWEATHER_API_KEY is not set",
-            "latitude": None,
-            "longitude": None,
-        }
+        return _location_error(MISSING_KEY), {}
 
     if not location:
-        return {
-            "status": "error",
-            "message": "Location is required",
-            "latitude": None,
-            "longitude": None,
-        }
+        return _location_error("Location is required"), {}
 
-    url = "https://api.openweathermap.org/geo/1.0/direct"
-    params = {
+    return None, {
         "q": location,
         "limit": 1,
         "appid": resolved_api_key,
     }
 
-    try:
-        response = requests.get(url, params=params, timeout=timeout)
-        response.raise_for_status()
-        data = response.json()
-
-        if data and isinstance(data, list):
-            location_data = data[0]
-            latitude = location_data.get("lat")
-            longitude = location_data.get("lon")
-            return {
-                "status": "success",
-                "location": location,
-                "latitude": latitude,
-                "longitude": longitude,
-            }
-
-        logger.warning("No location data found for '%s'", location)
+
+def _parse_geocoding(location: str, data: Any) -> Dict[str, Any]:
+    if data and isinstance(data, list):
+        location_data = data[0]
+        latitude = location_data.get("lat")
+        longitude = location_data.get("lon")
         return {
-            "status": "error",
-            "message": f"Could not find coordinates for location: {location}",
-            "latitude": None,
-            "longitude": None,
+            "status": "success",
+            "location": location,
+            "latitude": latitude,
+            "longitude": longitude,
+            "source": "openweather",
         }
+
+    logger.warning("No location data found for '%s'", location)
+    return _location_error(f"Could not find coordinates for location: {location}")
+
+
+@cached_tool("get_lat_lon", GEOCODING_CACHE_TTL, not_found=_not_found)
+def get_lat_lon(
+    location: str = "Bangalore,KA,IN",
+    api_key: Optional[str] = None,
+    timeout: int = 10,
+) -> Dict[str, Any]:
+    """
+    Fetch latitude and longitude for a given location using OpenWeatherMap API.
+    """
+    offline = _offline_location(location)
+    if offline:
+        return offline
+
+    error, params = _geocoding_params(location, api_key)
+    if error:
+        return _fuzzy_fallback(location, error)
+
+    try:
+        response = http_get(GEOCODING_URL, params=params, timeout=timeout)
+        response.raise_for_status()
+        return _fuzzy_fallback(location, _parse_geocoding(location, response.json()))
     except requests.exceptions.RequestException as exc:
         logger.exception("Error fetching location data: %s", exc)
-        return {
-            "status": "error",
-            "message": f"Error retrieving coordinates: {str(exc)}",
-            "latitude": None,
-            "longitude": None,
-        }
+        return _location_error(f"Error retrieving coordinates: {str(exc)}")
     except (json.JSONDecodeError, TypeError) as exc:
         logger.exception("Error parsing location response: %s", exc)
-        return {
-            "status": "error",
-            "message": "Error parsing response from API",
-            "latitude": None,
-            "longitude": None,
-        }
+        return _location_error("Error parsing response from API")
+
+
+@cached_tool("get_lat_lon", GEOCODING_CACHE_TTL, not_found=_not_found)
+async def get_lat_lon_async(
+    location: str = "Bangalore,KA,IN",
+    api_key: Optional[str] = None,
+    timeout: int = 10,
+) -> Dict[str, Any]:
+    """
+    Fetch latitude and longitude for a given location using OpenWeatherMap API.
+    """
+    offline = _offline_location(location)
+    if offline:
+        return offline
+
+    error, params = _geocoding_params(location, api_key)
+    if error:
+        return _fuzzy_fallback(location, error)
+
+    try:
+        response = await async_http_get(GEOCODING_URL, params=params, timeout=timeout)
+        response.raise_for_status()
+        return _fuzzy_fallback(location, _parse_geocoding(location, response.json()))
+    except httpx.HTTPError as exc:
+        logger.exception("Error fetching location data: %s", exc)
+        return _location_error(f"Error retrieving coordinates: {str(exc)}")
+    except (json.JSONDecodeError, TypeError) as exc:
+        logger.exception("Error parsing location response: %s", exc)
+        return _location_error("Error parsing response from API")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import csv
+import logging
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..config import is_mandi_canonicalization_enabled
+from ..gazetteer import (
+    STATE_CODES,
+    Gazetteer,
+    edit_distance,
+    fuzzy_limit,
+    get_gazetteer,
+    normalize_name,
+    phonetic_key,
+)
+from .mandi_store import get_mandi_store
+
+logger = logging.getLogger(__name__)
+
+COMMODITY_ALIASES_PATH = (
+    Path(__file__).resolve().parents[1] / "data" / "commodity_aliases.csv"
+)
+
+Match = Tuple[str, str]
+
+
+def read_aliases(path: Path) -> Dict[str, List[str]]:
+    """
+    Canonical name -> aliases from a CSV with name and "|"-separated aliases.
+    """
+    with open(path, newline="", encoding="utf-8") as handle:
+        return {
+            row["name"].strip(): [
+                alias.strip() for alias in (row.get("aliases") or "").split("|")
+            ]
+            for row in csv.DictReader(handle)
+            if row.get("name", "").strip()
+        }
+
+
+class Vocabulary:
+    """
+    The values one field takes in the dataset. Names are matched exactly
+    (after normalization), through aliases, by spelling variant, by word
+    overlap ("Tomato Hybrid" -> "Tomato") or within a small edit distance.
+    """
+
+    def __init__(
+        self,
+        values: Iterable[str],
+        aliases: Optional[Dict[str, Sequence[str]]] = None,
+    ) -> None:
+        self.values = sorted({value.strip() for value in values if value.strip()})
+        self._exact = {normalize_name(value): value for value in self.values}
+        self._phonetic: Dict[str, List[str]] = {}
+        for key, value in self._exact.items():
+            self._phonetic.setdefault(phonetic_key(key), []).append(value)
+        self._words = [
+            (frozenset(key.split()), value) for key, value in self._exact.items()
+        ]
+        self._aliases: Dict[str, Sequence[str]] = {}
+        for alias, targets in (aliases or {}).items():
+            key = normalize_name(alias)
+            if key:
+                self._aliases.setdefault(key, targets)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def _by_words(self, key: str) -> Optional[str]:
+        words = frozenset(key.split())
+        ranked = sorted(
+            (len(words ^ value_words), value)
+            for value_words, value in self._words
+            if words <= value_words or value_words <= words
+        )
+        if not ranked or (len(ranked) > 1 and ranked[0][0] == ranked[1][0]):
+            return None
+        return ranked[0][1]
+
+    def _by_distance(self, key: str) -> Optional[str]:
+        limit = fuzzy_limit(key)
+        if limit == 0 or not key.isascii():
+            return None
+        target = phonetic_key(key)
+        ranked = sorted(
+            (edit_distance(target, phonetic, limit), values[0])
+            for phonetic, values in self._phonetic.items()
+            if len(values) == 1
+        )
+        if not ranked or ranked[0][0] > limit:
+            return None
+        if len(ranked) > 1 and ranked[1][0] == ranked[0][0]:
+            return None
+        return ranked[0][1]
+
+    def _lookup(self, key: str) -> Optional[Match]:
+        if key in self._exact:
+            return self._exact[key], "exact"
+        spellings = self._phonetic.get(phonetic_key(key), [])
+        if len(spellings) == 1:
+            return spellings[0], "spelling"
+        for method, how in ((self._by_words, "partial"), (self._by_distance, "fuzzy")):
+            value = method(key)
+            if value is not None:
+                return value, how
+        return None
+
+    def match(self, name: str) -> Optional[Match]:
+        """
+        (dataset value, how it matched) for a name, or None.
+        """
+        key = normalize_name(name)
+        if not key:
+            return None
+        if key not in self._exact:
+            for target in self._aliases.get(key, ()):
+                found = self._lookup(normalize_name(target))
+                if found is not None and found[1] in ("exact", "spelling"):
+                    return found[0], "alias"
+        return self._lookup(key)
+
+
+def _gazetteer_aliases(
+    gazetteer: Optional[Gazetteer],
+) -> Tuple[Dict[str, List[str]], Dict[str, Dict[str, List[str]]]]:
+    """
+    State aliases, and per state the names each district or town goes by,
+    from the gazetteer (state codes, old names, native scripts, towns ->
+    district).
+    """
+    states: Dict[str, List[str]] = {code: [name] for code, name in STATE_CODES.items()}
+    districts: Dict[str, Dict[str, List[str]]] = {}
+    if gazetteer is None:
+        return states, districts
+    for record in range(len(gazetteer)):
+        place = gazetteer.place(record)
+        if place.kind == "state":
+            for alias in (place.name, *place.aliases):
+                states.setdefault(alias, []).append(place.name)
+            continue
+        targets = [place.district, place.name, *place.aliases]
+        names = districts.setdefault(normalize_name(place.state), {})
+        for alias in (place.name, *place.aliases):
+            names.setdefault(alias, []).extend(targets)
+    return states, districts
+
+
+class MandiNameIndex:
+    """
+    Canonicalizes the state, district and commodity of a mandi query onto
+    the values in the synced dataset, falling back to the bundled state and
+    commodity names before the first sync.
+    """
+
+    def __init__(
+        self,
+        vocabulary: Dict[str, Any],
+        commodity_aliases: Dict[str, List[str]],
+        gazetteer: Optional[Gazetteer] = None,
+    ) -> None:
+        state_aliases, district_aliases = _gazetteer_aliases(gazetteer)
+        states = vocabulary.get("states") or {
+            target for targets in state_aliases.values() for target in targets
+        }
+        self.states = Vocabulary(states, state_aliases)
+        self.districts = {
+            normalize_name(state): Vocabulary(
+                values, district_aliases.get(normalize_name(state))
+            )
+            for state, values in (vocabulary.get("districts") or {}).items()
+        }
+        aliases: Dict[str, List[str]] = {}
+        for name, names in commodity_aliases.items():
+            for alias in names:
+                aliases.setdefault(alias, []).append(name)
+        self.commodities = Vocabulary(
+            vocabulary.get("commodities") or commodity_aliases, aliases
+        )
+
+    def canonicalize(
+        self, state: str, district: str, commodity: str
+    ) -> Tuple[str, str, str, List[Dict[str, str]]]:
+        """
+        Returns (state, district, commodity, corrections). Names that do not
+        match anything are passed through unchanged; each changed name is
+        listed in corrections with how it was matched.
+        """
+        corrections: List[Dict[str, str]] = []
+
+        def resolve(field: str, value: str, vocabulary: Optional[Vocabulary]) -> str:
+            value = (value or "").strip()
+            if not value or vocabulary is None:
+                return value
+            found = vocabulary.match(value)
+            if found is None:
+                return value
+            canonical, how = found
+            if normalize_name(canonical) != normalize_name(value):
+                corrections.append(
+                    {"field": field, "from": value, "to": canonical, "match": how}
+                )
+            return canonical
+
+        state = resolve("state", state, self.states)
+        district = resolve(
+            "district", district, self.districts.get(normalize_name(state))
+        )
+        commodity = resolve("commodity", commodity, self.commodities)
+        return state, district, commodity, corrections
+
+
+_INDEX: Optional[MandiNameIndex] = None
+_INDEX_STAMP: Optional[float] = None
+_LOCK = threading.Lock()
+
+
+def get_mandi_name_index() -> MandiNameIndex:
+    """
+    Return the process-wide name index, rebuilt after each store sync so new
+    dataset values are picked up.
+    """
+    global _INDEX, _INDEX_STAMP
+    store = get_mandi_store()
+    try:
+        stamp = store.last_sync if store is not None else None
+    except sqlite3.Error:
+        stamp = None
+    if _INDEX is None or stamp != _INDEX_STAMP:
+        with _LOCK:
+            if _INDEX is None or stamp != _INDEX_STAMP:
+                vocabulary: Dict[str, Any] = {}
+                if store is not None:
+                    try:
+                        vocabulary = store.vocabulary()
+                    except sqlite3.Error as exc:
+                        logger.warning("Mandi vocabulary unavailable: %s", exc)
+                _INDEX = MandiNameIndex(
+                    vocabulary, read_aliases(COMMODITY_ALIASES_PATH), get_gazetteer()
+                )
+                _INDEX_STAMP = stamp
+    return _INDEX
+
+
+def canonicalize_mandi_query(
+    state: str, district: str, commodity: str
+) -> Tuple[str, str, str, List[Dict[str, str]]]:
+    """
+    Canonical names for a mandi query; when disabled or on any failure the
+    names are returned unchanged with no corrections.
+    """
+    if not is_mandi_canonicalization_enabled():
+        return state, district, commodity, []
+    try:
+        return get_mandi_name_index().canonicalize(state, district, commodity)
+    except (OSError, ValueError, sqlite3.Error) as exc:
+        logger.warning("Mandi name canonicalization failed: %s", exc)
+        return state, district, commodity, []
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4:
+        print("usage: python -m krishigpt.tools.mandi_names STATE DISTRICT COMMODITY")
+        sys.exit(2)
+    print(canonicalize_mandi_query(*sys.argv[1:]))
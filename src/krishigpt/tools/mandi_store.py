@@ -0,0 +1,452 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..config import (
+    get_mandi_api_key,
+    get_mandi_store_max_age,
+    get_mandi_store_path,
+    get_mandi_store_retention_days,
+    is_mandi_store_enabled,
+)
+from .datagov import iter_pages
+from .market import MANDI_FIELDS, MANDI_URL
+
+logger = logging.getLogger(__name__)
+
+SYNC_TIMEOUT = 30
+
+_TEXT_FIELDS = (
+    "state",
+    "district",
+    "market",
+    "commodity",
+    "variety",
+    "grade",
+    "arrival_date",
+)
+_PRICE_FIELDS = ("min_price", "max_price", "modal_price")
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS prices ("
+    "state TEXT NOT NULL COLLATE NOCASE, "
+    "district TEXT NOT NULL COLLATE NOCASE, "
+    "market TEXT NOT NULL COLLATE NOCASE, "
+    "commodity TEXT NOT NULL COLLATE NOCASE, "
+    "variety TEXT NOT NULL COLLATE NOCASE, "
+    "grade TEXT NOT NULL COLLATE NOCASE, "
+    "arrival_date TEXT NOT NULL, "
+    "min_price REAL, max_price REAL, modal_price REAL, "
+    "synced_at REAL NOT NULL, "
+    "PRIMARY KEY (state, district, market, commodity, variety, grade, arrival_date))",
+    "CREATE INDEX IF NOT EXISTS prices_lookup "
+    "ON prices (state, district, commodity, arrival_date)",
+    "CREATE INDEX IF NOT EXISTS prices_state "
+    "ON prices (state, commodity, arrival_date)",
+    "CREATE INDEX IF NOT EXISTS prices_arrival ON prices (arrival_date)",
+    "CREATE TABLE IF NOT EXISTS sync_state (name TEXT PRIMARY KEY, value TEXT)",
+)
+
+
+def parse_arrival_date(value: Any) -> Optional[str]:
+    """
+    ISO date from a data.gov.in arrival_date ("17/10/2026"), or None.
+    """
+    text = str(value or "").strip()
+    for pattern in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text, pattern).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def _price(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _format_price(value: Optional[float]) -> Optional[str]:
+    # The API sends prices as strings; keep that shape for callers.
+    return None if value is None else f"{value:g}"
+
+
+class MandiStore:
+    """
+    Local SQLite copy of the data.gov.in mandi price resource, indexed for
+    the (state, district, commodity, arrival_date) lookups the tool makes.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def _get_state(self, name: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM sync_state WHERE name = ?", (name,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set_state(self, **values: Any) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sync_state (name, value) VALUES (?, ?)",
+                [(name, str(value)) for name, value in values.items()],
+            )
+            self._conn.commit()
+
+    def mark_synced(self, mode: str) -> None:
+        self._set_state(last_sync=time.time(), last_mode=mode)
+
+    @property
+    def last_sync(self) -> Optional[float]:
+        value = self._get_state("last_sync")
+        return float(value) if value else None
+
+    def is_fresh(self, max_age: float) -> bool:
+        last_sync = self.last_sync
+        return last_sync is not None and time.time() - last_sync <= max_age
+
+    def latest_arrival(self) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(arrival_date) FROM prices").fetchone()
+        return row[0] if row else None
+
+    def upsert(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert or replace API records; returns how many were stored. Records
+        without a state, commodity or parseable arrival date are skipped.
+        """
+        now = time.time()
+        rows = []
+        for record in records:
+            arrival = parse_arrival_date(record.get("arrival_date"))
+            state = str(record.get("state") or "").strip()
+            commodity = str(record.get("commodity") or "").strip()
+            if not arrival or not state or not commodity:
+                continue
+            rows.append(
+                (
+                    state,
+                    str(record.get("district") or "").strip(),
+                    str(record.get("market") or "").strip(),
+                    commodity,
+                    str(record.get("variety") or "").strip(),
+                    str(record.get("grade") or "").strip(),
+                    arrival,
+                    *(_price(record.get(field)) for field in _PRICE_FIELDS),
+                    now,
+                )
+            )
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO prices (state, district, market, commodity, "
+                "variety, grade, arrival_date, min_price, max_price, modal_price, "
+                "synced_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def prune(self, keep_days: int) -> int:
+        cutoff = (date.today() - timedelta(days=keep_days)).isoformat()
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM prices WHERE arrival_date < ?", (cutoff,)
+            ).rowcount
+            self._conn.commit()
+        return max(removed, 0)
+
+    @staticmethod
+    def _where(state: str, district: str, commodity: str) -> Tuple[str, List[Any]]:
+        where = "state = ? AND commodity = ?"
+        params: List[Any] = [state.strip(), commodity.strip()]
+        if district and district.strip():
+            where += " AND district = ?"
+            params.append(district.strip())
+        return where, params
+
+    def query(
+        self, state: str, district: str, commodity: str, limit: int = 10
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Latest records for the filters (case-insensitive, district optional)
+        in the API's record shape, with the total number of matches.
+        """
+        where, params = self._where(state, district, commodity)
+        with self._lock:
+            total = self._conn.execute(
+                f"SELECT COUNT(*) FROM prices WHERE {where}", params
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                "SELECT state, district, market, commodity, variety, grade, "
+                "arrival_date, min_price, max_price, modal_price FROM prices "
+                f"WHERE {where} ORDER BY arrival_date DESC, market LIMIT ?",
+                [*params, max(0, int(limit))],
+            ).fetchall()
+        records = []
+        for row in rows:
+            record: Dict[str, Any] = dict(zip(_TEXT_FIELDS, row))
+            record["arrival_date"] = date.fromisoformat(
+                record["arrival_date"]
+            ).strftime("%d/%m/%Y")
+            record.update(zip(_PRICE_FIELDS, map(_format_price, row[7:])))
+            records.append(record)
+        return records, total
+
+    def history(
+        self, state: str, district: str, commodity: str, since: str
+    ) -> List[Tuple[str, str, str, Optional[float], Optional[float], Optional[float]]]:
+        """
+        (district, market, ISO arrival date, min, max, modal price) rows on or
+        after since, oldest first.
+        """
+        where, params = self._where(state, district, commodity)
+        with self._lock:
+            return self._conn.execute(
+                "SELECT district, market, arrival_date, min_price, max_price, "
+                f"modal_price FROM prices WHERE {where} AND arrival_date >= ? "
+                "ORDER BY arrival_date",
+                [*params, since],
+            ).fetchall()
+
+    def vocabulary(self) -> Dict[str, Any]:
+        """
+        Distinct states, districts per state and commodities in the store.
+        """
+        with self._lock:
+            states = [
+                row[0]
+                for row in self._conn.execute("SELECT DISTINCT state FROM prices")
+            ]
+            pairs = self._conn.execute(
+                "SELECT DISTINCT state, district FROM prices"
+            ).fetchall()
+            commodities = [
+                row[0]
+                for row in self._conn.execute("SELECT DISTINCT commodity FROM prices")
+            ]
+        districts: Dict[str, List[str]] = {}
+        for state, district in pairs:
+            if district:
+                districts.setdefault(state, []).append(district)
+        return {"states": states, "districts": districts, "commodities": commodities}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, first, last = self._conn.execute(
+                "SELECT COUNT(*), MIN(arrival_date), MAX(arrival_date) FROM prices"
+            ).fetchone()
+        last_sync = self.last_sync
+        return {
+            "path": str(self.path),
+            "records": count,
+            "first_arrival": first,
+            "latest_arrival": last,
+            "last_sync": (
+                datetime.fromtimestamp(last_sync).isoformat(timespec="seconds")
+                if last_sync
+                else None
+            ),
+            "age_seconds": round(time.time() - last_sync) if last_sync else None,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _dates_since(latest: str) -> List[str]:
+    start = date.fromisoformat(latest)
+    days = (date.today() - start).days
+    return [
+        (start + timedelta(days=offset)).strftime("%d/%m/%Y")
+        for offset in range(max(days, 0) + 1)
+    ]
+
+
+def sync_mandi_store(
+    store: MandiStore,
+    api_key: Optional[str] = None,
+    full: bool = False,
+    page_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Pull mandi prices into the store.
+
+    The first sync (or full=True) pages through the whole resource. Later
+    syncs only request arrival dates from the latest stored one up to today,
+    re-reading that day because arrivals are published through the day.
+    Pages after the first are fetched in parallel; HTTP errors abort the
+    sync so a failed one is never marked done.
+    """
+    api_key = api_key or get_mandi_api_key()
+    if not api_key:
+        return {"status": "error", "message": "MANDI_API_KEY is not set"}
+
+    retention = get_mandi_store_retention_days()
+    latest = store.latest_arrival()
+    oldest = (date.today() - timedelta(days=retention)).isoformat()
+    if full or latest is None or latest < oldest:
+        dates: Sequence[Optional[str]] = [None]
+    else:
+        dates = _dates_since(latest)
+
+    started = time.perf_counter()
+    stored = 0
+    try:
+        for arrival in dates:
+            params = {"api-key": api_key, "format": "json"}
+            if arrival:
+                params["filters[arrival_date]"] = arrival
+            for page in iter_pages(
+                MANDI_URL,
+                params,
+                page_size=page_size,
+                fields=MANDI_FIELDS,
+                timeout=SYNC_TIMEOUT,
+            ):
+                stored += store.upsert(page.records)
+    except Exception as exc:
+        logger.exception("Mandi store sync failed: %s", exc)
+        return {
+            "status": "error",
+            "message": f"Mandi store sync failed: {exc}",
+            "records": stored,
+        }
+
+    mode = "full" if dates == [None] else "incremental"
+    pruned = store.prune(retention)
+    store.mark_synced(mode)
+    return {
+        "status": "success",
+        "message": f"Synced {stored} mandi price records",
+        "mode": mode,
+        "dates": [arrival for arrival in dates if arrival],
+        "records": stored,
+        "pruned": pruned,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+_STORE: Optional[MandiStore] = None
+_LOCK = threading.Lock()
+
+
+def get_mandi_store() -> Optional[MandiStore]:
+    """
+    Return the process-wide mandi store, or None when it is disabled or
+    cannot be opened.
+    """
+    global _STORE
+    if not is_mandi_store_enabled():
+        return None
+    if _STORE is None:
+        with _LOCK:
+            if _STORE is None:
+                try:
+                    _STORE = MandiStore(get_mandi_store_path())
+                except (OSError, sqlite3.Error) as exc:
+                    logger.warning("Mandi store unavailable: %s", exc)
+                    return None
+    return _STORE
+
+
+def query_fresh(
+    state: str, district: str, commodity: str, limit: int, stale_ok: bool = False
+) -> Optional[Dict[str, Any]]:
+    """
+    Tool result from the store, or None when the caller should use the API.
+
+    A fresh store is authoritative, so no matches is a "not found" result.
+    With stale_ok (the API is failing) any stored matches are returned,
+    marked stale.
+    """
+    store = get_mandi_store()
+    if store is None:
+        return None
+    try:
+        fresh = store.is_fresh(get_mandi_store_max_age())
+        if not fresh and not stale_ok:
+            return None
+        records, total = store.query(state, district, commodity, limit)
+    except sqlite3.Error as exc:
+        logger.warning("Mandi store read failed: %s", exc)
+        return None
+    if not records:
+        if not fresh:
+            return None
+        return {
+            "status": "error",
+            "message": "No mandi price records found for the given filters",
+            "records": [],
+        }
+    result = {
+        "status": "success",
+        "message": "Successfully retrieved mandi price data",
+        "count": len(records),
+        "total": total,
+        "truncated": total > len(records),
+        "records": records,
+        "source": "store",
+    }
+    if not fresh:
+        result["stale"] = True
+        result["synced_at"] = store.stats()["last_sync"]
+    return result
+
+
+def _main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="KrishiGPT mandi price store")
+    commands = parser.add_subparsers(dest="command", required=True)
+    sync = commands.add_parser("sync", help="pull new prices from data.gov.in")
+    sync.add_argument("--full", action="store_true", help="re-read every page")
+    sync.add_argument("--page-size", type=int)
+    commands.add_parser("stats", help="show what the store holds")
+    query = commands.add_parser("query", help="look up prices in the store")
+    query.add_argument("state")
+    query.add_argument("district")
+    query.add_argument("commodity")
+    query.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    store = get_mandi_store()
+    if store is None:
+        print("Mandi store is disabled", file=sys.stderr)
+        return 1
+
+    if args.command == "sync":
+        result = sync_mandi_store(store, full=args.full, page_size=args.page_size)
+    elif args.command == "stats":
+        result = store.stats()
+    else:
+        records, total = store.query(
+            args.state, args.district, args.commodity, args.limit
+        )
+        result = {"total": total, "records": records}
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0 if result.get("status", "success") == "success" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
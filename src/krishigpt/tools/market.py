@@ -3,92 +3,234 @@ from __future__ import annotations
 import json
 import logging
 import sys
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import httpx
 import requests
 
-from ..config import get_mandi_api_key
+from ..config import get_mandi_api_key, get_mandi_max_records
+from ..tool_cache import cached_tool
+from .datagov import fetch_records, fetch_records_async
 
 logger = logging.getLogger(__name__)
 
 
-def get_mandi_prices(
+MANDI_URL = "https://api.data.gov.in/resource/9ef84268-d588-465a-a308-a864a43d0070"
+# Arrivals are published through the day, so prices are refetched hourly.
+MANDI_CACHE_TTL = 3600
+# Only the fields the tools return are requested.
+MANDI_FIELDS = (
+    "state",
+    "district",
+    "market",
+    "commodity",
+    "variety",
+    "grade",
+    "arrival_date",
+    "min_price",
+    "max_price",
+    "modal_price",
+)
+
+
+def _mandi_error(message: str, records: Optional[list] = None) -> Dict[str, Any]:
+    return {"status": "error", "message": message, "records": records}
+
+
+def _not_found(result: Dict[str, Any]) -> bool:
+    return result.get("message", "").startswith("No mandi price records found")
+
+
+def _mandi_params(
     state: str,
     district: str,
     commodity: str,
-    api_key: Optional[str] = None,
-    timeout: int = 10,
-    limit: int = 10,
-) -> Dict[str, Any]:
+    api_key: Optional[str],
+) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
     """
-    Fetch mandi prices for a commodity using data.gov.in API.
+    Validate the inputs; returns (error, request params).
     """
     resolved_api_key = get_mandi_api_key()
     if api_key and api_key != resolved_api_key:
         logger.warning("Ignoring provided MANDI API key; using .env value.")
     if not resolved_api_key:
-        return {
-            "status": "error",
-            "message": "MANDI_API_KEY is not set",
-            "records": None,
-        }
+        return _mandi_error("MANDI_API_KEY is not set"), {}
 
     state = (state or "").strip()
     district = (district or "").strip()
     commodity = (commodity or "").strip()
 
     if not state or not commodity:
-        return {
-            "status": "error",
-            "message": "state and commodity are required",
-            "records": None,
-        }
+        return _mandi_error("state and commodity are required"), {}
 
-    url = "https://api.data.gov.in/resource/9ef84268-d588-465a-a308-a864a43d0070"
     params = {
         "api-key": resolved_api_key,
         "format": "json",
         "filters[state.keyword]": state,
         "filters[commodity]": commodity,
-        "limit": str(limit),
     }
     if district:
         params["filters[district]"] = district
+    return None, params
+
+
+def _record_limit(limit: int) -> int:
+    return max(1, min(int(limit), get_mandi_max_records()))
+
+
+def _parse_mandi(data: Dict[str, Any]) -> Dict[str, Any]:
+    records = data.get("records", [])
+    if not records:
+        return _mandi_error("No mandi price records found for the given filters", [])
+
+    total = data.get("total") or len(records)
+    return {
+        "status": "success",
+        "message": "Successfully retrieved mandi price data",
+        "count": len(records),
+        "total": total,
+        "truncated": total > len(records),
+        "records": records,
+        "source": "data.gov.in",
+    }
+
+
+def _from_store(
+    state: str, district: str, commodity: str, limit: int, stale_ok: bool = False
+) -> Optional[Dict[str, Any]]:
+    # Imported here: the store imports MANDI_URL from this module.
+    from .mandi_store import query_fresh
+
+    return query_fresh(state, district, commodity, limit, stale_ok=stale_ok)
+
+
+def _canonical_names(
+    state: str, district: str, commodity: str
+) -> Tuple[str, str, str, List[Dict[str, str]]]:
+    # Imported here for the same reason as the store.
+    from .mandi_names import canonicalize_mandi_query
+
+    return canonicalize_mandi_query(state, district, commodity)
+
+
+def _with_corrections(
+    result: Dict[str, Any], corrections: List[Dict[str, str]]
+) -> Dict[str, Any]:
+    if corrections:
+        result["corrections"] = corrections
+    return result
+
+
+def _fetch_mandi_prices(
+    state: str,
+    district: str,
+    commodity: str,
+    api_key: Optional[str],
+    timeout: int,
+    limit: int,
+) -> Dict[str, Any]:
+    error, params = _mandi_params(state, district, commodity, api_key)
+    if error:
+        return error
+    limit = _record_limit(limit)
+    stored = _from_store(state, district, commodity, limit)
+    if stored is not None:
+        return stored
 
     try:
-        response = requests.get(url, params=params, timeout=timeout)
-        response.raise_for_status()
-        data = response.json()
-
-        records = data.get("records", [])
-        if not records:
-            return {
-                "status": "error",
-                "message": "No mandi price records found for the given filters",
-                "records": [],
-            }
-
-        return {
-            "status": "success",
-            "message": "Successfully retrieved mandi price data",
-            "count": data.get("count", len(records)),
-            "total": data.get("total"),
-            "records": records,
-        }
+        data = fetch_records(
+            MANDI_URL, params, limit, fields=MANDI_FIELDS, timeout=timeout
+        )
+        return _parse_mandi(data)
     except requests.exceptions.RequestException as exc:
         logger.exception("Error fetching mandi data: %s", exc)
-        return {
-            "status": "error",
-            "message": f"Error fetching mandi data: {exc}",
-            "records": None,
-        }
+        stored = _from_store(state, district, commodity, limit, stale_ok=True)
+        if stored is not None:
+            return stored
+        return _mandi_error(f"Error fetching mandi data: {exc}")
+    except (json.JSONDecodeError, TypeError, KeyError) as exc:
+        logger.exception("Error processing mandi data: %s", exc)
+        return _mandi_error(f"Error processing mandi data: {exc}")
+
+
+async def _fetch_mandi_prices_async(
+    state: str,
+    district: str,
+    commodity: str,
+    api_key: Optional[str],
+    timeout: int,
+    limit: int,
+) -> Dict[str, Any]:
+    error, params = _mandi_params(state, district, commodity, api_key)
+    if error:
+        return error
+    limit = _record_limit(limit)
+    stored = _from_store(state, district, commodity, limit)
+    if stored is not None:
+        return stored
+
+    try:
+        data = await fetch_records_async(
+            MANDI_URL, params, limit, fields=MANDI_FIELDS, timeout=timeout
+        )
+        return _parse_mandi(data)
+    except httpx.HTTPError as exc:
+        logger.exception("Error fetching mandi data: %s", exc)
+        stored = _from_store(state, district, commodity, limit, stale_ok=True)
+        if stored is not None:
+            return stored
+        return _mandi_error(f"Error fetching mandi data: {exc}")
     except (json.JSONDecodeError, TypeError, KeyError) as exc:
         logger.exception("Error processing mandi data: %s", exc)
-        return {
-            "status": "error",
-            "message": f"Error processing mandi data: {exc}",
-            "records": None,
-        }
+        return _mandi_error(f"Error processing mandi data: {exc}")
+
+
+@cached_tool("get_mandi_prices", MANDI_CACHE_TTL, not_found=_not_found)
+def get_mandi_prices(
+    state: str,
+    district: str,
+    commodity: str,
+    api_key: Optional[str] = None,
+    timeout: int = 10,
+    limit: int = 10,
+) -> Dict[str, Any]:
+    """
+    Fetch mandi prices for a commodity, from the local store when it has
+    been synced recently and from the data.gov.in API otherwise. State,
+    district and commodity names are first mapped onto the dataset's own
+    spellings; any name changed is listed under "corrections". Up to
+    limit records are returned; "truncated" is set when more matched.
+    """
+    state, district, commodity, corrections = _canonical_names(
+        state, district, commodity
+    )
+    result = _fetch_mandi_prices(state, district, commodity, api_key, timeout, limit)
+    return _with_corrections(result, corrections)
+
+
+@cached_tool("get_mandi_prices", MANDI_CACHE_TTL, not_found=_not_found)
+async def get_mandi_prices_async(
+    state: str,
+    district: str,
+    commodity: str,
+    api_key: Optional[str] = None,
+    timeout: int = 10,
+    limit: int = 10,
+) -> Dict[str, Any]:
+    """
+    Fetch mandi prices for a commodity, from the local store when it has
+    been synced recently and from the data.gov.in API otherwise. State,
+    district and commodity names are first mapped onto the dataset's own
+    spellings; any name changed is listed under "corrections". Up to
+    limit records are returned; "truncated" is set when more matched.
+    """
+    state, district, commodity, corrections = _canonical_names(
+        state, district, commodity
+    )
+    result = await _fetch_mandi_prices_async(
+        state, district, commodity, api_key, timeout, limit
+    )
+    return _with_corrections(result, corrections)
 
 
 if __name__ == "__main__":
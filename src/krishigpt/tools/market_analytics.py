@@ -0,0 +1,432 @@
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import sys
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..config import get_mandi_max_records, get_mandi_store_max_age
+from ..tool_cache import cached_tool
+from .mandi_names import canonicalize_mandi_query
+from .mandi_store import get_mandi_store, parse_arrival_date
+from .market import MANDI_CACHE_TTL, get_mandi_prices, get_mandi_prices_async
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DAYS = 30
+WEEK_DAYS = 7
+# Week-over-week moves smaller than this are reported as flat.
+FLAT_CHANGE_PCT = 2.0
+TOP_MARKETS = 5
+UNIT = "Rs/quintal"
+
+
+def _analytics_error(message: str) -> Dict[str, Any]:
+    return {"status": "error", "message": message, "analytics": None}
+
+
+def _not_found(result: Dict[str, Any]) -> bool:
+    return result.get("message", "").startswith("No mandi price records found")
+
+
+def to_columns(
+    rows: Sequence[Tuple[Any, Any, Any, Any, Any, Any]],
+) -> Dict[str, np.ndarray]:
+    """
+    Columnar arrays from (district, market, ISO date, min, max, modal) rows;
+    rows without a positive modal price are dropped. Markets are coded as
+    integers indexing "market_names" / "market_districts".
+    """
+    table = np.array(
+        [(row[3], row[4], row[5]) for row in rows], dtype=np.float64
+    ).reshape(-1, 3)
+    days = np.array(
+        [date.fromisoformat(row[2]).toordinal() for row in rows], dtype=np.int64
+    )
+    labels = np.array([f"{row[1]}\x1f{row[0]}" for row in rows], dtype=str)
+    keep = np.isfinite(table[:, 2]) & (table[:, 2] > 0)
+    names, codes = np.unique(labels[keep], return_inverse=True)
+    split = [name.split("\x1f") for name in names.tolist()]
+    return {
+        "day": days[keep],
+        "min": table[keep, 0],
+        "max": table[keep, 1],
+        "modal": table[keep, 2],
+        "market": codes.astype(np.int64),
+        "market_names": np.array([market for market, _ in split], dtype=object),
+        "market_districts": np.array([district for _, district in split], dtype=object),
+    }
+
+
+def daily_totals(
+    day: np.ndarray, modal: np.ndarray, market: np.ndarray, markets: int
+) -> Tuple[int, np.ndarray, np.ndarray]:
+    """
+    (first day ordinal, modal price sums, report counts) per market on a
+    dense day axis, as markets x days arrays.
+    """
+    first = int(day.min())
+    offset = day - first
+    length = int(offset.max()) + 1
+    sums = np.zeros((markets, length))
+    counts = np.zeros((markets, length))
+    np.add.at(sums, (market, offset), modal)
+    np.add.at(counts, (market, offset), 1.0)
+    return first, sums, counts
+
+
+def rolling_average(sums: np.ndarray, counts: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing window average along the last axis of all reports in the last
+    window days (NaN where there were none).
+    """
+
+    def trailing(values: np.ndarray) -> np.ndarray:
+        total = np.cumsum(values, axis=-1)
+        total[..., window:] -= total[..., :-window].copy()
+        return total
+
+    total, reports = trailing(sums), trailing(counts)
+    return np.divide(
+        total, reports, out=np.full(total.shape, np.nan), where=reports > 0
+    )
+
+
+def market_median(values: np.ndarray) -> np.ndarray:
+    """
+    Median across markets (axis 0) of the markets with a value, per day.
+    """
+    median = np.full(values.shape[1], np.nan)
+    present = np.isfinite(values).any(axis=0)
+    median[present] = np.nanmedian(values[:, present], axis=0)
+    return median
+
+
+def latest_by_market(columns: Dict[str, np.ndarray], since: int) -> np.ndarray:
+    """
+    Row index of each market's most recent report on or after day since.
+    """
+    rows = np.flatnonzero(columns["day"] >= since)
+    order = rows[np.lexsort((columns["day"][rows], columns["market"][rows]))]
+    markets = columns["market"][order]
+    last = np.r_[markets[1:] != markets[:-1], True]
+    return order[last]
+
+
+def _round(value: float) -> Optional[float]:
+    return None if not np.isfinite(value) else round(float(value), 1)
+
+
+def _trend(columns: Dict[str, np.ndarray]) -> Optional[Dict[str, Any]]:
+    markets = int(columns["market_names"].size)
+    first, sums, counts = daily_totals(
+        columns["day"], columns["modal"], columns["market"], markets
+    )
+    if np.count_nonzero(counts.sum(axis=0)) < 2:
+        return None
+    # Markets report on different days, so pooling their prices would turn a
+    # change in who reported into a price move. Each market is instead taken
+    # relative to its own average price and the markets are combined by
+    # median; the result is scaled to the current 7-day average.
+    baseline = sums.sum(axis=1) / counts.sum(axis=1)
+    relative = market_median(
+        rolling_average(sums, counts, WEEK_DAYS) / baseline[:, np.newaxis]
+    )
+    current = rolling_average(sums.sum(axis=0), counts.sum(axis=0), WEEK_DAYS)[-1]
+    scale = current / relative[-1]
+    level = relative * scale
+    latest = level[-1]
+    previous = level[-1 - WEEK_DAYS] if level.size > WEEK_DAYS else np.nan
+    change = (latest - previous) / previous * 100 if previous > 0 else np.nan
+
+    daily = market_median(
+        np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts > 0)
+        / baseline[:, np.newaxis]
+    )
+    reported = np.flatnonzero(np.isfinite(daily))
+    slope = np.polyfit(reported.astype(np.float64), daily[reported], 1)[0] * scale
+
+    if np.isfinite(change):
+        moving = abs(change) >= FLAT_CHANGE_PCT
+        direction = ("rising" if change > 0 else "falling") if moving else "flat"
+    else:
+        direction = "rising" if slope > 0 else "falling" if slope < 0 else "flat"
+
+    # One point per week, ending on the latest day, is enough to describe a
+    # month without sending every daily value.
+    weeks = np.arange(level.size - 1, -1, -WEEK_DAYS)[::-1]
+    weekly = [
+        {
+            "week_ending": date.fromordinal(first + int(index)).isoformat(),
+            "average_modal": _round(level[index]),
+        }
+        for index in weeks
+        if np.isfinite(level[index])
+    ]
+    return {
+        "latest_7day_average": _round(latest),
+        "previous_7day_average": _round(previous),
+        "week_over_week_pct": _round(change),
+        "direction": direction,
+        "slope_per_day": _round(slope),
+        "weekly_averages": weekly,
+    }
+
+
+def _market_entry(columns: Dict[str, np.ndarray], row: int) -> Dict[str, Any]:
+    code = columns["market"][row]
+    return {
+        "market": columns["market_names"][code],
+        "district": columns["market_districts"][code],
+        "modal_price": _round(columns["modal"][row]),
+        "min_price": _round(columns["min"][row]),
+        "max_price": _round(columns["max"][row]),
+        "arrival_date": date.fromordinal(int(columns["day"][row])).isoformat(),
+    }
+
+
+def analyze_prices(
+    columns: Dict[str, np.ndarray], top: int = TOP_MARKETS
+) -> Dict[str, Any]:
+    """
+    Trend, cross-market spread and market ranking for one commodity and
+    region. Spread and ranking use each market's latest price from the last
+    week so one stale report does not top the list.
+    """
+    last = int(columns["day"].max())
+    latest = latest_by_market(columns, last - WEEK_DAYS + 1)
+    ranked = latest[np.argsort(-columns["modal"][latest], kind="stable")]
+    modal = columns["modal"][ranked]
+    spread = modal.max() - modal.min()
+    return {
+        "period": {
+            "from": date.fromordinal(int(columns["day"].min())).isoformat(),
+            "to": date.fromordinal(last).isoformat(),
+            "records": int(columns["day"].size),
+            "days_with_prices": int(np.unique(columns["day"]).size),
+        },
+        "trend": _trend(columns),
+        "spread": {
+            "markets": int(ranked.size),
+            "highest_modal": _round(modal.max()),
+            "lowest_modal": _round(modal.min()),
+            "median_modal": _round(np.median(modal)),
+            "spread": _round(spread),
+            "spread_pct": _round(spread / modal.min() * 100),
+        },
+        "top_markets": [
+            {"rank": rank, **_market_entry(columns, row)}
+            for rank, row in enumerate(ranked[:top], 1)
+        ],
+        "lowest_market": _market_entry(columns, ranked[-1]),
+    }
+
+
+def _summary_text(commodity: str, region: str, analytics: Dict[str, Any]) -> str:
+    lines = [f"{commodity} in {region} ({UNIT}):"]
+    trend = analytics["trend"]
+    if trend is None:
+        lines.append("Only one day of prices is available, so no trend yet.")
+    else:
+        change = trend["week_over_week_pct"]
+        lines.append(
+            f"Prices are {trend['direction']}: 7-day average "
+            f"{trend['latest_7day_average']}"
+            + (f", {change:+.1f}% week over week." if change is not None else ".")
+        )
+    spread = analytics["spread"]
+    best = analytics["top_markets"][0]
+    lines.append(
+        f"Across {spread['markets']} markets the modal price ranges from "
+        f"{spread['lowest_modal']} to {spread['highest_modal']}; "
+        f"{best['market']} ({best['district']}) pays the most."
+    )
+    return "\n".join(lines) + "\n"
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _rows_from_records(records: Sequence[Dict[str, Any]]) -> List[Tuple[Any, ...]]:
+    rows = []
+    for record in records:
+        arrival = parse_arrival_date(record.get("arrival_date"))
+        if arrival:
+            rows.append(
+                (
+                    record.get("district") or "",
+                    record.get("market") or "",
+                    arrival,
+                    _number(record.get("min_price")),
+                    _number(record.get("max_price")),
+                    _number(record.get("modal_price")),
+                )
+            )
+    return rows
+
+
+def _store_rows(
+    state: str, district: str, commodity: str, days: int
+) -> Tuple[List[Tuple[Any, ...]], Optional[str]]:
+    """
+    Stored history and, when the store is past its maximum age, the time of
+    its last sync.
+    """
+    store = get_mandi_store()
+    if store is None:
+        return [], None
+    since = (date.today() - timedelta(days=max(1, days))).isoformat()
+    try:
+        rows = store.history(state, district, commodity, since)
+        if not rows or store.is_fresh(get_mandi_store_max_age()):
+            return rows, None
+        return rows, store.stats()["last_sync"]
+    except sqlite3.Error as exc:
+        logger.warning("Mandi store read failed: %s", exc)
+        return [], None
+
+
+def _choose_rows(
+    rows: List[Tuple[Any, ...]],
+    synced_at: Optional[str],
+    snapshot: Optional[Dict[str, Any]],
+) -> Tuple[Optional[Dict[str, Any]], List[Tuple[Any, ...]], str, Optional[str]]:
+    """
+    Pick between stored history and the API snapshot fetched because the
+    store had none or was stale: (error, rows, source, stale synced_at).
+    Stale history is used only when the snapshot fails.
+    """
+    if snapshot is None:
+        return None, rows, "store", None
+    if snapshot.get("status") == "success" and snapshot.get("records"):
+        return (
+            None,
+            _rows_from_records(snapshot["records"]),
+            snapshot.get("source", "data.gov.in"),
+            snapshot.get("synced_at") if snapshot.get("stale") else None,
+        )
+    if rows:
+        return None, rows, "store", synced_at
+    return _analytics_error(snapshot.get("message", "No mandi data")), [], "", None
+
+
+def _build_result(
+    rows: Sequence[Tuple[Any, ...]],
+    state: str,
+    district: str,
+    commodity: str,
+    top: int,
+    source: str,
+    corrections: List[Dict[str, str]],
+    synced_at: Optional[str] = None,
+) -> Dict[str, Any]:
+    try:
+        columns = to_columns(rows)
+    except (TypeError, ValueError) as exc:
+        logger.exception("Error processing mandi history: %s", exc)
+        return _analytics_error(f"Error processing mandi data: {exc}")
+    if columns["day"].size == 0:
+        return _analytics_error("No mandi price records found for the given filters")
+    analytics = analyze_prices(columns, top)
+    region = f"{district}, {state}" if district else state
+    result = {
+        "status": "success",
+        "message": "Computed mandi price analytics",
+        "state": state,
+        "district": district or None,
+        "commodity": commodity,
+        "unit": UNIT,
+        "source": source,
+        **analytics,
+        "text_summary": _summary_text(commodity, region, analytics),
+    }
+    if synced_at is not None:
+        result["stale"] = True
+        result["synced_at"] = synced_at
+    if corrections:
+        result["corrections"] = corrections
+    return result
+
+
+@cached_tool("get_mandi_price_analytics", MANDI_CACHE_TTL, not_found=_not_found)
+def get_mandi_price_analytics(
+    state: str,
+    district: str,
+    commodity: str,
+    days: int = HISTORY_DAYS,
+    top: int = TOP_MARKETS,
+) -> Dict[str, Any]:
+    """
+    Summarize mandi prices for a commodity in a state (district optional):
+    modal-price trend with week-over-week change, the spread between markets
+    and markets ranked by modal price, over the last `days` days.
+    """
+    state, district, commodity, corrections = canonicalize_mandi_query(
+        state, district, commodity
+    )
+    if not state or not commodity:
+        return _analytics_error("state and commodity are required")
+    rows, synced_at = _store_rows(state, district, commodity, days)
+    snapshot = None
+    if not rows or synced_at is not None:
+        # No synced history, or history gone stale: today's snapshot still
+        # gives spread and ranking, read up to the record ceiling so every
+        # market in a state is ranked.
+        snapshot = get_mandi_prices(
+            state, district, commodity, limit=get_mandi_max_records()
+        )
+    error, rows, source, synced_at = _choose_rows(rows, synced_at, snapshot)
+    if error:
+        return error
+    return _build_result(
+        rows, state, district, commodity, top, source, corrections, synced_at
+    )
+
+
+@cached_tool("get_mandi_price_analytics", MANDI_CACHE_TTL, not_found=_not_found)
+async def get_mandi_price_analytics_async(
+    state: str,
+    district: str,
+    commodity: str,
+    days: int = HISTORY_DAYS,
+    top: int = TOP_MARKETS,
+) -> Dict[str, Any]:
+    """
+    Summarize mandi prices for a commodity in a state (district optional):
+    modal-price trend with week-over-week change, the spread between markets
+    and markets ranked by modal price, over the last `days` days.
+    """
+    state, district, commodity, corrections = canonicalize_mandi_query(
+        state, district, commodity
+    )
+    if not state or not commodity:
+        return _analytics_error("state and commodity are required")
+    rows, synced_at = _store_rows(state, district, commodity, days)
+    snapshot = None
+    if not rows or synced_at is not None:
+        snapshot = await get_mandi_prices_async(
+            state, district, commodity, limit=get_mandi_max_records()
+        )
+    error, rows, source, synced_at = _choose_rows(rows, synced_at, snapshot)
+    if error:
+        return error
+    return _build_result(
+        rows, state, district, commodity, top, source, corrections, synced_at
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 4:
+        print(
+            "usage: python -m krishigpt.tools.market_analytics STATE DISTRICT COMMODITY"
+        )
+        sys.exit(2)
+    print(json.dumps(get_mandi_price_analytics(*sys.argv[1:4]), ensure_ascii=False))
@@ -1,34 +1,24 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any, Dict
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-from openai import OpenAI
+from ..config import is_sarvam_streaming_enabled, is_telemetry_enabled
+from ..streaming import TOOL_DELTA, StreamChunk, publish_tool_chunk
+from ..telemetry import LLM, get_metrics, get_trace
+from .advice_cache import get_advice_cache
+from .sarvam_gateway import SarvamGateway, get_sarvam_gateway
 
-from ..config import get_sarvam_api_key
+if TYPE_CHECKING:
+    from google.adk.tools.tool_context import ToolContext
 
 logger = logging.getLogger(__name__)
 
-
-def use_sarvam_llm(query: str) -> Dict[str, Any]:
-    """
-    Process a non-weather query using the Sarvam LLM API.
-    """
-    api_key = get_sarvam_api_key()
-    if not api_key:
-        return {
-            "status": "error",
-            "message": "SARVAM_API_KEY is not set",
-            "response": (
-                "I'm sorry, I couldn't process your farming query at the moment. "
-                "Please try again later or ask a different question about farming."
-            ),
-        }
-
-    try:
-        client = OpenAI(base_url="https://api.sarvam.ai/v1", api_key=api_key)
-
-        system_message = """
+SARVAM_MODEL = "sarvam-m"
+TOOL_NAME = "use_sarvam_llm"
+SYSTEM_MESSAGE = """
 You are a knowledgeable farming assistant that helps farmers with their questions.
 Provide accurate, practical, and helpful information about:
 - Crop cultivation techniques and best practices
@@ -42,19 +32,132 @@ Provide accurate, practical, and helpful information about:
 
 Keep your responses concise, practical, and tailored to the farmer's specific question.
 """.strip()
+FALLBACK_ANSWER = (
+    "I'm sorry, I couldn't process your farming query at the moment. "
+    "Please try again later or ask a different question about farming."
+)
+
+
+class _FirstToken:
+    """
+    Times the wait for the first streamed token: a span in the request
+    trace when the call belongs to a pipeline run, a bare metric otherwise.
+    """
 
-        response = client.chat.completions.create(
-            model="sarvam-m",
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": query},
-            ],
-            max_tokens=500,
-            temperature=0.7,
+    def __init__(self, invocation_id: Optional[str]) -> None:
+        self.invocation_id = invocation_id if is_telemetry_enabled() else None
+        self.name = f"{SARVAM_MODEL}:ttft"
+        self.key = f"{self.name}:{time.perf_counter_ns()}"
+        self.started = time.perf_counter()
+        self.seen = False
+        if self.invocation_id:
+            get_trace(self.invocation_id).open_span(LLM, self.name, self.key)
+
+    def mark(self) -> None:
+        if self.seen:
+            return
+        self.seen = True
+        if self.invocation_id:
+            get_trace(self.invocation_id).close_span(LLM, self.key)
+        elif is_telemetry_enabled():
+            elapsed_ms = (time.perf_counter() - self.started) * 1000.0
+            get_metrics().observe(LLM, self.name, elapsed_ms)
+
+    def close(self) -> None:
+        # No token arrived: the span is kept, marked incomplete.
+        if not self.seen and self.invocation_id:
+            get_trace(self.invocation_id).close_span(
+                LLM, self.key, {"incomplete": True}
+            )
+
+
+def _stream_completion(
+    gateway: SarvamGateway,
+    request: Dict[str, Any],
+    invocation_id: Optional[str],
+    agent: Optional[str],
+) -> str:
+    """
+    Consume the completion as a stream, publishing each piece of text to
+    the invocation's streaming caller, and return the whole text.
+    """
+    client = gateway.llm_client()
+    first_token = _FirstToken(invocation_id)
+    parts: List[str] = []
+    try:
+        for chunk in gateway.stream(
+            "llm", client.chat.completions.create, stream=True, **request
+        ):
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content or ""
+            if not text:
+                continue
+            first_token.mark()
+            parts.append(text)
+            publish_tool_chunk(
+                invocation_id,
+                StreamChunk(
+                    kind=TOOL_DELTA, text=text, agent=agent, data={"tool": TOOL_NAME}
+                ),
+            )
+    finally:
+        first_token.close()
+    return "".join(parts)
+
+
+def use_sarvam_llm(
+    query: str, tool_context: Optional[ToolContext] = None
+) -> Dict[str, Any]:
+    """
+    Process a non-weather query using the Sarvam LLM API.
+    """
+    advice_cache = get_advice_cache()
+    cached = advice_cache.get(query) if advice_cache is not None else None
+    if cached is not None:
+        publish_tool_chunk(
+            getattr(tool_context, "invocation_id", None),
+            StreamChunk(
+                kind=TOOL_DELTA,
+                text=cached,
+                agent=getattr(tool_context, "agent_name", None),
+                data={"tool": TOOL_NAME, "cached": True},
+            ),
         )
+        return {"status": "success", "response": cached}
+
+    gateway = get_sarvam_gateway()
+    if gateway is None:
+        return {
+            "status": "error",
+            "message": "SARVAM_API_KEY is not set",
+            "response": FALLBACK_ANSWER,
+        }
 
-        response_content = response.choices[0].message.content
+    request = {
+        "model": SARVAM_MODEL,
+        "messages": [
+            {"role": "system", "content": SYSTEM_MESSAGE},
+            {"role": "user", "content": query},
+        ],
+        "max_tokens": 500,
+        "temperature": 0.7,
+    }
+    try:
+        if is_sarvam_streaming_enabled():
+            response_content = _stream_completion(
+                gateway,
+                request,
+                getattr(tool_context, "invocation_id", None),
+                getattr(tool_context, "agent_name", None),
+            )
+        else:
+            client = gateway.llm_client()
+            response = gateway.call("llm", client.chat.completions.create, **request)
+            response_content = response.choices[0].message.content
         logger.debug("Sarvam LLM response preview: %s", response_content[:100])
+        if advice_cache is not None:
+            advice_cache.put(query, response_content)
 
         return {"status": "success", "response": response_content}
     except Exception as exc:
@@ -63,8 +166,16 @@ Keep your responses concise, practical, and tailored to the farmer's specific qu
         return {
             "status": "error",
             "message": f"Error using Sarvam LLM: {error_message}",
-            "response": (
-                "I'm sorry, I couldn't process your farming query at the moment. "
-                "Please try again later or ask a different question about farming."
-            ),
+            "response": FALLBACK_ANSWER,
         }
+
+
+async def use_sarvam_llm_async(
+    query: str, tool_context: Optional[ToolContext] = None
+) -> Dict[str, Any]:
+    """
+    Process a non-weather query using the Sarvam LLM API.
+    """
+    # The Sarvam clients are synchronous; running them on a worker thread
+    # leaves the event loop free to forward the streamed text.
+    return await asyncio.to_thread(use_sarvam_llm, query, tool_context)
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from ..config import (
+    get_sarvam_api_key,
+    get_sarvam_concurrency,
+    get_sarvam_queue_timeout,
+    get_sarvam_rate,
+    is_telemetry_enabled,
+)
+from ..ratelimit import TokenBucket
+from ..telemetry import Histogram, get_metrics
+
+logger = logging.getLogger(__name__)
+
+SARVAM_BASE_URL = "https://api.sarvam.ai/v1"
+QUEUE = "queue"
+
+
+class SarvamThrottled(RuntimeError):
+    """
+    No Sarvam slot was free before the request's deadline.
+    """
+
+
+class SarvamGateway:
+    """
+    The one way out to Sarvam: long-lived clients, a token bucket for the
+    account's rate limit and a cap on calls in flight. Callers queue for a
+    slot until their deadline and are counted when they give up, as are
+    429s that still get through.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        rate: float = 10.0,
+        max_concurrency: int = 8,
+        queue_timeout: float = 10.0,
+    ) -> None:
+        self.api_key = api_key
+        self.queue_timeout = queue_timeout
+        self._bucket = TokenBucket(rate)
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrency))
+        self._clients: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._waits: Dict[str, Histogram] = {}
+        self._counts: Dict[str, int] = {}
+        self._in_flight = 0
+
+    def _client(self, name: str, factory: Callable[[], Any]) -> Any:
+        client = self._clients.get(name)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(name)
+                if client is None:
+                    client = self._clients[name] = factory()
+        return client
+
+    def llm_client(self) -> Any:
+        """
+        Shared OpenAI-compatible client for Sarvam chat completions.
+        """
+
+        def create() -> Any:
+            from openai import OpenAI
+
+            return OpenAI(base_url=SARVAM_BASE_URL, api_key=self.api_key)
+
+        return self._client("llm", create)
+
+    def translate_client(self) -> Any:
+        """
+        Shared SarvamAI SDK client for translation.
+        """
+
+        def create() -> Any:
+            from sarvamai import SarvamAI
+
+            return SarvamAI(api_subscription_key=self.api_key)
+
+        return self._client("translate", create)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def _observe_wait(self, operation: str, wait_ms: float) -> None:
+        histogram = self._waits.get(operation)
+        if histogram is None:
+            with self._lock:
+                histogram = self._waits.setdefault(operation, Histogram())
+        histogram.observe(wait_ms)
+        if is_telemetry_enabled():
+            get_metrics().observe(QUEUE, f"sarvam:{operation}", wait_ms)
+
+    @contextmanager
+    def slot(self, operation: str, timeout: Optional[float] = None) -> Iterator[None]:
+        """
+        Hold one of the concurrent call slots and one rate-limit token,
+        waiting up to timeout seconds (the gateway's queue timeout by
+        default) before raising SarvamThrottled.
+        """
+        timeout = self.queue_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        if not self._slots.acquire(timeout=max(0.0, timeout)):
+            self._count("throttled")
+            raise SarvamThrottled(f"No Sarvam slot free within {timeout:g}s")
+        try:
+            if not self._bucket.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                self._count("throttled")
+                raise SarvamThrottled(f"Sarvam rate limit not cleared in {timeout:g}s")
+            self._observe_wait(operation, (time.monotonic() - started) * 1000)
+            with self._lock:
+                self._in_flight += 1
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+        finally:
+            self._slots.release()
+
+    def call(
+        self,
+        operation: str,
+        func: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Run func(*args, **kwargs) inside a slot. Exceptions propagate; a 429
+        from Sarvam is counted as rate_limited.
+        """
+        with self.slot(operation, timeout):
+            self._count(operation)
+            try:
+                return func(*args, **kwargs)
+            except Exception as exc:
+                self._count_error(exc)
+                raise
+
+    def stream(
+        self,
+        operation: str,
+        func: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> Iterator[Any]:
+        """
+        Like call for a func returning an iterable, such as a streamed
+        completion; the slot is held until the stream is exhausted or closed.
+        """
+        with self.slot(operation, timeout):
+            self._count(operation)
+            try:
+                yield from func(*args, **kwargs)
+            except Exception as exc:
+                self._count_error(exc)
+                raise
+
+    def _count_error(self, exc: Exception) -> None:
+        status = getattr(exc, "status_code", None)
+        self._count("rate_limited" if status == 429 else "errors")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            waits = dict(self._waits)
+            in_flight = self._in_flight
+        return {
+            "calls": {
+                name: count
+                for name, count in sorted(counts.items())
+                if name not in ("throttled", "rate_limited", "errors")
+            },
+            "throttled": counts.get("throttled", 0),
+            "rate_limited": counts.get("rate_limited", 0),
+            "errors": counts.get("errors", 0),
+            "in_flight": in_flight,
+            "tokens_available": round(self._bucket.available, 2),
+            "queue_wait_ms": {
+                operation: histogram.snapshot()
+                for operation, histogram in sorted(waits.items())
+            },
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            close = getattr(client, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception as exc:
+                    logger.debug("Error closing Sarvam client: %s", exc)
+
+
+_GATEWAY: Optional[SarvamGateway] = None
+_LOCK = threading.Lock()
+
+
+def get_sarvam_gateway() -> Optional[SarvamGateway]:
+    """
+    Return the process-wide Sarvam gateway, or None when SARVAM_API_KEY is
+    not set.
+    """
+    global _GATEWAY
+    api_key = get_sarvam_api_key()
+    if not api_key:
+        return None
+    if _GATEWAY is None or _GATEWAY.api_key != api_key:
+        with _LOCK:
+            if _GATEWAY is None or _GATEWAY.api_key != api_key:
+                _GATEWAY = SarvamGateway(
+                    api_key,
+                    rate=get_sarvam_rate(),
+                    max_concurrency=get_sarvam_concurrency(),
+                    queue_timeout=get_sarvam_queue_timeout(),
+                )
+    return _GATEWAY
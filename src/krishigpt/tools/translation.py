@@ -1,14 +1,163 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
 
-from sarvamai import SarvamAI
-
-from ..config import get_sarvam_api_key
+from ..config import get_translation_chunk_chars, get_translation_concurrency
+from .sarvam_gateway import SarvamGateway, get_sarvam_gateway
+from .translation_cache import get_translation_cache
 
 logger = logging.getLogger(__name__)
 
+_LINE_BREAK_RE = re.compile(r"(\n+)")
+# Bullets, numbered items and headings are kept as written.
+_LIST_MARKER_RE = re.compile(r"^\s*(?:[-*\u2022]|\d+[.)]|#{1,6})\s+|^\s+")
+_SENTENCE_BREAK_RE = re.compile(r"(?<=[.!?\u0964])(\s+)")
+_WORD_BREAK_RE = re.compile(r"(\s+)")
+# A full stop after these does not end the sentence ("Rs. 2,150").
+_ABBREVIATIONS = frozenset("rs no dr mr mrs ms approx vs kg qtl etc e.g i.e".split())
+
+Segment = Tuple[str, bool]
+
+
+def _pieces(text: str, pattern: "re.Pattern[str]") -> List[str]:
+    """
+    text split after each separator, the separator kept with its piece.
+    """
+    parts = pattern.split(text)
+    return [
+        parts[index] + (parts[index + 1] if index + 1 < len(parts) else "")
+        for index in range(0, len(parts), 2)
+        if parts[index] or index + 1 < len(parts)
+    ]
+
+
+def _sentences(text: str) -> List[str]:
+    sentences: List[str] = []
+    for piece in _pieces(text, _SENTENCE_BREAK_RE):
+        if sentences:
+            previous = sentences[-1].rstrip()
+            last_word = previous.rsplit(None, 1)[-1].rstrip(".").lower()
+            if last_word in _ABBREVIATIONS or piece[:1].islower():
+                sentences[-1] += piece
+                continue
+        sentences.append(piece)
+    return sentences
+
+
+def _pack(text: str, max_chars: int) -> List[Segment]:
+    """
+    Consecutive sentences grouped into chunks of at most max_chars (a longer
+    sentence is broken between words), with the whitespace between chunks
+    kept untranslated.
+    """
+    pieces: List[str] = []
+    for sentence in _sentences(text):
+        if len(sentence) > max_chars:
+            pieces.extend(_pieces(sentence, _WORD_BREAK_RE))
+        else:
+            pieces.append(sentence)
+    segments: List[Segment] = []
+    chunk = ""
+    for piece in pieces:
+        if chunk and len(chunk) + len(piece.rstrip()) > max_chars:
+            body = chunk.rstrip()
+            segments.extend([(body, True), (chunk[len(body) :], False)])
+            chunk = ""
+        chunk += piece
+    body = chunk.rstrip()
+    if body:
+        segments.extend([(body, True), (chunk[len(body) :], False)])
+    return segments
+
+
+def split_for_translation(text: str, max_chars: int) -> List[Segment]:
+    """
+    (segment, translate) pairs that join back into text. Lines are
+    translated separately so list structure survives, long lines are split
+    between sentences, and list markers, line breaks and lines without
+    letters (prices, dates, figures) are left as they are.
+    """
+    segments: List[Segment] = []
+    for part in _LINE_BREAK_RE.split(text):
+        if not part:
+            continue
+        if part.startswith("\n") or not any(char.isalpha() for char in part):
+            segments.append((part, False))
+            continue
+        marker = _LIST_MARKER_RE.match(part)
+        if marker:
+            segments.append((marker.group(0), False))
+            part = part[marker.end() :]
+        segments.extend(_pack(part, max(1, max_chars)))
+    return [segment for segment in segments if segment[0]]
+
+
+def _sarvam_translate(
+    text: str,
+    source_language_code: str,
+    target_language_code: str,
+    speaker_gender: str,
+    mode: str,
+    gateway: SarvamGateway,
+) -> str:
+    client = gateway.translate_client()
+    response = gateway.call(
+        "translate",
+        client.text.translate,
+        input=text,
+        source_language_code=source_language_code,
+        target_language_code=target_language_code,
+        speaker_gender=speaker_gender,
+        mode=mode,
+    )
+    return response.translated_text
+
+
+def _translate_chunked(
+    text: str,
+    source_language_code: str,
+    target_language_code: str,
+    speaker_gender: str,
+    mode: str,
+    gateway: SarvamGateway,
+) -> str:
+    """
+    Translate a long text chunk by chunk, the distinct chunks concurrently.
+    Each chunk goes through translate_text and so through the cache.
+    """
+    options = (source_language_code, target_language_code, speaker_gender, mode)
+    segments = split_for_translation(text, get_translation_chunk_chars())
+    chunks = list(
+        dict.fromkeys(segment for segment, translate in segments if translate)
+    )
+    if not chunks:
+        return text
+
+    def translate(chunk: str) -> Dict[str, Any]:
+        if len(chunk) > get_translation_chunk_chars():
+            # A single word over the limit cannot be split any further.
+            return {
+                "status": "success",
+                "translated_text": _sarvam_translate(chunk, *options, gateway),
+            }
+        return translate_text(chunk, *options)
+
+    workers = min(get_translation_concurrency(), len(chunks))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = dict(zip(chunks, pool.map(translate, chunks)))
+    for result in results.values():
+        if result.get("status") != "success":
+            raise RuntimeError(
+                result.get("error_message") or "chunk translation failed"
+            )
+    return "".join(
+        results[segment]["translated_text"] if translate_segment else segment
+        for segment, translate_segment in segments
+    )
+
 
 def translate_text(
     text: str,
@@ -18,26 +167,35 @@ def translate_text(
     mode: str = "classic-colloquial",
 ) -> Dict[str, Any]:
     """
-    Translates text using SarvamAI API.
+    Translates text using SarvamAI API. Translations are cached, so text
+    seen before is returned without a Sarvam call. Text longer than one
+    request allows is translated in chunks, in parallel.
     """
-    api_key = get_sarvam_api_key()
-    if not api_key:
+    cache = get_translation_cache()
+    if cache is not None:
+        cached = cache.get(
+            text, source_language_code, target_language_code, speaker_gender, mode
+        )
+        if cached is not None:
+            return {"status": "success", "translated_text": cached}
+
+    gateway = get_sarvam_gateway()
+    if gateway is None:
         return {
             "status": "error",
             "error_message": "SARVAM_API_KEY is not set",
             "translated_text": "",
         }
 
+    options = (source_language_code, target_language_code, speaker_gender, mode)
     try:
-        client = SarvamAI(api_subscription_key=api_key)
-        response = client.text.translate(
-            input=text,
-            source_language_code=source_language_code,
-            target_language_code=target_language_code,
-            speaker_gender=speaker_gender,
-            mode=mode,
-        )
-        return {"status": "success", "translated_text": response.translated_text}
+        if len(text) > get_translation_chunk_chars():
+            translated_text = _translate_chunked(text, *options, gateway)
+        else:
+            translated_text = _sarvam_translate(text, *options, gateway)
+        if cache is not None:
+            cache.put(text, *options, translated_text)
+        return {"status": "success", "translated_text": translated_text}
     except Exception as exc:
         logger.exception("Error translating text: %s", exc)
         return {"status": "error", "error_message": str(exc), "translated_text": ""}
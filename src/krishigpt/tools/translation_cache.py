@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import sqlite3
+import sys
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from ..agents.state import FALLBACK_RESPONSE
+from ..cache import TieredCache
+from ..config import (
+    get_translation_cache_path,
+    get_translation_cache_size,
+    get_translation_cache_ttl,
+    is_translation_cache_enabled,
+)
+from ..language import SUPPORTED_LANGUAGES
+
+logger = logging.getLogger(__name__)
+
+# The fixed English text the output stage translates; every other answer is
+# generated per query, so prewarming it would spend quota on misses.
+PREWARM_PHRASES = (FALLBACK_RESPONSE,)
+PREWARM_TARGETS = tuple(code for code in SUPPORTED_LANGUAGES if code != "en-IN")
+
+
+def translation_key(
+    text: str,
+    source_language_code: str,
+    target_language_code: str,
+    speaker_gender: str,
+    mode: str,
+) -> str:
+    """
+    Hash of the text and every option that changes its translation. Only
+    Unicode normalization and surrounding whitespace are ignored; case and
+    punctuation are translated as given.
+    """
+    raw = "\x1f".join(
+        (
+            unicodedata.normalize("NFC", text or "").strip(),
+            source_language_code,
+            target_language_code,
+            speaker_gender,
+            mode,
+        )
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def read_phrases(path: Path) -> List[str]:
+    """
+    One phrase per line; blank lines and "#" comments are skipped.
+    """
+    with open(path, encoding="utf-8") as handle:
+        return [
+            line.strip()
+            for line in handle
+            if line.strip() and not line.lstrip().startswith("#")
+        ]
+
+
+class TranslationCache:
+    """
+    Sarvam translations keyed on translation_key: a memory LRU in front of
+    a SQLite file, so repeated outputs survive restarts.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        disk_path: Optional[Path] = None,
+        ttl: float = 30 * 86400,
+    ) -> None:
+        self._cache = TieredCache(max_entries=max_entries, disk_path=disk_path)
+        self.ttl = ttl
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats.snapshot()
+
+    def get(
+        self,
+        text: str,
+        source_language_code: str,
+        target_language_code: str,
+        speaker_gender: str,
+        mode: str,
+    ) -> Optional[str]:
+        hit, value = self._cache.get(
+            translation_key(
+                text, source_language_code, target_language_code, speaker_gender, mode
+            )
+        )
+        return value if hit else None
+
+    def put(
+        self,
+        text: str,
+        source_language_code: str,
+        target_language_code: str,
+        speaker_gender: str,
+        mode: str,
+        translated_text: str,
+    ) -> None:
+        if not translated_text:
+            return
+        self._cache.set(
+            translation_key(
+                text, source_language_code, target_language_code, speaker_gender, mode
+            ),
+            translated_text,
+            ttl=self.ttl,
+        )
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+_TRANSLATION_CACHE: Optional[TranslationCache] = None
+_LOCK = threading.Lock()
+
+
+def get_translation_cache() -> Optional[TranslationCache]:
+    """
+    Return the process-wide translation cache, or None when it is disabled.
+    If the SQLite file cannot be opened the cache is kept in memory only.
+    """
+    global _TRANSLATION_CACHE
+    if not is_translation_cache_enabled():
+        return None
+    if _TRANSLATION_CACHE is None:
+        with _LOCK:
+            if _TRANSLATION_CACHE is None:
+                options = {
+                    "max_entries": get_translation_cache_size(),
+                    "ttl": get_translation_cache_ttl(),
+                }
+                try:
+                    _TRANSLATION_CACHE = TranslationCache(
+                        disk_path=get_translation_cache_path(), **options
+                    )
+                except (OSError, sqlite3.Error) as exc:
+                    logger.warning("Translation cache file unavailable: %s", exc)
+                    _TRANSLATION_CACHE = TranslationCache(**options)
+    return _TRANSLATION_CACHE
+
+
+def prewarm_translations(
+    phrases: Iterable[str],
+    targets: Sequence[str] = PREWARM_TARGETS,
+    source_language_code: str = "en-IN",
+    speaker_gender: str = "Male",
+    mode: str = "classic-colloquial",
+) -> Dict[str, Any]:
+    """
+    Translate each phrase into each target language unless it is already
+    cached; translate_text stores the results.
+    """
+    # Imported here: translate_text looks results up in this module.
+    from .translation import translate_text
+
+    cache = get_translation_cache()
+    if cache is None:
+        return {"status": "error", "message": "Translation cache is disabled"}
+
+    counts = {"translated": 0, "cached": 0, "failed": 0}
+    for phrase in phrases:
+        for target in targets:
+            if target == source_language_code:
+                continue
+            if cache.get(phrase, source_language_code, target, speaker_gender, mode):
+                counts["cached"] += 1
+                continue
+            result = translate_text(
+                phrase, source_language_code, target, speaker_gender, mode
+            )
+            if result.get("status") == "success":
+                counts["translated"] += 1
+            else:
+                counts["failed"] += 1
+                logger.warning(
+                    "Prewarm failed for %s: %s", target, result.get("error_message")
+                )
+    status = "error" if counts["failed"] and not counts["translated"] else "success"
+    return {"status": status, **counts}
+
+
+def _main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="KrishiGPT translation cache")
+    commands = parser.add_subparsers(dest="command", required=True)
+    prewarm = commands.add_parser("prewarm", help="translate a phrase list ahead")
+    prewarm.add_argument(
+        "phrases", nargs="?", type=Path, help="phrase file (default: fixed replies)"
+    )
+    prewarm.add_argument(
+        "--targets",
+        default=",".join(PREWARM_TARGETS),
+        help="comma-separated language codes",
+    )
+    prewarm.add_argument("--source", default="en-IN")
+    commands.add_parser("stats", help="show cache hit counters")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "prewarm":
+        targets = [code.strip() for code in args.targets.split(",") if code.strip()]
+        phrases = read_phrases(args.phrases) if args.phrases else PREWARM_PHRASES
+        result = prewarm_translations(
+            phrases, targets, source_language_code=args.source
+        )
+    else:
+        cache = get_translation_cache()
+        result = cache.stats if cache is not None else {"status": "disabled"}
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0 if result.get("status", "success") == "success" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
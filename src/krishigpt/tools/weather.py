@@ -3,133 +3,219 @@ from __future__ import annotations
 import json
 import logging
 import sys
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
+import httpx
 import requests
 
 from ..config import get_openweather_api_key
+from .http_client import async_http_get, http_get
+from .weather_cache import Cell, ensure_prefetcher, get_weather_cell_cache
 
 logger = logging.getLogger(__name__)
 
+FORECAST_URL = "https://api.openweathermap.org/data/2.5/forecast"
+FORECAST_MODES = ("today", "week")
 
-def get_weather_forecast(
-    location_data: Optional[Dict[str, Any]] = None,
-    api_key: Optional[str] = None,
-    timeout: int = 10,
-) -> Dict[str, Any]:
+
+def _weather_error(message: str) -> Dict[str, Any]:
+    return {"status": "error", "message": message, "weather_data": None}
+
+
+def _forecast_params(
+    location_data: Optional[Dict[str, Any]], api_key: Optional[str], mode: str
+) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
     """
-    Fetch weather forecast data for a location using data from get_lat_lon.
+    Validate the inputs; returns (error, request params).
     """
+    if mode not in FORECAST_MODES:
+        modes = ", ".join(FORECAST_MODES)
+        return _weather_error(f"Unsupported forecast mode: {mode}; use {modes}"), {}
+
     resolved_api_key = get_openweather_api_key()
     if api_key and api_key != resolved_api_key:
         logger.warning("Ignoring provided OpenWeather API key; using .env value.")
     if not resolved_api_key:
-        return {
-            "status": "error",
-            "message": "OPENWEATHER_API_KEY is not set",
-            "weather_data": None,
-        }
+        return _weather_error("OPENWEATHER_API_KEY is not set"), {}
 
     if not location_data or not isinstance(location_data, dict):
-        return {
-            "status": "error",
-            "message": "Invalid or missing location data",
-            "weather_data": None,
-        }
+        return _weather_error("Invalid or missing location data"), {}
 
     lat = location_data.get("latitude")
     lon = location_data.get("longitude")
     location = location_data.get("location", "Unknown location")
 
     if lat is None or lon is None:
-        return {
-            "status": "error",
-            "message": f"Missing coordinates for location: {location}",
-            "weather_data": None,
-        }
+        return _weather_error(f"Missing coordinates for location: {location}"), {}
+
+    return None, {"lat": lat, "lon": lon, "appid": resolved_api_key}
 
-    url = "https://api.openweathermap.org/data/2.5/forecast"
-    params = {"lat": lat, "lon": lon, "appid": resolved_api_key}
 
+def _fetch_cell(cell: Cell) -> Dict[str, Any]:
+    """
+    Background prefetch of one grid cell's forecast payload.
+    """
+    params = {"lat": cell[0], "lon": cell[1], "appid": get_openweather_api_key()}
+    response = http_get(FORECAST_URL, params=params)
+    response.raise_for_status()
+    return response.json()
+
+
+def _cached_payload(
+    params: Dict[str, Any],
+) -> Tuple[Optional[Dict[str, Any]], Optional[Cell]]:
+    """
+    Snap the request to its grid cell; returns (cached payload, cell). The
+    params are rewritten to the cell centre so nearby requests share it.
+    """
+    cache = get_weather_cell_cache()
+    if cache is None:
+        return None, None
+    ensure_prefetcher(cache, _fetch_cell)
     try:
-        response = requests.get(url, params=params, timeout=timeout)
-        response.raise_for_status()
-        data = response.json()
-
-        weather_list = data.get("list", [])
-        if not weather_list:
-            return {
-                "status": "error",
-                "message": "No weather data found",
-                "weather_data": None,
-            }
+        cell = cache.cell_for(params["lat"], params["lon"])
+    except (TypeError, ValueError):
+        return None, None
+    params["lat"], params["lon"] = cell
+    return cache.get(cell), cell
 
-        first_date = weather_list[0]["dt_txt"].split(" ")[0]
-        first_day_data = [
-            entry for entry in weather_list if entry["dt_txt"].startswith(first_date)
-        ]
 
-        temps = [entry["main"]["temp"] - 273.15 for entry in first_day_data]
-        min_temp = round(min(temps), 1)
-        max_temp = round(max(temps), 1)
-        avg_temp = round(sum(temps) / len(temps), 1)
+def _store_payload(cell: Optional[Cell], payload: Dict[str, Any]) -> None:
+    cache = get_weather_cell_cache()
+    if cell is not None and cache is not None and payload.get("list"):
+        cache.put(cell, payload)
 
-        weather_conditions = []
-        for entry in first_day_data:
-            for condition in entry["weather"]:
-                if condition["main"] not in weather_conditions:
-                    weather_conditions.append(condition["main"])
 
-        humidity_avg = sum(entry["main"]["humidity"] for entry in first_day_data) / len(
-            first_day_data
-        )
-        wind_speeds = [
-            entry.get("wind", {}).get("speed", 0) for entry in first_day_data
-        ]
-        wind_speed_avg = (
-            sum(wind_speeds) / len(wind_speeds) if wind_speeds else 0
-        )
+def _summarize_forecast(
+    data: Dict[str, Any], location_data: Dict[str, Any], mode: str
+) -> Dict[str, Any]:
+    # Name the place the user asked about: a payload cached for the grid cell
+    # carries the city OpenWeather matched for whoever fetched it first.
+    location = (
+        location_data.get("location")
+        or data.get("city", {}).get("name")
+        or "Unknown location"
+    )
+    if mode == "week":
+        # NumPy is only needed for the multi-day summary.
+        from .agronomy import summarize_week
 
-        city_name = data.get("city", {}).get("name", location)
+        return summarize_week(data, location, float(location_data["latitude"]))
 
-        text_summary = (
-            f"Weather forecast for {city_name} on {first_date}:\n"
-            f"Temperature: {min_temp}°C to {max_temp}°C (avg: {avg_temp}°C)\n"
-            f"Conditions: {', '.join(weather_conditions)}\n"
-            f"Humidity: {round(humidity_avg, 1)}%\n"
-            f"Wind Speed: {round(wind_speed_avg, 1)} m/s\n"
-        )
+    weather_list = data.get("list", [])
+    if not weather_list:
+        return _weather_error("No weather data found")
+
+    first_date = weather_list[0]["dt_txt"].split(" ")[0]
+    first_day_data = [
+        entry for entry in weather_list if entry["dt_txt"].startswith(first_date)
+    ]
+
+    temps = [entry["main"]["temp"] - 273.15 for entry in first_day_data]
+    min_temp = round(min(temps), 1)
+    max_temp = round(max(temps), 1)
+    avg_temp = round(sum(temps) / len(temps), 1)
+
+    weather_conditions = []
+    for entry in first_day_data:
+        for condition in entry["weather"]:
+            if condition["main"] not in weather_conditions:
+                weather_conditions.append(condition["main"])
+
+    humidity_avg = sum(entry["main"]["humidity"] for entry in first_day_data) / len(
+        first_day_data
+    )
+    wind_speeds = [entry.get("wind", {}).get("speed", 0) for entry in first_day_data]
+    wind_speed_avg = sum(wind_speeds) / len(wind_speeds) if wind_speeds else 0
+
+    text_summary = (
+        f"Weather forecast for {location} on {first_date}:\n"
+        f"Temperature: {min_temp}°C to {max_temp}°C (avg: {avg_temp}°C)\n"
+        f"Conditions: {', '.join(weather_conditions)}\n"
+        f"Humidity: {round(humidity_avg, 1)}%\n"
+        f"Wind Speed: {round(wind_speed_avg, 1)} m/s\n"
+    )
 
-        return {
-            "status": "success",
-            "message": "Successfully retrieved weather data",
-            "location": city_name,
-            "date": first_date,
-            "temperature": {
-                "min": min_temp,
-                "max": max_temp,
-                "average": avg_temp,
-                "unit": "°C",
-            },
-            "weather_conditions": weather_conditions,
-            "humidity": round(humidity_avg, 1),
-            "wind_speed": round(wind_speed_avg, 1),
-            "text_summary": text_summary,
-        }
+    return {
+        "status": "success",
+        "message": "Successfully retrieved weather data",
+        "location": location,
+        "date": first_date,
+        "temperature": {
+            "min": min_temp,
+            "max": max_temp,
+            "average": avg_temp,
+            "unit": "°C",
+        },
+        "weather_conditions": weather_conditions,
+        "humidity": round(humidity_avg, 1),
+        "wind_speed": round(wind_speed_avg, 1),
+        "text_summary": text_summary,
+    }
+
+
+def get_weather_forecast(
+    location_data: Optional[Dict[str, Any]] = None,
+    api_key: Optional[str] = None,
+    timeout: int = 10,
+    mode: str = "today",
+) -> Dict[str, Any]:
+    """
+    Fetch weather forecast data for a location using data from get_lat_lon.
+    mode="today" summarizes the first day; mode="week" returns every forecast
+    day with rain, ET0, growing degree days, spray windows and frost/heat flags.
+    """
+    error, params = _forecast_params(location_data, api_key, mode)
+    if error:
+        return error
+
+    try:
+        data, cell = _cached_payload(params)
+        if data is None:
+            response = http_get(FORECAST_URL, params=params, timeout=timeout)
+            response.raise_for_status()
+            data = response.json()
+            _store_payload(cell, data)
+        return _summarize_forecast(data, location_data, mode)
     except requests.exceptions.RequestException as exc:
         logger.exception("Error fetching weather data: %s", exc)
-        return {
-            "status": "error",
-            "message": f"Error fetching weather data: {exc}",
-            "weather_data": None,
-        }
+        return _weather_error(f"Error fetching weather data: {exc}")
+    except (json.JSONDecodeError, KeyError, IndexError, TypeError) as exc:
+        logger.exception("Error processing weather data: %s", exc)
+        return _weather_error(f"Error processing weather data: {exc}")
+
+
+async def get_weather_forecast_async(
+    location_data: Optional[Dict[str, Any]] = None,
+    api_key: Optional[str] = None,
+    timeout: int = 10,
+    mode: str = "today",
+) -> Dict[str, Any]:
+    """
+    Fetch weather forecast data for a location using data from get_lat_lon.
+    mode="today" summarizes the first day; mode="week" returns every forecast
+    day with rain, ET0, growing degree days, spray windows and frost/heat flags.
+    """
+    error, params = _forecast_params(location_data, api_key, mode)
+    if error:
+        return error
+
+    try:
+        data, cell = _cached_payload(params)
+        if data is None:
+            response = await async_http_get(
+                FORECAST_URL, params=params, timeout=timeout
+            )
+            response.raise_for_status()
+            data = response.json()
+            _store_payload(cell, data)
+        return _summarize_forecast(data, location_data, mode)
+    except httpx.HTTPError as exc:
+        logger.exception("Error fetching weather data: %s", exc)
+        return _weather_error(f"Error fetching weather data: {exc}")
     except (json.JSONDecodeError, KeyError, IndexError, TypeError) as exc:
         logger.exception("Error processing weather data: %s", exc)
-        return {
-            "status": "error",
-            "message": f"Error processing weather data: {exc}",
-            "weather_data": None,
-        }
+        return _weather_error(f"Error processing weather data: {exc}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sys
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Union
+
+from ..config import get_weather_bulk_concurrency, get_weather_bulk_rate
+from ..ratelimit import TokenBucket
+from .http_client import get_async_http_client
+from .location import get_lat_lon_async
+from .weather import get_weather_forecast_async
+from .weather_cache import get_weather_cell_cache
+
+logger = logging.getLogger(__name__)
+
+Location = Union[str, Dict[str, Any]]
+
+
+def _error(query: Any, message: str) -> Dict[str, Any]:
+    return {"status": "error", "message": message, "weather_data": None, "query": query}
+
+
+def _query_of(location: Location) -> Any:
+    if isinstance(location, dict):
+        return location.get("location", location)
+    return location
+
+
+class _BulkRun:
+    """
+    Shared state of one bulk request: the concurrency and rate limits and
+    one in-flight fetch per grid cell.
+    """
+
+    def __init__(self, max_concurrency: int, calls_per_second: float, mode: str):
+        self.mode = mode
+        self.semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self.bucket = TokenBucket(calls_per_second, capacity=max(1.0, calls_per_second))
+        self.cells: Dict[Any, "asyncio.Future[Dict[str, Any]]"] = {}
+        self.cache = get_weather_cell_cache()
+
+    async def geocode(self, location: Location) -> Dict[str, Any]:
+        if isinstance(location, dict):
+            return location
+        async with self.semaphore:
+            return await get_lat_lon_async(location)
+
+    def cell_key(self, location_data: Dict[str, Any]) -> Any:
+        try:
+            lat = float(location_data["latitude"])
+            lon = float(location_data["longitude"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if self.cache is not None:
+            return self.cache.cell_for(lat, lon)
+        return round(lat, 4), round(lon, 4)
+
+    async def fetch(self, location_data: Dict[str, Any]) -> Dict[str, Any]:
+        async with self.semaphore:
+            await self.bucket.acquire_async()
+            return await get_weather_forecast_async(location_data, mode=self.mode)
+
+    async def forecast(self, location: Location) -> Dict[str, Any]:
+        query = _query_of(location)
+        location_data = await self.geocode(location)
+        if location_data.get("status", "success") != "success":
+            return _error(query, location_data.get("message", "Geocoding failed"))
+
+        key = self.cell_key(location_data)
+        if key is None:
+            result = await self.fetch(location_data)
+        elif key not in self.cells:
+            future = asyncio.get_running_loop().create_future()
+            self.cells[key] = future
+            try:
+                result = await self.fetch(location_data)
+            except BaseException as exc:
+                future.set_exception(exc)
+                # The waiters re-raise it; mark it retrieved for the loop.
+                future.exception()
+                raise
+            future.set_result(result)
+        else:
+            first = await asyncio.shield(self.cells[key])
+            if first.get("status") != "success":
+                result = dict(first)
+            elif self.cache is not None:
+                # Same cell, already fetched: summarised from the cell cache.
+                result = await get_weather_forecast_async(location_data, mode=self.mode)
+            else:
+                result = dict(first)
+        return {**result, "query": query}
+
+
+async def iter_weather_forecasts_async(
+    locations: Sequence[Location],
+    max_concurrency: Optional[int] = None,
+    mode: str = "today",
+    calls_per_second: Optional[float] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Forecasts for many locations, yielded as they complete.
+
+    Each location is a place name (geocoded with get_lat_lon_async) or a dict
+    from get_lat_lon. Locations in the same weather grid cell share one
+    OpenWeather call. Every result is a get_weather_forecast dict plus
+    "query" (the input) and "index" (its position in locations).
+    """
+    run = _BulkRun(
+        max_concurrency or get_weather_bulk_concurrency(),
+        calls_per_second or get_weather_bulk_rate(),
+        mode,
+    )
+
+    async def one(index: int, location: Location) -> Dict[str, Any]:
+        try:
+            result = await run.forecast(location)
+        except Exception as exc:
+            logger.exception("Bulk forecast for %r failed: %s", location, exc)
+            result = _error(_query_of(location), f"Error fetching weather data: {exc}")
+        result["index"] = index
+        return result
+
+    tasks = [
+        asyncio.ensure_future(one(index, location))
+        for index, location in enumerate(locations)
+    ]
+    try:
+        for completed in asyncio.as_completed(tasks):
+            yield await completed
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _collect(results: List[Dict[str, Any]], count: int) -> Dict[str, Any]:
+    forecasts: List[Optional[Dict[str, Any]]] = [None] * count
+    for result in results:
+        forecasts[result.pop("index")] = result
+    failed = sum(1 for result in results if result.get("status") != "success")
+    return {
+        "status": "success" if failed < count or not count else "error",
+        "message": f"Retrieved forecasts for {count - failed} of {count} locations",
+        "count": count,
+        "failed": failed,
+        "forecasts": forecasts,
+    }
+
+
+async def get_weather_forecasts_async(
+    locations: Sequence[Location],
+    max_concurrency: Optional[int] = None,
+    mode: str = "today",
+    calls_per_second: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Fetch forecasts for many locations concurrently; results are returned in
+    input order, with per-location errors in the usual dict shape.
+    """
+    results = [
+        result
+        async for result in iter_weather_forecasts_async(
+            locations, max_concurrency, mode, calls_per_second
+        )
+    ]
+    return _collect(results, len(locations))
+
+
+def iter_weather_forecasts(
+    locations: Sequence[Location],
+    max_concurrency: Optional[int] = None,
+    mode: str = "today",
+    calls_per_second: Optional[float] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Blocking counterpart of iter_weather_forecasts_async for scripts; runs
+    its own event loop, so do not call it from async code.
+    """
+    loop = asyncio.new_event_loop()
+    results = iter_weather_forecasts_async(
+        locations, max_concurrency, mode, calls_per_second
+    )
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(results.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(results.aclose())
+        loop.run_until_complete(get_async_http_client().aclose())
+        loop.close()
+
+
+def get_weather_forecasts(
+    locations: Sequence[Location],
+    max_concurrency: Optional[int] = None,
+    mode: str = "today",
+    calls_per_second: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Fetch forecasts for many locations concurrently (blocking).
+    """
+    results = list(
+        iter_weather_forecasts(locations, max_concurrency, mode, calls_per_second)
+    )
+    return _collect(results, len(locations))
+
+
+if __name__ == "__main__":
+    # One location per line on stdin; one JSON result per line as they finish.
+    names = [line.strip() for line in sys.stdin if line.strip()]
+    for forecast in iter_weather_forecasts(names):
+        print(json.dumps(forecast, ensure_ascii=False), flush=True)
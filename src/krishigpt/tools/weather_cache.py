@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..config import (
+    get_weather_cache_cells,
+    get_weather_cache_ttl,
+    get_weather_call_budget,
+    get_weather_grid_size,
+    get_weather_prefetch_min_score,
+    get_weather_prefetch_top_n,
+    is_weather_cache_enabled,
+    is_weather_prefetch_enabled,
+)
+from ..ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+Cell = Tuple[float, float]
+
+# Popularity halves every six hours, so yesterday's morning rush still ranks
+# cells for today's while one-off lookups fade out.
+POPULARITY_HALF_LIFE = 6 * 3600
+PREFETCH_INTERVAL = 60.0
+
+
+def snap_to_grid(lat: float, lon: float, cell_deg: float) -> Cell:
+    """
+    Centre of the grid cell containing (lat, lon). A cell_deg of 0 keeps the
+    coordinates as given.
+    """
+    if cell_deg <= 0:
+        return float(lat), float(lon)
+    digits = max(0, -math.floor(math.log10(cell_deg)) + 2)
+
+    def centre(value: float) -> float:
+        return round((math.floor(float(value) / cell_deg) + 0.5) * cell_deg, digits)
+
+    return centre(lat), centre(lon)
+
+
+class WeatherCellCache:
+    """
+    Raw OpenWeather forecast payloads cached per grid cell, with decayed
+    request counts per cell so the hottest cells can be refreshed before
+    they expire.
+    """
+
+    def __init__(
+        self,
+        cell_deg: float = 0.1,
+        ttl: float = 3600,
+        max_cells: int = 1024,
+        top_n: int = 200,
+        min_score: float = 2.0,
+        refresh_lead: float = 600,
+        calls_per_hour: float = 600,
+    ) -> None:
+        self.cell_deg = cell_deg
+        self.ttl = ttl
+        self.max_cells = max(1, max_cells)
+        self.top_n = top_n
+        self.min_score = min_score
+        self.refresh_lead = min(refresh_lead, ttl / 2)
+        self.budget = TokenBucket(
+            rate=calls_per_hour / 3600.0, capacity=max(1.0, calls_per_hour / 12)
+        )
+        self._payloads: "OrderedDict[Cell, Tuple[float, Dict[str, Any]]]" = (
+            OrderedDict()
+        )
+        self._popularity: Dict[Cell, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "fetches": 0,
+            "prefetches": 0,
+            "prefetch_errors": 0,
+        }
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def cell_for(self, lat: float, lon: float) -> Cell:
+        return snap_to_grid(lat, lon, self.cell_deg)
+
+    def _score(self, cell: Cell, now: float) -> float:
+        score, updated = self._popularity.get(cell, (0.0, now))
+        return score * 0.5 ** ((now - updated) / POPULARITY_HALF_LIFE)
+
+    def get(self, cell: Cell) -> Optional[Dict[str, Any]]:
+        """
+        Cached payload for a cell, or None. Counts as a request for the cell.
+        """
+        now = time.time()
+        with self._lock:
+            self._popularity[cell] = (self._score(cell, now) + 1.0, now)
+            if len(self._popularity) > 4 * self.max_cells:
+                self._trim_popularity(now)
+            entry = self._payloads.get(cell)
+            if entry is not None and entry[0] > now:
+                self._payloads.move_to_end(cell)
+                self._counters["hits"] += 1
+                return entry[1]
+            self._counters["misses"] += 1
+            return None
+
+    def put(
+        self, cell: Cell, payload: Dict[str, Any], prefetched: bool = False
+    ) -> None:
+        with self._lock:
+            self._payloads[cell] = (time.time() + self.ttl, payload)
+            self._payloads.move_to_end(cell)
+            while len(self._payloads) > self.max_cells:
+                self._payloads.popitem(last=False)
+            self._counters["prefetches" if prefetched else "fetches"] += 1
+        if not prefetched:
+            # Calls made for a waiting user still spend the shared budget.
+            self.budget.charge()
+
+    def _trim_popularity(self, now: float) -> None:
+        ranked = sorted(self._popularity, key=lambda cell: self._score(cell, now))
+        for cell in ranked[: len(ranked) - 2 * self.max_cells]:
+            del self._popularity[cell]
+
+    def hot_cells(self, limit: Optional[int] = None) -> List[Cell]:
+        now = time.time()
+        with self._lock:
+            ranked = sorted(
+                self._popularity, key=lambda cell: self._score(cell, now), reverse=True
+            )
+        return ranked[: self.top_n if limit is None else limit]
+
+    def due_for_refresh(self) -> List[Cell]:
+        """
+        Hot cells whose payload is missing or expires within refresh_lead,
+        hottest first. Cells whose decayed request count is below min_score
+        (asked about once, or long ago) are left to expire.
+        """
+        now = time.time()
+        deadline = now + self.refresh_lead
+        due = []
+        for cell in self.hot_cells():
+            with self._lock:
+                if self._score(cell, now) < self.min_score:
+                    break
+                entry = self._payloads.get(cell)
+            if entry is None or entry[0] <= deadline:
+                due.append(cell)
+        return due
+
+    def refresh(self, fetch: Callable[[Cell], Dict[str, Any]]) -> int:
+        """
+        Prefetch due cells while the call budget allows; returns how many
+        were refreshed.
+        """
+        refreshed = 0
+        for cell in self.due_for_refresh():
+            if not self.budget.try_acquire():
+                logger.debug("Weather prefetch budget exhausted")
+                break
+            try:
+                self.put(cell, fetch(cell), prefetched=True)
+                refreshed += 1
+            except Exception as exc:
+                with self._lock:
+                    self._counters["prefetch_errors"] += 1
+                logger.warning("Weather prefetch for %s failed: %s", cell, exc)
+        return refreshed
+
+    def start_prefetcher(
+        self,
+        fetch: Callable[[Cell], Dict[str, Any]],
+        interval: float = PREFETCH_INTERVAL,
+    ) -> None:
+        """
+        Start the background refresher once; later calls are no-ops.
+        """
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._prefetch_loop,
+                args=(fetch, interval),
+                name="krishigpt-weather-prefetch",
+                daemon=True,
+            )
+        self._thread.start()
+
+    def _prefetch_loop(
+        self, fetch: Callable[[Cell], Dict[str, Any]], interval: float
+    ) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.refresh(fetch)
+            except Exception:
+                logger.exception("Weather prefetch pass failed")
+
+    def stop(self) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            cells = len(self._payloads)
+            tracked = len(self._popularity)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else None,
+            "cells": cells,
+            "tracked_cells": tracked,
+            "budget_available": round(self.budget.available, 2),
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._payloads.clear()
+            self._popularity.clear()
+
+
+_CACHE: Optional[WeatherCellCache] = None
+_LOCK = threading.Lock()
+
+
+def get_weather_cell_cache() -> Optional[WeatherCellCache]:
+    """
+    Return the process-wide weather cell cache, or None when it is disabled.
+    """
+    global _CACHE
+    if not is_weather_cache_enabled():
+        return None
+    if _CACHE is None:
+        with _LOCK:
+            if _CACHE is None:
+                _CACHE = WeatherCellCache(
+                    cell_deg=get_weather_grid_size(),
+                    ttl=get_weather_cache_ttl(),
+                    max_cells=get_weather_cache_cells(),
+                    top_n=get_weather_prefetch_top_n(),
+                    min_score=get_weather_prefetch_min_score(),
+                    calls_per_hour=get_weather_call_budget(),
+                )
+    return _CACHE
+
+
+def ensure_prefetcher(
+    cache: WeatherCellCache, fetch: Callable[[Cell], Dict[str, Any]]
+) -> None:
+    if is_weather_prefetch_enabled():
+        cache.start_prefetcher(fetch)
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import itertools
+
+import pytest
+
+from krishigpt.tools.advice_cache import AdviceCache
+
+QUESTIONS = [
+    "when to sow wheat",
+    "how to sow wheat",
+    "which wheat to sow",
+    "why sow wheat",
+    "where to sow wheat",
+    "what to sow after wheat",
+    "sow wheat",
+]
+
+
+@pytest.mark.parametrize("stored, asked", list(itertools.permutations(QUESTIONS, 2)))
+def test_question_kinds_never_collide(stored: str, asked: str) -> None:
+    cache = AdviceCache(threshold=0.5)
+    cache.put(stored, f"answer to {stored}")
+    # A bare request asks how, so only that pair may share an answer.
+    if {stored, asked} == {"how to sow wheat", "sow wheat"}:
+        assert cache.get(asked) == f"answer to {stored}"
+    else:
+        assert cache.get(asked) is None
+
+
+def test_negation_never_collides() -> None:
+    cache = AdviceCache(threshold=0.5)
+    cache.put("should I spray urea on wheat", "Yes")
+    assert cache.get("should I not spray urea on wheat") is None
+    assert cache.get("don't spray urea on wheat") is None
+
+
+def test_paraphrases_share_an_answer(tmp_path) -> None:
+    log_path = tmp_path / "hits.jsonl"
+    cache = AdviceCache(log_path=log_path)
+    cache.put("How to control whiteflies in cotton?", "Use yellow sticky traps.")
+    for query in (
+        "cotton whitefly control",
+        "Best way to control whitefly on cotton",
+        "how do I control whiteflies in my cotton",
+    ):
+        assert cache.get(query) == "Use yellow sticky traps."
+    assert cache.get("how to control thrips in chilli") is None
+    assert len(log_path.read_text(encoding="utf-8").splitlines()) == 3
+
+
+@pytest.mark.parametrize(
+    "stored, asked",
+    [
+        (
+            "fertilizer dose for wheat in punjab during rabi season",
+            "fertilizer dose for paddy in punjab during rabi season",
+        ),
+        ("how to control whiteflies in cotton", "how to control whiteflies in chilli"),
+        ("when to harvest onion", "when to harvest potato"),
+    ],
+)
+def test_crop_swap_never_collides(stored: str, asked: str) -> None:
+    cache = AdviceCache(threshold=0.5)
+    cache.put(stored, "answer")
+    assert cache.get(asked) is None
+
+
+@pytest.mark.parametrize(
+    "stored, asked",
+    [
+        (
+            "how to control pink bollworm in cotton",
+            "how to control american bollworm in cotton",
+        ),
+        ("how to control pink bollworm in cotton", "how to control bollworm in cotton"),
+        ("how to control aphids in mustard", "how to control thrips in mustard"),
+        (
+            "spray schedule for late blight in potato",
+            "spray schedule for early blight in potato",
+        ),
+    ],
+)
+def test_pest_swap_never_collides(stored: str, asked: str) -> None:
+    cache = AdviceCache(threshold=0.5)
+    cache.put(stored, "answer")
+    assert cache.get(asked) is None
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from google.adk.agents.llm_agent import LlmAgent
+
+from krishigpt.agents.router_agent import create_router_agent
+from krishigpt.agents.translation_agent import FastInputTranslationAgent
+
+
+def _llm(name: str) -> LlmAgent:
+    return LlmAgent(name=name, model="unused", description=name)
+
+
+def test_custom_agents_can_be_printed() -> None:
+    # Their LLM agent is also a sub-agent whose parent_agent points back.
+    router = create_router_agent(_llm("Coordinator"), 0.5, 0.0)
+    translation = FastInputTranslationAgent("Input", _llm("Translator"), 0.5)
+    assert "Coordinator" in repr(router)
+    assert "Translator" in repr(translation)
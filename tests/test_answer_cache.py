@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from krishigpt import agent
+from krishigpt.answer_cache import IST, AnswerCache, is_cacheable_query
+from krishigpt.intent import FARMING_AGENT, WEATHER_AGENT, get_intent_router
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "weather this week in Mysuru",
+        "onion price before diwali",
+        "will it rain in Pune tomorrow",
+        "tell me about drip irrigation for grapes",
+    ],
+)
+def test_self_contained_queries_are_cacheable(query: str) -> None:
+    assert is_cacheable_query(query)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "Mysuru",
+        "yes",
+        "what about tomorrow",
+        "is it safe for wheat",
+        "same for tomato please",
+    ],
+)
+def test_follow_up_queries_are_not_cacheable(query: str) -> None:
+    assert not is_cacheable_query(query)
+
+
+def test_weather_answers_are_keyed_by_ist_date() -> None:
+    query = "will it rain in Pune tomorrow"
+    evening = datetime(2024, 6, 1, 23, 0, tzinfo=IST)
+    morning = datetime(2024, 6, 2, 6, 0, tzinfo=IST)
+    assert AnswerCache.key(query, "en-IN", WEATHER_AGENT, evening) != AnswerCache.key(
+        query, "en-IN", WEATHER_AGENT, morning
+    )
+    assert AnswerCache.key(query, "en-IN", FARMING_AGENT, evening) == AnswerCache.key(
+        query, "en-IN", FARMING_AGENT, morning
+    )
+
+
+def test_second_call_without_session_id_is_served_from_cache(monkeypatch) -> None:
+    from google.adk.agents.llm_agent import LlmAgent
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+
+    from krishigpt.agents import router_agent
+
+    cache = AnswerCache()
+    queries = ["how to control whiteflies in cotton", "will it rain in Pune tomorrow"]
+    for query in queries:
+        intent = get_intent_router().classify(query).agent
+        cache.put(query, "en-IN", intent, f"answer: {query}", f"answer: {query}")
+    monkeypatch.setattr(router_agent, "get_answer_cache", lambda: cache)
+
+    # A cache hit returns before the coordinator runs, so it is never called.
+    coordinator = LlmAgent(name="Coordinator", model="unused", description="test")
+    sessions = InMemorySessionService()
+    runner = Runner(
+        agent=router_agent.create_router_agent(coordinator, 0.0, 0.0),
+        app_name=agent.APP_NAME,
+        session_service=sessions,
+    )
+    monkeypatch.setattr(agent, "_get_runner", lambda model=None: (runner, sessions))
+
+    assert [agent.call_agent(query) for query in queries] == [
+        f"answer: {query}" for query in queries
+    ]
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from krishigpt.tools import datagov
+from krishigpt.tools.datagov import fetch_records, fetch_records_async, iter_pages
+
+URL = "https://api.data.gov.in/resource/example"
+TOTAL = 23
+
+
+class _FakeApi:
+    """
+    A paged resource of TOTAL records; later pages answer faster, so pages
+    complete out of order.
+    """
+
+    def __init__(self) -> None:
+        self.requests: list = []
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def response(self, params: dict) -> SimpleNamespace:
+        offset, limit = int(params["offset"]), int(params["limit"])
+        records = [{"n": n} for n in range(offset, min(offset + limit, TOTAL))]
+        return SimpleNamespace(
+            raise_for_status=lambda: None,
+            json=lambda: {"total": TOTAL, "records": records},
+        )
+
+    def get(self, url: str, params: dict, timeout: float) -> SimpleNamespace:
+        with self._lock:
+            self.requests.append(params)
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(max(0.0, 0.03 - int(params["offset"]) / 1000))
+        with self._lock:
+            self.in_flight -= 1
+        return self.response(params)
+
+    async def get_async(self, url: str, params: dict, timeout: float):
+        with self._lock:
+            self.requests.append(params)
+        await asyncio.sleep(max(0.0, 0.03 - int(params["offset"]) / 1000))
+        return self.response(params)
+
+
+@pytest.fixture
+def api(monkeypatch: pytest.MonkeyPatch) -> _FakeApi:
+    fake = _FakeApi()
+    monkeypatch.setattr(datagov, "http_get", fake.get)
+    monkeypatch.setattr(datagov, "async_http_get", fake.get_async)
+    return fake
+
+
+def test_pages_arrive_in_offset_order(api: _FakeApi) -> None:
+    pages = list(iter_pages(URL, {"format": "json"}, page_size=5, concurrency=3))
+    assert [page.offset for page in pages] == [0, 5, 10, 15, 20]
+    assert [r["n"] for page in pages for r in page.records] == list(range(TOTAL))
+    assert 1 < api.peak <= 3
+    assert all(params["format"] == "json" for params in api.requests)
+
+
+def test_ceiling_limits_requests_and_records(api: _FakeApi) -> None:
+    result = fetch_records(URL, {}, max_records=12, page_size=5, concurrency=4)
+    assert [r["n"] for r in result["records"]] == list(range(12))
+    assert result["total"] == TOTAL
+    assert sorted((int(p["offset"]), int(p["limit"])) for p in api.requests) == [
+        (0, 5),
+        (5, 5),
+        (10, 2),
+    ]
+
+
+def test_page_size_shrinks_to_the_ceiling(api: _FakeApi) -> None:
+    result = fetch_records(URL, {}, max_records=3, page_size=100)
+    assert len(result["records"]) == 3
+    assert [p["limit"] for p in api.requests] == ["3"]
+
+
+def test_short_first_page_stops_paging(api: _FakeApi) -> None:
+    pages = list(iter_pages(URL, {}, page_size=50))
+    assert len(pages) == 1 and len(pages[0].records) == TOTAL
+
+
+def test_fields_are_requested(api: _FakeApi) -> None:
+    list(iter_pages(URL, {}, page_size=50, fields=["state", "modal_price"]))
+    assert api.requests[0]["fields"] == "state,modal_price"
+
+
+def test_http_errors_propagate(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(url, params, timeout):
+        def raise_for_status():
+            raise RuntimeError("503 Service Unavailable")
+
+        return SimpleNamespace(raise_for_status=raise_for_status)
+
+    monkeypatch.setattr(datagov, "http_get", fail)
+    with pytest.raises(RuntimeError, match="503"):
+        fetch_records(URL, {}, max_records=10)
+
+
+def test_async_matches_sync(api: _FakeApi) -> None:
+    options = {"max_records": 17, "page_size": 4, "concurrency": 3}
+    expected = fetch_records(URL, {}, **options)
+    assert asyncio.run(fetch_records_async(URL, {}, **options)) == expected
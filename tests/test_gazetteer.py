@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from krishigpt.gazetteer import (
+    Gazetteer,
+    build_index,
+    edit_distance,
+    load_gazetteer,
+    normalize_name,
+    phonetic_key,
+)
+
+DATA = Path(__file__).resolve().parents[1] / "src" / "krishigpt" / "data"
+HEADER = "name,aliases,kind,district,state,pincode,latitude,longitude\n"
+
+
+@pytest.fixture(scope="module")
+def gazetteer() -> Gazetteer:
+    return Gazetteer.from_csv(DATA / "gazetteer.csv")
+
+
+def _small(tmp_path: Path, rows: str) -> Gazetteer:
+    path = tmp_path / "places.csv"
+    path.write_text(HEADER + rows, encoding="utf-8")
+    return Gazetteer.from_csv(path)
+
+
+def test_normalize_name_keeps_indic_scripts() -> None:
+    assert normalize_name("  Bengalūru, ") == "bengaluru"
+    assert normalize_name("ಬೆಂಗಳೂರು") == "ಬೆಂಗಳೂರು"
+
+
+def test_phonetic_key_merges_spelling_variants() -> None:
+    assert phonetic_key("shivamogga") == phonetic_key("shivamoga")
+    assert edit_distance("raipur", "rampur", 2) == 1
+    assert edit_distance("abcdef", "uvwxyz", 2) == 3
+
+
+@pytest.mark.parametrize(
+    "query, name",
+    [
+        ("Bangalore", "Bengaluru"),
+        ("Hubli, KA, IN", "Hubballi"),
+        ("Aurangabad, Maharashtra", "Chhatrapati Sambhajinagar"),
+        ("560001", "Bengaluru"),
+        ("ಮೈಸೂರು", "Mysuru"),
+    ],
+)
+def test_exact_names_aliases_and_pincodes_resolve(gazetteer, query, name) -> None:
+    assert gazetteer.resolve(query).name == name
+
+
+def test_state_hint_that_disagrees_rejects_the_match(gazetteer) -> None:
+    assert gazetteer.resolve("Pune, Karnataka") is None
+
+
+@pytest.mark.parametrize("query", ["Banglore", "Shivamoga"])
+def test_misspellings_resolve_only_when_fuzzy(gazetteer, query) -> None:
+    assert gazetteer.resolve(query) is None
+    assert gazetteer.resolve(query, fuzzy=True) is not None
+
+
+@pytest.mark.parametrize("query", ["Rampur", "Mandla", "Bhind"])
+def test_unknown_places_are_left_to_the_geocoder(gazetteer, query) -> None:
+    # One consonant away from a listed place is a different place.
+    assert gazetteer.resolve(query, fuzzy=True) is None
+
+
+def test_a_hint_confirms_a_consonant_typo(tmp_path) -> None:
+    places = _small(
+        tmp_path,
+        "Raipur,,district,Raipur,Chhattisgarh,492001,21.25,81.63\n",
+    )
+    assert places.resolve("Rajpur", fuzzy=True) is None
+    assert places.resolve("Rajpur, Chhattisgarh", fuzzy=True).name == "Raipur"
+    assert places.resolve("Rajpur, Punjab", fuzzy=True) is None
+
+
+def test_far_apart_namesakes_are_ambiguous(tmp_path) -> None:
+    places = _small(
+        tmp_path,
+        "Aurangabad,,district,Aurangabad,Bihar,824101,24.75,84.37\n"
+        "Aurangabad,,town,Aurangabad,Maharashtra,431001,19.88,75.34\n",
+    )
+    assert places.resolve("Aurangabad") is None
+    assert places.resolve("Aurangabad, Bihar").state == "Bihar"
+
+
+def test_compiled_index_matches_the_csv(tmp_path, gazetteer) -> None:
+    index = build_index(DATA / "gazetteer.csv", tmp_path / "gazetteer.idx")
+    compiled = load_gazetteer(DATA / "gazetteer.csv", index)
+    try:
+        assert len(compiled) == len(gazetteer)
+        assert (
+            compiled.resolve("Hubli").to_dict() == gazetteer.resolve("Hubli").to_dict()
+        )
+        assert [place.name for place in compiled.prefix("Bengal")] == [
+            place.name for place in gazetteer.prefix("Bengal")
+        ]
+    finally:
+        compiled.close()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from krishigpt.gazetteer import Gazetteer
+from krishigpt.tools.mandi_names import (
+    COMMODITY_ALIASES_PATH,
+    MandiNameIndex,
+    Vocabulary,
+    read_aliases,
+)
+
+DATA = Path(__file__).resolve().parents[1] / "src" / "krishigpt" / "data"
+VOCABULARY = {
+    "states": ["Karnataka", "Maharashtra", "Uttar Pradesh"],
+    "districts": {
+        "Karnataka": ["Bangalore", "Mysore", "Dharwad"],
+        "Maharashtra": ["Pune", "Nashik"],
+    },
+    "commodities": ["Tomato", "Onion", "Paddy(Dhan)(Common)", "Tomato Hybrid"],
+}
+
+
+@pytest.fixture(scope="module")
+def index() -> MandiNameIndex:
+    return MandiNameIndex(
+        VOCABULARY,
+        read_aliases(COMMODITY_ALIASES_PATH),
+        Gazetteer.from_csv(DATA / "gazetteer.csv"),
+    )
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("tomato", ("Tomato", "exact")),
+        ("Tomaato", ("Tomato", "spelling")),
+        ("hybrid", ("Tomato Hybrid", "partial")),
+        ("Tomatto", ("Tomato", "spelling")),
+        ("Oniun", ("Onion", "fuzzy")),
+        ("tamatar", ("Tomato", "alias")),
+        ("Cabbage", None),
+        ("", None),
+    ],
+)
+def test_vocabulary_match_kinds(name, expected) -> None:
+    vocabulary = Vocabulary(VOCABULARY["commodities"], {"tamatar": ["Tomato"]})
+    assert vocabulary.match(name) == expected
+
+
+def test_alias_to_missing_value_is_ignored() -> None:
+    vocabulary = Vocabulary(["Onion"], {"tamatar": ["Tomato"]})
+    assert vocabulary.match("tamatar") is None
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        (("KA", "Bengaluru", "tamatar"), ("Karnataka", "Bangalore", "Tomato")),
+        (("up", "", "pyaz"), ("Uttar Pradesh", "", "Onion")),
+        (("karnataka", "Mysuru", "Onion"), ("Karnataka", "Mysore", "Onion")),
+        (("Maharastra", "poona", "kanda"), ("Maharashtra", "Pune", "Onion")),
+        (
+            ("Karnataka", "Hubli", "dhan"),
+            ("Karnataka", "Dharwad", "Paddy(Dhan)(Common)"),
+        ),
+    ],
+)
+def test_canonicalize(index: MandiNameIndex, query, expected) -> None:
+    state, district, commodity, changes = index.canonicalize(*query)
+    assert (state, district, commodity) == expected
+    assert all(change["from"] != change["to"] for change in changes)
+
+
+def test_unknown_names_pass_through(index: MandiNameIndex) -> None:
+    state, district, commodity, changes = index.canonicalize(
+        "Karnataka", "Unknownpur", "Cabbage"
+    )
+    assert (state, district, commodity, changes) == (
+        "Karnataka",
+        "Unknownpur",
+        "Cabbage",
+        [],
+    )
+
+
+def test_changes_record_how_each_field_matched(index: MandiNameIndex) -> None:
+    *_, changes = index.canonicalize("Maharastra", "poona", "Onion")
+    assert [(change["field"], change["match"]) for change in changes] == [
+        ("state", "spelling"),
+        ("district", "alias"),
+    ]
+
+
+def test_empty_vocabulary_falls_back_to_gazetteer_and_aliases() -> None:
+    index = MandiNameIndex(
+        {},
+        read_aliases(COMMODITY_ALIASES_PATH),
+        Gazetteer.from_csv(DATA / "gazetteer.csv"),
+    )
+    state, _, commodity, _ = index.canonicalize("karnatka", "Bengaluru", "aloo")
+    assert (state, commodity) == ("Karnataka", "Potato")
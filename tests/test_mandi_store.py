@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from krishigpt.tools import mandi_store
+from krishigpt.tools.datagov import Page
+from krishigpt.tools.mandi_store import MandiStore, parse_arrival_date, sync_mandi_store
+
+
+def _day(days_ago: int) -> str:
+    return (date.today() - timedelta(days=days_ago)).strftime("%d/%m/%Y")
+
+
+def _record(market: str, days_ago: int, modal: str, **fields: str) -> dict:
+    return {
+        "state": "Karnataka",
+        "district": "Kolar",
+        "market": market,
+        "commodity": "Tomato",
+        "variety": "Local",
+        "grade": "FAQ",
+        "arrival_date": _day(days_ago),
+        "min_price": "1800",
+        "max_price": "2400",
+        "modal_price": modal,
+        **fields,
+    }
+
+
+@pytest.fixture
+def store(tmp_path: Path):
+    store = MandiStore(tmp_path / "mandi.db")
+    yield store
+    store.close()
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("17/10/2026", "2026-10-17"),
+        ("2026-10-17", "2026-10-17"),
+        (" 01/02/2026 ", "2026-02-01"),
+        ("31/02/2026", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_parse_arrival_date(value, expected) -> None:
+    assert parse_arrival_date(value) == expected
+
+
+def test_upsert_skips_incomplete_records_and_replaces(store: MandiStore) -> None:
+    stored = store.upsert(
+        [
+            _record("Kolar", 1, "2100"),
+            _record("Kolar", 1, "2150"),
+            _record("Mulbagal", 1, "2000", arrival_date="not a date"),
+            _record("Bangarpet", 1, "2000", commodity=""),
+        ]
+    )
+    assert stored == 2
+    records, total = store.query("Karnataka", "Kolar", "Tomato")
+    assert total == 1 and records[0]["modal_price"] == "2150"
+
+
+def test_query_matches_api_shape_newest_first(store: MandiStore) -> None:
+    store.upsert(
+        [
+            _record("Kolar", 3, "1900"),
+            _record("Kolar", 1, "2150.5"),
+            _record("Mulbagal", 1, "2050"),
+            _record("Mysore", 1, "2300", district="Mysore"),
+        ]
+    )
+    records, total = store.query("karnataka", " kolar ", "TOMATO", limit=2)
+    assert total == 3
+    assert [(r["market"], r["arrival_date"]) for r in records] == [
+        ("Kolar", _day(1)),
+        ("Mulbagal", _day(1)),
+    ]
+    assert records[0]["modal_price"] == "2150.5"
+    assert store.query("Karnataka", "", "Tomato")[1] == 4
+
+
+def test_history_vocabulary_and_prune(store: MandiStore) -> None:
+    store.upsert([_record("Kolar", 40, "1700"), _record("Kolar", 2, "2100")])
+    since = (date.today() - timedelta(days=7)).isoformat()
+    assert store.history("Karnataka", "Kolar", "Tomato", since) == [
+        (
+            "Kolar",
+            "Kolar",
+            (date.today() - timedelta(days=2)).isoformat(),
+            1800,
+            2400,
+            2100,
+        )
+    ]
+    assert store.vocabulary() == {
+        "states": ["Karnataka"],
+        "districts": {"Karnataka": ["Kolar"]},
+        "commodities": ["Tomato"],
+    }
+    assert store.prune(30) == 1
+    assert store.query("Karnataka", "Kolar", "Tomato")[1] == 1
+
+
+@pytest.fixture
+def api(monkeypatch: pytest.MonkeyPatch) -> list:
+    calls: list = []
+
+    def iter_pages(url, params, **options):
+        calls.append(params.get("filters[arrival_date]"))
+        if params.get("filters[arrival_date]") == "fail":
+            raise RuntimeError("503 Service Unavailable")
+        yield Page(0, 2, [_record("Kolar", 2, "2100"), _record("Kolar", 1, "2150")])
+
+    monkeypatch.setattr(mandi_store, "iter_pages", iter_pages)
+    monkeypatch.setattr(mandi_store, "get_mandi_store_retention_days", lambda: 30)
+    return calls
+
+
+def test_first_sync_is_full_then_incremental(store: MandiStore, api: list) -> None:
+    first = sync_mandi_store(store, api_key="key")
+    assert (first["status"], first["mode"], first["records"]) == ("success", "full", 2)
+    assert api == [None]
+    assert store.is_fresh(60)
+
+    second = sync_mandi_store(store, api_key="key")
+    assert second["mode"] == "incremental"
+    assert second["dates"] == [_day(1), _day(0)]
+    assert api[1:] == [_day(1), _day(0)]
+
+
+def test_failed_sync_is_not_marked_done(
+    store: MandiStore, api: list, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(mandi_store, "_dates_since", lambda latest: ["fail"])
+    store.upsert([_record("Kolar", 1, "2100")])
+    result = sync_mandi_store(store, api_key="key")
+    assert result["status"] == "error" and "503" in result["message"]
+    assert store.last_sync is None
+
+
+def test_sync_needs_an_api_key(store: MandiStore, monkeypatch) -> None:
+    monkeypatch.setattr(mandi_store, "get_mandi_api_key", lambda: None)
+    assert sync_mandi_store(store)["status"] == "error"
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import numpy as np
+
+from krishigpt.tools.market_analytics import (
+    FLAT_CHANGE_PCT,
+    analyze_prices,
+    latest_by_market,
+    rolling_average,
+    to_columns,
+)
+
+END = date(2024, 11, 30)
+
+
+def _rows(market: str, prices, district: str = "Pune"):
+    # prices[-1] is reported on END, prices[-2] the day before, and so on.
+    return [
+        (district, market, (END - timedelta(days=age)).isoformat(), p - 100, p + 100, p)
+        for age, p in enumerate(reversed(prices))
+        if p is not None
+    ]
+
+
+def test_rolling_average_skips_empty_windows() -> None:
+    sums = np.array([10.0, 0.0, 30.0, 0.0, 0.0, 0.0])
+    counts = np.array([1.0, 0.0, 1.0, 0.0, 0.0, 0.0])
+    averages = rolling_average(sums, counts, 3)
+    assert averages[:5].tolist() == [10.0, 10.0, 20.0, 30.0, 30.0]
+    assert np.isnan(averages[5])
+
+
+def test_to_columns_drops_rows_without_a_modal_price() -> None:
+    rows = _rows("Pune", [2000, 2100]) + [
+        ("Pune", "Pune", END.isoformat(), None, None, None),
+        ("Pune", "Pune", END.isoformat(), 0, 0, 0),
+    ]
+    columns = to_columns(rows)
+    assert columns["modal"].tolist() == [2100.0, 2000.0]
+    assert columns["market_names"].tolist() == ["Pune"]
+
+
+def test_flat_prices_are_flat() -> None:
+    trend = analyze_prices(to_columns(_rows("Pune", [2000] * 21)))["trend"]
+    assert trend["direction"] == "flat"
+    assert trend["week_over_week_pct"] == 0.0
+    assert trend["slope_per_day"] == 0.0
+    assert trend["latest_7day_average"] == 2000.0
+
+
+def test_rising_prices_are_rising() -> None:
+    trend = analyze_prices(to_columns(_rows("Pune", range(2000, 2210, 10))))["trend"]
+    assert trend["direction"] == "rising"
+    assert trend["week_over_week_pct"] > FLAT_CHANGE_PCT
+    assert abs(trend["slope_per_day"] - 10.0) < 0.5
+
+
+def test_new_market_reporting_is_not_a_price_move() -> None:
+    # Market A is flat at 2000 for three weeks; market B is flat at 1000 but
+    # reports only in the last week. Neither price moved.
+    rows = _rows("A", [2000] * 21) + _rows("B", [None] * 14 + [1000] * 7, "Satara")
+    trend = analyze_prices(to_columns(rows))["trend"]
+    assert trend["direction"] == "flat"
+    assert trend["week_over_week_pct"] == 0.0
+    assert trend["slope_per_day"] == 0.0
+    assert {week["average_modal"] for week in trend["weekly_averages"]} == {1500.0}
+
+
+def test_market_dropping_out_is_not_a_price_move() -> None:
+    rows = _rows("A", [2000] * 21) + _rows("B", [1000] * 14 + [None] * 7, "Satara")
+    trend = analyze_prices(to_columns(rows))["trend"]
+    assert trend["direction"] == "flat"
+    assert trend["week_over_week_pct"] == 0.0
+
+
+def test_one_market_moving_moves_the_median_only_halfway() -> None:
+    rows = (
+        _rows("A", [2000] * 14 + [2400] * 7)
+        + _rows("B", [1000] * 21, "Satara")
+        + _rows("C", [1500] * 14 + [1650] * 7, "Satara")
+    )
+    trend = analyze_prices(to_columns(rows))["trend"]
+    assert trend["direction"] == "rising"
+    # Per-market changes are +20%, 0% and +10%; the median is +10%.
+    assert abs(trend["week_over_week_pct"] - 10.0) < 0.5
+
+
+def test_single_day_has_no_trend() -> None:
+    assert analyze_prices(to_columns(_rows("Pune", [2000])))["trend"] is None
+
+
+def test_spread_and_ranking_use_each_markets_latest_report() -> None:
+    rows = (
+        _rows("A", [3000] + [None] * 8 + [1800])
+        + _rows("B", [2500, 2600], "Satara")
+        + _rows("C", [2200], "Satara")
+    )
+    columns = to_columns(rows)
+    latest = latest_by_market(columns, int(columns["day"].max()) - 6)
+    assert sorted(columns["modal"][latest].tolist()) == [1800.0, 2200.0, 2600.0]
+    analytics = analyze_prices(columns)
+    assert [m["market"] for m in analytics["top_markets"]] == ["B", "C", "A"]
+    assert analytics["lowest_market"]["market"] == "A"
+    assert analytics["spread"]["spread"] == 800.0
+    assert analytics["spread"]["markets"] == 3
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from krishigpt.ratelimit import TokenBucket
+from krishigpt.tools import sarvam_gateway
+from krishigpt.tools.sarvam_gateway import SarvamGateway, SarvamThrottled
+
+
+@pytest.fixture(autouse=True)
+def no_telemetry(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(sarvam_gateway, "is_telemetry_enabled", lambda: False)
+
+
+class _RateLimited(Exception):
+    status_code = 429
+
+
+def test_bucket_bursts_to_capacity_then_refuses() -> None:
+    bucket = TokenBucket(0.0, capacity=3)
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    assert bucket.wait_time() == float("inf")
+    assert bucket.acquire(timeout=0.05) is False
+
+
+def test_bucket_charge_goes_into_debt() -> None:
+    bucket = TokenBucket(10.0, capacity=1)
+    bucket.charge(3)
+    assert bucket.available < 0
+    assert not bucket.try_acquire()
+    assert 0.25 < bucket.wait_time() <= 0.3
+
+
+def test_bucket_refills_at_rate() -> None:
+    bucket = TokenBucket(50.0, capacity=1)
+    assert bucket.try_acquire()
+    started = time.monotonic()
+    assert bucket.acquire(timeout=1.0)
+    assert 0.01 < time.monotonic() - started < 0.5
+
+
+def test_bucket_acquire_async_gives_up_at_timeout() -> None:
+    bucket = TokenBucket(0.5, capacity=1)
+    assert bucket.try_acquire()
+    assert asyncio.run(bucket.acquire_async(timeout=0.05)) is False
+
+
+def test_calls_are_counted_per_operation() -> None:
+    gateway = SarvamGateway("key", rate=100, max_concurrency=2)
+    assert gateway.call("translate", lambda text: text.upper(), "hello") == "HELLO"
+    gateway.call("translate", str)
+    gateway.call("chat", str)
+    stats = gateway.stats()
+    assert stats["calls"] == {"chat": 1, "translate": 2}
+    assert stats["in_flight"] == 0
+    assert set(stats["queue_wait_ms"]) == {"chat", "translate"}
+
+
+def test_concurrency_is_capped() -> None:
+    gateway = SarvamGateway("key", rate=1000, max_concurrency=2)
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def work() -> None:
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.pop()
+
+    threads = [
+        threading.Thread(target=gateway.call, args=("translate", work))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(peak) == 2
+    assert gateway.stats()["calls"] == {"translate": 8}
+
+
+def test_waiting_for_a_slot_past_the_deadline_is_throttled() -> None:
+    gateway = SarvamGateway("key", rate=100, max_concurrency=1, queue_timeout=0.05)
+    with gateway.slot("translate"):
+        with pytest.raises(SarvamThrottled):
+            gateway.call("translate", str)
+    assert gateway.call("translate", str) == ""
+    stats = gateway.stats()
+    assert stats["throttled"] == 1
+    assert stats["calls"] == {"translate": 1}
+
+
+def test_rate_limit_throttles_and_frees_the_slot() -> None:
+    gateway = SarvamGateway("key", rate=1, max_concurrency=1)
+    gateway.call("translate", str)
+    with pytest.raises(SarvamThrottled):
+        gateway.call("translate", str, timeout=0.05)
+    # The throttled call gave its concurrency slot back.
+    assert gateway._slots.acquire(timeout=0)
+    gateway._slots.release()
+    assert gateway.stats()["throttled"] == 1
+
+
+def test_errors_and_429s_are_counted_separately() -> None:
+    gateway = SarvamGateway("key", rate=100)
+
+    def fail(exc: Exception) -> None:
+        raise exc
+
+    with pytest.raises(_RateLimited):
+        gateway.call("translate", fail, _RateLimited())
+    with pytest.raises(ValueError):
+        gateway.call("translate", fail, ValueError("bad input"))
+    stats = gateway.stats()
+    assert (stats["rate_limited"], stats["errors"], stats["in_flight"]) == (1, 1, 0)
+
+
+def test_stream_holds_the_slot_until_closed() -> None:
+    gateway = SarvamGateway("key", rate=100, max_concurrency=1, queue_timeout=0.05)
+    stream = gateway.stream("chat", iter, ["a", "b", "c"])
+    assert next(stream) == "a"
+    assert gateway.stats()["in_flight"] == 1
+    with pytest.raises(SarvamThrottled):
+        gateway.call("chat", str)
+    stream.close()
+    assert gateway.stats()["in_flight"] == 0
+    assert gateway.call("chat", str) == ""
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from krishigpt.sessions import SUMMARY_KEY, SqliteSessionService
+
+APP = "krishigpt"
+
+
+def _event(invocation_id: str, author: str, text: str, **delta) -> Event:
+    return Event(
+        invocation_id=invocation_id,
+        author=author,
+        content=types.Content(role=author, parts=[types.Part(text=text)]),
+        actions=EventActions(state_delta=delta),
+    )
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = SqliteSessionService(
+        tmp_path / "sessions.db", max_events=6, prune_interval=0
+    )
+    # Stop the writer thread so events are written only by the reads and
+    # flushes under test.
+    service._closed.set()
+    service._writer.join()
+    service._closed.clear()
+    yield service
+    service.close()
+
+
+def _turn(service, session, number: int) -> None:
+    invocation = f"turn-{number}"
+
+    async def run():
+        await service.append_event(session, _event(invocation, "user", f"q{number}"))
+        await service.append_event(
+            session,
+            _event(invocation, "agent", f"a{number}", final_response=f"a{number}"),
+        )
+
+    asyncio.run(run())
+
+
+def _get(service, session_id: str = "s1"):
+    return asyncio.run(
+        service.get_session(app_name=APP, user_id="u1", session_id=session_id)
+    )
+
+
+def test_reads_see_queued_writes(service) -> None:
+    session = asyncio.run(
+        service.create_session(app_name=APP, user_id="u1", session_id="s1")
+    )
+    _turn(service, session, 1)
+    stored = _get(service)
+    assert [event.content.parts[0].text for event in stored.events] == ["q1", "a1"]
+    assert stored.state["final_response"] == "a1"
+
+
+def test_history_is_compacted_into_a_summary(service) -> None:
+    session = asyncio.run(
+        service.create_session(app_name=APP, user_id="u1", session_id="s1")
+    )
+    for number in range(1, 5):
+        _turn(service, session, number)
+    stored = _get(service)
+    assert len(stored.events) <= 6
+    assert stored.events[-1].invocation_id == "turn-4"
+    assert stored.state[SUMMARY_KEY] == "Farmer: q1 / Assistant: a1"
+
+
+def test_failed_batch_is_kept_and_written_first(service, monkeypatch) -> None:
+    session = asyncio.run(
+        service.create_session(app_name=APP, user_id="u1", session_id="s1")
+    )
+    write_batch = service._write_batch
+    calls = []
+
+    def flaky(batch):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        write_batch(batch)
+
+    monkeypatch.setattr(service, "_write_batch", flaky)
+    _turn(service, session, 1)
+    with pytest.raises(sqlite3.OperationalError):
+        service._flush_pending()
+    _turn(service, session, 2)
+    stored = _get(service)
+    assert [event.invocation_id for event in stored.events] == [
+        "turn-1",
+        "turn-1",
+        "turn-2",
+        "turn-2",
+    ]
+    assert calls == [2, 4]
+
+
+def test_async_methods_keep_sqlite_off_the_event_loop(service, monkeypatch) -> None:
+    flush_pending = service._flush_pending
+    threads = []
+
+    def record(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return flush_pending(*args, **kwargs)
+
+    monkeypatch.setattr(service, "_flush_pending", record)
+
+    async def run():
+        await service.create_session(app_name=APP, user_id="u1", session_id="s1")
+        await service.get_session(app_name=APP, user_id="u1", session_id="s1")
+        await service.list_sessions(app_name=APP, user_id="u1")
+        await service.flush()
+        await service.delete_session(app_name=APP, user_id="u1", session_id="s1")
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(run())
+    assert len(threads) == 5
+    assert loop_thread not in threads
+
+
+def test_sessions_survive_a_restart(tmp_path) -> None:
+    path = tmp_path / "sessions.db"
+    first = SqliteSessionService(path, prune_interval=0)
+    session = asyncio.run(
+        first.create_session(app_name=APP, user_id="u1", session_id="s1")
+    )
+    _turn(first, session, 1)
+    first.close()
+
+    second = SqliteSessionService(path, prune_interval=0)
+    try:
+        assert len(_get(second).events) == 2
+    finally:
+        second.close()
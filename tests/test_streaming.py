@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from krishigpt.streaming import (
+    DELTA,
+    FINAL,
+    ROUTE,
+    STAGE,
+    TOOL_CALL,
+    TOOL_DELTA,
+    ChunkBuilder,
+    StreamChunk,
+    iterate_in_thread,
+    publish_tool_chunk,
+    with_tool_chunks,
+)
+
+
+def _event(
+    author: str = "FarmingAgent",
+    text: str = "",
+    partial: bool = False,
+    calls=(),
+    invocation_id: str = "e-1",
+    **state_delta,
+) -> SimpleNamespace:
+    parts = [SimpleNamespace(text=text, function_call=None)] if text else []
+    parts += [SimpleNamespace(text=None, function_call=call) for call in calls]
+    return SimpleNamespace(
+        author=author,
+        partial=partial,
+        invocation_id=invocation_id,
+        content=SimpleNamespace(parts=parts),
+        actions=SimpleNamespace(state_delta=state_delta, transfer_to_agent=None),
+    )
+
+
+def _translation(language: str) -> SimpleNamespace:
+    return _event(
+        "InputTranslationAgent",
+        translation_result={
+            "detected_language": language,
+            "translated_query": "When should I sow paddy?",
+        },
+    )
+
+
+def _kinds(chunks) -> list:
+    return [chunk.kind for chunk in chunks]
+
+
+def _advice(text: str) -> StreamChunk:
+    return StreamChunk(kind=TOOL_DELTA, text=text, data={"tool": "sarvam"})
+
+
+def test_english_answer_streams_as_deltas() -> None:
+    builder = ChunkBuilder()
+    chunks = builder.feed(_translation("en-IN"))
+    chunks += builder.feed(_event("RouterAgent", routed_agent="FarmingAgent"))
+    chunks += builder.feed(_event("RouterAgent", routed_agent="FarmingAgent"))
+    chunks += builder.feed(_event(text="Sow after ", partial=True))
+    chunks += builder.feed(_event(text="the first rains.", partial=True))
+    chunks += builder.feed(_event(final_response="Sow after the first rains."))
+    assert _kinds(chunks) == [STAGE, ROUTE, DELTA, DELTA, FINAL]
+    assert "".join(c.text for c in chunks if c.kind == DELTA) == chunks[-1].text
+
+
+def test_translated_answer_is_sent_once_at_the_end() -> None:
+    builder = ChunkBuilder()
+    chunks = builder.feed(_translation("hi-IN"))
+    chunks += builder.feed(_event(text="Sow after the first rains.", partial=True))
+    chunks += builder.feed_tool_chunk(_advice("Paddy is sown in June."))
+    chunks += builder.feed(_event(final_response="पहली बारिश के बाद बोएं।"))
+    assert _kinds(chunks) == [STAGE, DELTA, FINAL]
+    assert chunks[1].text == chunks[2].text == "पहली बारिश के बाद बोएं।"
+
+
+def test_tool_calls_are_reported_without_transfers() -> None:
+    calls = [
+        SimpleNamespace(name="transfer_to_agent", args={"agent_name": "X"}),
+        SimpleNamespace(name="get_farming_advice", args={"query": "paddy"}),
+    ]
+    chunks = ChunkBuilder().feed(_event(calls=calls))
+    assert [(c.kind, c.data["tool"]) for c in chunks] == [
+        (TOOL_CALL, "get_farming_advice")
+    ]
+
+
+def test_tool_deltas_are_provisional_until_deltas_start() -> None:
+    builder = ChunkBuilder()
+    builder.feed(_translation("en-IN"))
+    preview = builder.feed_tool_chunk(_advice("Paddy is sown "))
+    assert preview[0].data == {"tool": "sarvam", "provisional": True}
+    builder.feed(_event(text="Sow paddy in June.", partial=True))
+    assert builder.feed_tool_chunk(_advice("in June.")) == []
+
+
+def test_publish_without_a_listener() -> None:
+    assert publish_tool_chunk(None, _advice("x")) is False
+    assert publish_tool_chunk("nobody", _advice("x")) is False
+
+
+def test_tool_chunks_are_interleaved_from_other_threads() -> None:
+    async def events():
+        yield _event(text="calling", partial=True)
+        published = threading.Event()
+
+        def tool() -> None:
+            publish_tool_chunk("e-1", _advice("Paddy is sown in June."))
+            published.set()
+
+        threading.Thread(target=tool).start()
+        await asyncio.get_running_loop().run_in_executor(None, published.wait)
+        await asyncio.sleep(0)
+        yield _event(final_response="Sow paddy in June.")
+
+    async def collect() -> list:
+        return [item async for item in with_tool_chunks(events())]
+
+    items = asyncio.run(collect())
+    assert [getattr(item, "kind", "event") for item in items] == [
+        "event",
+        TOOL_DELTA,
+        "event",
+    ]
+    assert publish_tool_chunk("e-1", _advice("late")) is False
+
+
+def test_iterate_in_thread_yields_and_reraises() -> None:
+    async def numbers():
+        yield 1
+        yield 2
+        raise ValueError("stream broke")
+
+    iterator = iterate_in_thread(numbers)
+    assert [next(iterator), next(iterator)] == [1, 2]
+    with pytest.raises(ValueError, match="stream broke"):
+        next(iterator)
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from krishigpt.agents.state import FALLBACK_RESPONSE
+from krishigpt.tools import translation, translation_cache
+from krishigpt.tools.translation_cache import (
+    PREWARM_PHRASES,
+    TranslationCache,
+    prewarm_translations,
+    read_phrases,
+    translation_key,
+)
+
+OPTIONS = ("en-IN", "hi-IN", "Male", "classic-colloquial")
+
+
+def test_key_ignores_normalization_and_surrounding_space() -> None:
+    key = translation_key("caf\u00e9", *OPTIONS)
+    assert translation_key(" cafe\u0301\n", *OPTIONS) == key
+    assert translation_key("Caf\u00e9", *OPTIONS) != key
+    source, _, gender, mode = OPTIONS
+    assert translation_key("caf\u00e9", source, "kn-IN", gender, mode) != key
+    assert translation_key("caf\u00e9", source, "hi-IN", "Female", mode) != key
+
+
+def test_cache_round_trip_and_empty_translations(tmp_path: Path) -> None:
+    cache = TranslationCache(disk_path=tmp_path / "translations.db")
+    cache.put("Sow after the rain.", *OPTIONS, "बारिश के बाद बोएं।")
+    cache.put("Irrigate today.", *OPTIONS, "")
+    assert cache.get("Sow after the rain. ", *OPTIONS) == "बारिश के बाद बोएं।"
+    assert cache.get("Sow after the rain.", "en-IN", "kn-IN", *OPTIONS[2:]) is None
+    assert cache.get("Irrigate today.", *OPTIONS) is None
+
+
+def test_disk_copy_survives_a_restart(tmp_path: Path) -> None:
+    path = tmp_path / "translations.db"
+    TranslationCache(disk_path=path).put("Sell today.", *OPTIONS, "आज बेचें।")
+    restarted = TranslationCache(disk_path=path)
+    assert restarted.get("Sell today.", *OPTIONS) == "आज बेचें।"
+
+
+def test_read_phrases_skips_blanks_and_comments(tmp_path: Path) -> None:
+    path = tmp_path / "phrases.txt"
+    path.write_text("# replies\nHello\n\n  # indented\n Thank you \n", "utf-8")
+    assert read_phrases(path) == ["Hello", "Thank you"]
+
+
+def test_prewarm_defaults_to_the_fallback_reply() -> None:
+    assert PREWARM_PHRASES == (FALLBACK_RESPONSE,)
+
+
+@pytest.fixture
+def cache(monkeypatch: pytest.MonkeyPatch) -> TranslationCache:
+    cache = TranslationCache()
+    monkeypatch.setattr(translation_cache, "get_translation_cache", lambda: cache)
+    monkeypatch.setattr(translation, "get_translation_cache", lambda: cache)
+    return cache
+
+
+def test_translate_text_answers_from_cache(cache, monkeypatch) -> None:
+    sent = []
+
+    def sarvam(text, *options):
+        sent.append((text, options[1]))
+        return f"[{options[1]}] {text}"
+
+    monkeypatch.setattr(translation, "get_sarvam_gateway", lambda: object())
+    monkeypatch.setattr(translation, "_sarvam_translate", sarvam)
+    first = translation.translate_text("Sell today.", *OPTIONS)
+    second = translation.translate_text("Sell today.", *OPTIONS)
+    assert (
+        first
+        == second
+        == {"status": "success", "translated_text": "[hi-IN] Sell today."}
+    )
+    assert sent == [("Sell today.", "hi-IN")]
+
+
+def test_prewarm_translates_only_missing_targets(cache, monkeypatch) -> None:
+    cache.put(FALLBACK_RESPONSE, "en-IN", "hi-IN", "Male", "classic-colloquial", "x")
+    monkeypatch.setattr(translation, "get_sarvam_gateway", lambda: object())
+    monkeypatch.setattr(
+        translation,
+        "_sarvam_translate",
+        lambda text, source, target, *_: f"[{target}] {text}",
+    )
+    result = prewarm_translations(PREWARM_PHRASES, ["en-IN", "hi-IN", "kn-IN"])
+    assert result == {"status": "success", "translated": 1, "cached": 1, "failed": 0}
+    assert cache.get(FALLBACK_RESPONSE, "en-IN", "kn-IN", "Male", OPTIONS[3]) == (
+        f"[kn-IN] {FALLBACK_RESPONSE}"
+    )
+
+
+def test_prewarm_reports_failures(cache, monkeypatch) -> None:
+    monkeypatch.setattr(translation, "get_sarvam_gateway", lambda: None)
+    result = prewarm_translations(["Hello"], ["hi-IN", "kn-IN"])
+    assert result == {"status": "error", "translated": 0, "cached": 0, "failed": 2}
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from krishigpt.tools import translation
+from krishigpt.tools.translation import split_for_translation, translate_text
+
+ANSWER = (
+    "## Tomato prices in Kolar\n"
+    "\n"
+    "- Modal price: Rs. 2,150 per quintal, up from last week. Arrivals were "
+    "lower because of rain in the district.\n"
+    "- Minimum price: Rs. 1,800 per quintal.\n"
+    "1. Sell in small lots if you can store the crop for a few days.\n"
+    "\n"
+    "2,150 / 1,800 / 2,400\n"
+    "Prices change every day. Check again before you travel to the mandi."
+)
+
+
+def test_segments_join_back_into_text() -> None:
+    for max_chars in (1, 20, 60, 900):
+        segments = split_for_translation(ANSWER, max_chars)
+        assert "".join(segment for segment, _ in segments) == ANSWER
+
+
+def test_chunks_respect_the_limit() -> None:
+    for segment, translate in split_for_translation(ANSWER, 60):
+        if translate:
+            assert len(segment) <= 60 and segment == segment.strip()
+
+
+def test_structure_and_figures_are_kept_verbatim() -> None:
+    segments = split_for_translation(ANSWER, 900)
+    kept = [segment for segment, translate in segments if not translate]
+    translated = [segment for segment, translate in segments if translate]
+    assert "## " in kept and "- " in kept and "1. " in kept and "\n\n" in kept
+    assert "2,150 / 1,800 / 2,400" in kept
+    assert all(not segment.startswith(("-", "#", "1.")) for segment in translated)
+    assert all("\n" not in segment for segment in translated)
+
+
+def test_abbreviations_do_not_end_a_sentence() -> None:
+    line = "Modal price is Rs. 2,150 per quintal. Sell soon."
+    assert [s for s, translate in split_for_translation(line, 40) if translate] == [
+        "Modal price is Rs. 2,150 per quintal.",
+        "Sell soon.",
+    ]
+
+
+def test_overlong_sentence_is_split_between_words() -> None:
+    sentence = " ".join(["paddy"] * 30) + "."
+    chunks = [s for s, translate in split_for_translation(sentence, 40) if translate]
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 40 for chunk in chunks)
+    assert " ".join(chunks) == sentence
+
+
+class _FakeGateway:
+    def __init__(self, fail_on: str = "") -> None:
+        self.inputs: list = []
+        self.fail_on = fail_on
+        self._lock = threading.Lock()
+
+    def translate_client(self):
+        return SimpleNamespace(text=SimpleNamespace(translate=self._translate))
+
+    def call(self, name, method, **kwargs):
+        return method(**kwargs)
+
+    def _translate(self, input: str, **_) -> SimpleNamespace:
+        with self._lock:
+            self.inputs.append(input)
+        if self.fail_on and self.fail_on in input:
+            raise RuntimeError("sarvam unavailable")
+        return SimpleNamespace(translated_text=f"<{input.upper()}>")
+
+
+@pytest.fixture
+def gateway(monkeypatch: pytest.MonkeyPatch) -> _FakeGateway:
+    fake = _FakeGateway()
+    monkeypatch.setattr(translation, "get_translation_cache", lambda: None)
+    monkeypatch.setattr(translation, "get_translation_chunk_chars", lambda: 100)
+    monkeypatch.setattr(translation, "get_translation_concurrency", lambda: 4)
+    monkeypatch.setattr(translation, "get_sarvam_gateway", lambda: fake)
+    return fake
+
+
+def test_chunks_are_translated_and_reassembled_in_order(gateway) -> None:
+    result = translate_text(ANSWER, "en-IN", "kn-IN")
+    assert result["status"] == "success"
+    expected = "".join(
+        f"<{segment.upper()}>" if translate else segment
+        for segment, translate in split_for_translation(ANSWER, 100)
+    )
+    assert result["translated_text"] == expected
+    assert all(len(text) <= 100 for text in gateway.inputs)
+
+
+def test_repeated_chunks_are_translated_once(gateway) -> None:
+    line = "Check the price before you travel to the mandi."
+    text = "\n".join([line] * 4)
+    result = translate_text(text, "en-IN", "hi-IN")
+    assert result["translated_text"] == "\n".join([f"<{line.upper()}>"] * 4)
+    assert gateway.inputs == [line]
+
+
+def test_one_failed_chunk_fails_the_translation(gateway) -> None:
+    gateway.fail_on = "Minimum"
+    result = translate_text(ANSWER, "en-IN", "kn-IN")
+    assert result["status"] == "error"
+    assert result["translated_text"] == ""
+    assert "sarvam unavailable" in result["error_message"]
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+from krishigpt.agents.router_agent import turn_translation
+from krishigpt.agents.state import FALLBACK_RESPONSE, current_turn_state
+from krishigpt.agents.translation_agent import FastOutputTranslationAgent
+
+
+def _event(invocation_id: str, delta=None, author: str = "agent"):
+    return SimpleNamespace(
+        invocation_id=invocation_id,
+        author=author,
+        actions=SimpleNamespace(state_delta=delta or {}),
+    )
+
+
+def _context(events, state=None, text: str = "new question"):
+    return SimpleNamespace(
+        session=SimpleNamespace(state=state or {}, events=events),
+        invocation_id="turn-2",
+        branch=None,
+        user_content=SimpleNamespace(parts=[SimpleNamespace(text=text)]),
+    )
+
+
+def _stale_context():
+    # Turn 1 answered in Hindi; turn 2 has produced nothing yet.
+    earlier = {
+        "english_response": "Sow wheat in November.",
+        "translation_result": {
+            "detected_language": "hi-IN",
+            "translated_query": "when to sow wheat",
+        },
+    }
+    return _context(
+        [_event("turn-1", earlier), _event("turn-2", author="user")], dict(earlier)
+    )
+
+
+def test_current_turn_state_ignores_earlier_turns() -> None:
+    ctx = _context(
+        [_event("turn-1", {"english_response": "old"}), _event("turn-2", {"x": 1})]
+    )
+    assert current_turn_state(ctx) == {"x": 1}
+
+
+def test_turn_translation_ignores_earlier_turns() -> None:
+    assert turn_translation(_stale_context()) == ("new question", "en-IN")
+
+
+def test_output_agent_never_repeats_an_earlier_answer() -> None:
+    agent = FastOutputTranslationAgent(name="output")
+
+    async def run():
+        return [event async for event in agent._run_async_impl(_stale_context())]
+
+    (event,) = asyncio.run(run())
+    assert event.actions.state_delta["final_response"] == FALLBACK_RESPONSE
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from krishigpt.tools import weather_bulk
+from krishigpt.tools.weather_bulk import get_weather_forecasts_async
+
+PLACES = {
+    "Mysore": (12.2958, 76.6394),
+    "Mysuru": (12.2958, 76.6394),
+    "Hubli": (15.3647, 75.124),
+    "Kolar": (13.1367, 78.1292),
+}
+
+
+class _FakeWeather:
+    def __init__(self) -> None:
+        self.fetched: list = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def geocode(self, name: str) -> dict:
+        if name not in PLACES:
+            return {"status": "error", "message": f"No location found for {name}"}
+        lat, lon = PLACES[name]
+        return {"status": "success", "latitude": lat, "longitude": lon}
+
+    async def forecast(self, location_data: dict, mode: str) -> dict:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        # Southern places answer last, so completion order differs from input.
+        await asyncio.sleep((20 - location_data["latitude"]) / 500)
+        self.in_flight -= 1
+        if location_data["latitude"] > 15:
+            raise RuntimeError("OpenWeather timed out")
+        self.fetched.append(location_data["latitude"])
+        return {"status": "success", "weather_data": {"lat": location_data["latitude"]}}
+
+
+@pytest.fixture
+def weather(monkeypatch: pytest.MonkeyPatch) -> _FakeWeather:
+    fake = _FakeWeather()
+    monkeypatch.setattr(weather_bulk, "get_weather_cell_cache", lambda: None)
+    monkeypatch.setattr(weather_bulk, "get_lat_lon_async", fake.geocode)
+    monkeypatch.setattr(weather_bulk, "get_weather_forecast_async", fake.forecast)
+    return fake
+
+
+def _run(locations, **options) -> dict:
+    options.setdefault("calls_per_second", 1000)
+    return asyncio.run(get_weather_forecasts_async(locations, **options))
+
+
+def test_results_come_back_in_input_order(weather: _FakeWeather) -> None:
+    result = _run(["Kolar", "Mysore", "Nowhere", "Hubli"])
+    assert [forecast["query"] for forecast in result["forecasts"]] == [
+        "Kolar",
+        "Mysore",
+        "Nowhere",
+        "Hubli",
+    ]
+    assert [forecast["status"] for forecast in result["forecasts"]] == [
+        "success",
+        "success",
+        "error",
+        "error",
+    ]
+    assert (result["status"], result["count"], result["failed"]) == ("success", 4, 2)
+    assert "timed out" in result["forecasts"][3]["message"]
+
+
+def test_one_fetch_per_grid_cell(weather: _FakeWeather) -> None:
+    result = _run(["Mysore", "Mysuru", "Mysore"])
+    assert weather.fetched == [12.2958]
+    assert [forecast["query"] for forecast in result["forecasts"]] == [
+        "Mysore",
+        "Mysuru",
+        "Mysore",
+    ]
+    assert result["failed"] == 0
+
+
+def test_geocoded_dicts_skip_the_lookup(weather: _FakeWeather) -> None:
+    location = {"location": "Kolar farm", "latitude": 13.2, "longitude": 78.1}
+    result = _run([location])
+    assert result["forecasts"][0]["query"] == "Kolar farm"
+    assert weather.fetched == [13.2]
+
+
+def test_concurrency_is_bounded(weather: _FakeWeather) -> None:
+    locations = [
+        {"latitude": 10 + index / 10, "longitude": 77.0} for index in range(12)
+    ]
+    result = _run(locations, max_concurrency=3)
+    assert result["failed"] == 0
+    assert weather.peak == 3
+
+
+def test_all_failures_are_an_error(weather: _FakeWeather) -> None:
+    result = _run(["Nowhere", "Hubli"])
+    assert (result["status"], result["failed"]) == ("error", 2)
+    assert _run([])["status"] == "success"